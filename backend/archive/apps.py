@@ -0,0 +1,8 @@
+# App configuration for archive app
+from django.apps import AppConfig
+
+
+class ArchiveConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'archive'
+    verbose_name = 'Archive'
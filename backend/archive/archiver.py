@@ -0,0 +1,166 @@
+# Archivado en lotes: vuelos y reservas terminados pasan a las tablas *_archive
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from flights.cache import clear_flight_cache
+from flights.models import Flight
+from notifications.models import SentReminder
+from reservation_passengers.models import ReservationPassenger
+from reservations.code_cache import forget_reservation_code
+from reservations.models import Reservation
+
+from .models import ArchivedFlight, ArchivedReservation, ArchivedReservationPassenger
+
+# 'arrived' es el estado final que admite el CHECK de la tabla flights
+ARCHIVE_FLIGHT_STATUSES = ('completed', 'arrived', 'cancelled')
+ARCHIVE_RESERVATION_STATUSES = ('completed', 'cancelled')
+
+# Tablas heredadas sin modelo que apuntan a reservations con ON DELETE
+# RESTRICT: las reservas con pagos se quedan en la tabla caliente
+RESERVATION_REFERENCES = (('payments', 'reservation_id'), ('payment_details', 'reservation_id'))
+
+# Vuelos terminados cuya salida es anterior al corte (idx_flight_status_departure)
+FLIGHT_BATCH_SQL = """
+    SELECT id FROM {flights}
+    WHERE status = ANY(%s) AND departure_datetime < %s
+    ORDER BY id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+# Reservas terminadas cuyo viaje (FlightRequest.travel_date) es anterior al corte
+RESERVATION_BATCH_SQL = """
+    SELECT r.id, r.reservation_code FROM {reservations} r
+    JOIN {flight_requests} f ON f.id = r.flight_id
+    WHERE r.status = ANY(%s) AND f.traveldate < %s {not_referenced}
+    ORDER BY r.id
+    LIMIT %s
+    FOR UPDATE OF r SKIP LOCKED
+"""
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _copy(cursor, source, target, key, ids, archived_at):
+    """INSERT ... SELECT de las filas con key en ids a la tabla fría"""
+    columns = ', '.join(
+        _quote(field.column) for field in target._meta.concrete_fields if field.name != 'archived_at'
+    )
+    cursor.execute(
+        f'INSERT INTO {_quote(target._meta.db_table)} ({columns}, archived_at) '
+        f'SELECT {columns}, %s FROM {_quote(source._meta.db_table)} WHERE {_quote(key)} = ANY(%s)',
+        [archived_at, ids]
+    )
+    return cursor.rowcount
+
+
+def _delete(cursor, source, key, ids):
+    cursor.execute(f'DELETE FROM {_quote(source._meta.db_table)} WHERE {_quote(key)} = ANY(%s)', [ids])
+
+
+def archive_flight_batch(cutoff, batch_size):
+    """Mueve hasta batch_size vuelos en una transacción"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            FLIGHT_BATCH_SQL.format(flights=_quote(Flight._meta.db_table)),
+            [list(ARCHIVE_FLIGHT_STATUSES), cutoff, batch_size]
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            _copy(cursor, Flight, ArchivedFlight, 'id', ids, timezone.now())
+            _delete(cursor, Flight, 'id', ids)
+    for pk in ids:
+        clear_flight_cache(pk)
+    return {'flights': len(ids)}
+
+
+def archive_reservation_batch(cutoff, batch_size):
+    """
+    Mueve hasta batch_size reservas y sus pasajeros en una transacción. Los
+    recordatorios ya enviados (ledger de notifications) se borran: su viaje
+    ya pasó.
+    """
+    not_referenced = ''.join(
+        f' AND NOT EXISTS (SELECT 1 FROM {_quote(table)} WHERE {_quote(column)} = r.id)'
+        for table, column in RESERVATION_REFERENCES
+    )
+    sql = RESERVATION_BATCH_SQL.format(
+        reservations=_quote(Reservation._meta.db_table),
+        flight_requests=_quote(Reservation._meta.get_field('flight').related_model._meta.db_table),
+        not_referenced=not_referenced,
+    )
+    passengers = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [list(ARCHIVE_RESERVATION_STATUSES), cutoff.date(), batch_size])
+        rows = cursor.fetchall()
+        ids = [row[0] for row in rows]
+        if ids:
+            archived_at = timezone.now()
+            _copy(cursor, Reservation, ArchivedReservation, 'id', ids, archived_at)
+            passengers = _copy(cursor, ReservationPassenger, ArchivedReservationPassenger, 'reservation_id', ids, archived_at)
+            # Hijos antes que la reserva (fk_passengers_reservation es ON DELETE CASCADE)
+            _delete(cursor, ReservationPassenger, 'reservation_id', ids)
+            SentReminder.objects.filter(reservation_id__in=ids).delete()
+            _delete(cursor, Reservation, 'id', ids)
+    for _id, reservation_code in rows:
+        forget_reservation_code(reservation_code)
+    return {'reservations': len(ids), 'passengers': passengers}
+
+
+def _clear_reservation_caches():
+    # Mismos patrones que ReservationViewSet/ReservationPassengerViewSet._clear_*_cache
+    for pattern in ('reservation_detail_*', 'reservations_*', 'res_passenger_detail_*', 'res_passengers_*'):
+        cache.delete_pattern(pattern)
+
+
+def archive_finished(older_than_days=None, batch_size=None, max_batches=None, pause=None):
+    """
+    Archiva vuelos y reservas terminados hace más de older_than_days días
+    (ARCHIVE_AFTER_DAYS) en lotes de batch_size filas (ARCHIVE_BATCH_SIZE).
+    Cada lote es una transacción corta con FOR UPDATE SKIP LOCKED, así que
+    las filas que otra petición está modificando se dejan para la siguiente
+    pasada; entre lotes se espera pause segundos (ARCHIVE_BATCH_PAUSE).
+    max_batches limita los lotes de cada tabla por ejecución.
+    """
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    pause = settings.ARCHIVE_BATCH_PAUSE if pause is None else pause
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    summary = {'flights': 0, 'reservations': 0, 'passengers': 0}
+    for archive_batch, key in ((archive_flight_batch, 'flights'), (archive_reservation_batch, 'reservations')):
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = archive_batch(cutoff, batch_size)
+            for name, count in moved.items():
+                summary[name] += count
+            batches += 1
+            if moved[key] < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    if summary['reservations']:
+        _clear_reservation_caches()
+    return summary
+
+
+def count_candidates(older_than_days=None):
+    """Candidatas de archive_finished() (--dry-run); incluye las reservas con pagos, que no se mueven"""
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return {
+        'flights': Flight.objects.filter(
+            status__in=ARCHIVE_FLIGHT_STATUSES, departure_datetime__lt=cutoff
+        ).count(),
+        'reservations': Reservation.objects.filter(
+            status__in=ARCHIVE_RESERVATION_STATUSES, flight__travel_date__lt=cutoff.date()
+        ).count(),
+    }
@@ -0,0 +1,49 @@
+# archive/management/commands/archive_rows.py
+
+from django.core.management.base import BaseCommand
+
+from archive.archiver import archive_finished, count_candidates
+
+
+class Command(BaseCommand):
+    """
+    Mueve a las tablas *_archive los vuelos y reservas terminados hace más
+    de --older-than-days días, en lotes cortos (lo mismo que la tarea diaria
+    de Celery beat). Se puede interrumpir y repetir: cada lote es atómico.
+    """
+    help = 'Archiva vuelos y reservas terminados en lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=None,
+            help='Antigüedad mínima en días (por defecto ARCHIVE_AFTER_DAYS).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Filas por lote/transacción (por defecto ARCHIVE_BATCH_SIZE).'
+        )
+        parser.add_argument('--max-batches', type=int, default=None, help='Máximo de lotes por tabla.')
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Segundos entre lotes (por defecto ARCHIVE_BATCH_PAUSE).'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta las filas que se archivarían.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            candidates = count_candidates(options['older_than_days'])
+            self.stdout.write(
+                f"Se archivarían {candidates['flights']} vuelos y {candidates['reservations']} reservas."
+            )
+            return
+
+        summary = archive_finished(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archivados {summary['flights']} vuelos, {summary['reservations']} reservas "
+            f"y {summary['passengers']} pasajeros."
+        ))
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('airlines', '0001_initial'),
+        ('flight_requests', '0004_flightrequest_user_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedReservation',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('reservation_code', models.CharField(db_index=True, max_length=50)),
+                ('reservation_date', models.DateTimeField(null=True)),
+                ('total_passengers', models.IntegerField()),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('confirmed', 'Confirmada'), ('cancelled', 'Cancelada')], max_length=20)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('flight', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='flight_requests.flightrequest')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reserva archivada',
+                'verbose_name_plural': 'Reservas archivadas',
+                'db_table': 'reservations_archive',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedReservationPassenger',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('search_document', models.TextField(blank=True, default='')),
+                ('passenger_type', models.CharField(choices=[('main', 'Principal'), ('companion', 'Acompañante')], max_length=20)),
+                ('first_name', models.CharField(max_length=100)),
+                ('last_name', models.CharField(max_length=100)),
+                ('country_of_residence', models.CharField(max_length=100)),
+                ('identity_document', models.CharField(max_length=50)),
+                ('identity_document_normalized', models.CharField(blank=True, default='', max_length=50)),
+                ('date_of_birth', models.DateField()),
+                ('gender', models.CharField(choices=[('M', 'Masculino'), ('F', 'Femenino'), ('O', 'Otro')], max_length=1)),
+                ('passenger_category', models.CharField(choices=[('adult', 'Adulto'), ('child', 'Niño'), ('infant', 'Infante')], max_length=20)),
+                ('seat_number', models.CharField(blank=True, max_length=10, null=True)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='passengers', to='archive.archivedreservation')),
+            ],
+            options={
+                'verbose_name': 'Pasajero archivado',
+                'verbose_name_plural': 'Pasajeros archivados',
+                'db_table': 'reservation_passengers_archive',
+                'ordering': ['passenger_type', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedFlight',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('search_document', models.TextField(blank=True, default='')),
+                ('flight_code', models.CharField(db_index=True, max_length=20)),
+                ('origin', models.CharField(max_length=255)),
+                ('destination', models.CharField(max_length=255)),
+                ('departure_datetime', models.DateTimeField()),
+                ('arrival_datetime', models.DateTimeField()),
+                ('number_of_stops', models.IntegerField(default=0, null=True)),
+                ('adult_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('child_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('special_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('available_seats', models.IntegerField()),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('delayed', 'Delayed'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=20)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(null=True)),
+                ('archived_at', models.DateTimeField()),
+                ('airline', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='airlines.airline')),
+            ],
+            options={
+                'verbose_name': 'Vuelo archivado',
+                'verbose_name_plural': 'Vuelos archivados',
+                'db_table': 'flights_archive',
+                'ordering': ['departure_datetime'],
+                'indexes': [models.Index(fields=['status', 'departure_datetime'], name='idx_flight_archive_status')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedreservation',
+            index=models.Index(fields=['user', '-created_at'], name='idx_reservation_archive_user'),
+        ),
+    ]
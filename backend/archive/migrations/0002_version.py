@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedflight',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='archivedreservation',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Lectura de filas archivadas desde los ViewSets de las tablas calientes
+from django.db.models import DateTimeField, Value
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+INCLUDE_ARCHIVED_PARAM = 'include_archived'
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class IncludeArchivedMixin:
+    """
+    ?include_archived=true (solo administradores) en list y retrieve:
+    el listado es un UNION ALL de la tabla caliente y la fría con los mismos
+    filtros, búsqueda, orden y paginación; el detalle busca en la tabla fría
+    si el id ya no está en la caliente. Las escrituras nunca ven las filas
+    archivadas. Las filas del listado son instancias del modelo caliente con
+    el atributo archived_at (None si no están archivadas).
+    """
+    archived_queryset = None
+
+    def include_archived(self):
+        request = self.request
+        return (
+            self.action in ('list', 'retrieve')
+            and request.user.is_staff
+            and request.query_params.get(INCLUDE_ARCHIVED_PARAM, '').lower() in TRUE_VALUES
+        )
+
+    def get_archived_queryset(self):
+        return self.archived_queryset.all()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list' or not self.include_archived():
+            return queryset
+
+        archived = super().filter_queryset(self.get_archived_queryset())
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        # archived_at es la última columna de los modelos archivados: mismo orden de columnas
+        return (
+            queryset.annotate(archived_at=Value(None, output_field=DateTimeField()))
+            .order_by()
+            .union(archived.order_by(), all=True)
+            .order_by(*ordering)
+        )
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if not self.include_archived():
+                raise
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = get_object_or_404(
+            self.get_archived_queryset(), **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
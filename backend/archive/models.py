@@ -0,0 +1,114 @@
+# Tablas frías: vuelos, reservas y pasajeros archivados (ver archive.archiver)
+from django.conf import settings
+from django.db import models
+
+from flights.models import Flight
+from reservation_passengers.models import Gender, PassengerCategory, PassengerType
+from reservations.models import ReservationStatus
+
+# Los modelos repiten las columnas de la tabla caliente en el mismo orden y
+# añaden archived_at al final: el archivado copia con INSERT ... SELECT y
+# ?include_archived= une ambas tablas con UNION ALL. Las claves foráneas no
+# tienen restricción en la BD ni related_name, para que las filas frías no
+# bloqueen ni aparezcan al borrar usuarios, aerolíneas o solicitudes. Las
+# columnas que admiten NULL en las tablas heredadas también lo admiten aquí.
+
+
+class ArchivedFlight(models.Model):
+    id = models.IntegerField(primary_key=True)
+    search_document = models.TextField(blank=True, default='')
+    version = models.PositiveIntegerField(default=1)
+    # Sin unique: un código puede reutilizarse en la tabla caliente tras archivarse
+    flight_code = models.CharField(max_length=20, db_index=True)
+    airline = models.ForeignKey(
+        'airlines.Airline', on_delete=models.DO_NOTHING, related_name='+', db_constraint=False
+    )
+    origin = models.CharField(max_length=255)
+    destination = models.CharField(max_length=255)
+    departure_datetime = models.DateTimeField()
+    arrival_datetime = models.DateTimeField()
+    number_of_stops = models.IntegerField(default=0, null=True)
+    adult_price = models.DecimalField(max_digits=10, decimal_places=2)
+    child_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    special_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    available_seats = models.IntegerField()
+    status = models.CharField(max_length=20, choices=Flight.STATUS_CHOICES)
+    notes = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'flights_archive'
+        ordering = ['departure_datetime']
+        indexes = [
+            models.Index(fields=['status', 'departure_datetime'], name='idx_flight_archive_status'),
+        ]
+        verbose_name = 'Vuelo archivado'
+        verbose_name_plural = 'Vuelos archivados'
+
+    def __str__(self):
+        return f"{self.flight_code} - {self.origin} to {self.destination} (archivado)"
+
+    duration_minutes = Flight.duration_minutes
+    is_available = Flight.is_available
+
+
+class ArchivedReservation(models.Model):
+    id = models.IntegerField(primary_key=True)
+    version = models.PositiveIntegerField(default=1)
+    reservation_code = models.CharField(max_length=50, db_index=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False
+    )
+    flight = models.ForeignKey(
+        'flight_requests.FlightRequest', on_delete=models.DO_NOTHING, related_name='+', db_constraint=False
+    )
+    reservation_date = models.DateTimeField(null=True)
+    total_passengers = models.IntegerField()
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=ReservationStatus.choices)
+    created_at = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'reservations_archive'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='idx_reservation_archive_user'),
+        ]
+        verbose_name = 'Reserva archivada'
+        verbose_name_plural = 'Reservas archivadas'
+
+    def __str__(self):
+        return f"{self.reservation_code} (archivada)"
+
+
+class ArchivedReservationPassenger(models.Model):
+    id = models.IntegerField(primary_key=True)
+    search_document = models.TextField(blank=True, default='')
+    reservation = models.ForeignKey(
+        ArchivedReservation, on_delete=models.CASCADE, related_name='passengers'
+    )
+    passenger_type = models.CharField(max_length=20, choices=PassengerType.choices)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+    country_of_residence = models.CharField(max_length=100)
+    identity_document = models.CharField(max_length=50)
+    identity_document_normalized = models.CharField(max_length=50, blank=True, default='')
+    date_of_birth = models.DateField()
+    gender = models.CharField(max_length=1, choices=Gender.choices)
+    passenger_category = models.CharField(max_length=20, choices=PassengerCategory.choices)
+    seat_number = models.CharField(max_length=10, null=True, blank=True)
+    created_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'reservation_passengers_archive'
+        ordering = ['passenger_type', 'created_at']
+        verbose_name = 'Pasajero archivado'
+        verbose_name_plural = 'Pasajeros archivados'
+
+    def __str__(self):
+        return f"{self.first_name} {self.last_name} (archivado)"
@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from .archiver import archive_finished
+
+
+@shared_task
+def archive_finished_rows():
+    """Punto de entrada de Celery beat: archiva vuelos y reservas terminados"""
+    summary = archive_finished()
+    return (
+        f"{summary['flights']} vuelos, {summary['reservations']} reservas y "
+        f"{summary['passengers']} pasajeros archivados."
+    )
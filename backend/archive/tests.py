@@ -0,0 +1,177 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airlines.models import Airline
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from notifications.models import ReminderKind, SentReminder
+from reservation_passengers.models import ReservationPassenger
+from reservations.models import Reservation
+
+from .archiver import archive_finished, count_candidates
+from .models import ArchivedFlight, ArchivedReservation, ArchivedReservationPassenger
+
+User = get_user_model()
+
+
+class ArchiveModelsTest(SimpleTestCase):
+    def test_columns_mirror_hot_tables(self):
+        """INSERT ... SELECT and the UNION ALL of include_archived rely on the same column order"""
+        for hot, archived in (
+            (Flight, ArchivedFlight),
+            (Reservation, ArchivedReservation),
+            (ReservationPassenger, ArchivedReservationPassenger),
+        ):
+            with self.subTest(model=archived.__name__):
+                columns = [field.column for field in archived._meta.concrete_fields]
+                self.assertEqual(columns[-1], 'archived_at')
+                self.assertEqual(columns[:-1], [field.column for field in hot._meta.concrete_fields])
+
+
+class ArchiveTestData:
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='testpass123')
+        airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        now = timezone.now()
+        old = now - timedelta(days=60)
+
+        def flight(code, departure, flight_status):
+            return Flight.objects.create(
+                flight_code=code, airline=airline, origin='Quito', destination='Guayaquil',
+                departure_datetime=departure, arrival_datetime=departure + timedelta(hours=1),
+                adult_price=Decimal('150.00'), child_price=Decimal('100.00'), available_seats=10,
+                status=flight_status,
+            )
+
+        self.old_arrived = flight('LA1001', old, 'arrived')
+        self.old_cancelled = flight('LA1002', old - timedelta(days=1), 'cancelled')
+        self.old_scheduled = flight('LA1003', old + timedelta(days=1), 'scheduled')
+        self.recent_cancelled = flight('LA1004', now - timedelta(days=5), 'cancelled')
+
+        origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        past_trip = FlightRequest.objects.create(
+            user=self.owner, origin=origin, destination=destination, travel_date=old.date()
+        )
+        next_trip = FlightRequest.objects.create(
+            user=self.owner, origin=origin, destination=destination, travel_date=now.date() + timedelta(days=5)
+        )
+
+        def reservation(code, trip, reservation_status):
+            return Reservation.objects.create(
+                reservation_code=code, user=self.owner, flight=trip, reservation_date=old,
+                total_passengers=1, total_amount=Decimal('150.00'), status=reservation_status,
+            )
+
+        self.old_cancelled_reservation = reservation('RES-0001', past_trip, 'cancelled')
+        self.old_confirmed_reservation = reservation('RES-0002', past_trip, 'confirmed')
+        self.upcoming_cancelled_reservation = reservation('RES-0003', next_trip, 'cancelled')
+        self.paid_reservation = reservation('RES-0004', past_trip, 'cancelled')
+        ReservationPassenger.objects.create(
+            reservation=self.old_cancelled_reservation, first_name='Ana', last_name='Pérez',
+            country_of_residence='Ecuador', identity_document='0912345678',
+            date_of_birth=date(1990, 5, 1), gender='F'
+        )
+        SentReminder.objects.create(
+            reservation=self.old_cancelled_reservation, reminder_kind=ReminderKind.FLIGHT_48H
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO payments (reservation_id, user_id, payment_method, amount) VALUES (%s, %s, 'cash', 150)",
+                [self.paid_reservation.pk, self.owner.pk]
+            )
+
+
+class ArchiverTest(ArchiveTestData, TestCase):
+    def test_moves_finished_rows_older_than_threshold(self):
+        self.assertEqual(count_candidates(older_than_days=30), {'flights': 2, 'reservations': 2})
+
+        summary = archive_finished(older_than_days=30, batch_size=1, pause=0)
+        self.assertEqual(summary, {'flights': 2, 'reservations': 1, 'passengers': 1})
+
+        self.assertEqual(
+            set(Flight.objects.values_list('flight_code', flat=True)), {'LA1003', 'LA1004'}
+        )
+        archived = ArchivedFlight.objects.get(pk=self.old_arrived.pk)
+        self.assertEqual(archived.flight_code, 'LA1001')
+        self.assertEqual(archived.airline_id, self.old_arrived.airline_id)
+        self.assertIsNotNone(archived.archived_at)
+
+        self.assertFalse(Reservation.objects.filter(pk=self.old_cancelled_reservation.pk).exists())
+        archived = ArchivedReservation.objects.get(pk=self.old_cancelled_reservation.pk)
+        self.assertEqual(archived.passengers.get().last_name, 'Pérez')
+        self.assertFalse(ReservationPassenger.objects.exists())
+        self.assertFalse(SentReminder.objects.exists())
+        # Confirmada, viaje futuro o con pagos: se quedan
+        self.assertEqual(Reservation.objects.count(), 3)
+        self.assertTrue(Reservation.objects.filter(pk=self.paid_reservation.pk).exists())
+
+        self.assertEqual(archive_finished(older_than_days=30, pause=0), {'flights': 0, 'reservations': 0, 'passengers': 0})
+
+    def test_max_batches_bounds_each_run(self):
+        summary = archive_finished(older_than_days=30, batch_size=1, max_batches=1, pause=0)
+        self.assertEqual(summary['flights'], 1)
+        self.assertEqual(ArchivedFlight.objects.get().pk, self.old_arrived.pk)
+
+
+class IncludeArchivedTest(ArchiveTestData, TestCase):
+    def setUp(self):
+        super().setUp()
+        archive_finished(older_than_days=30, pause=0)
+        self.client = APIClient()
+
+    def _codes(self, response, field):
+        self.assertEqual(response.status_code, 200)
+        return [row[field] for row in response.data['results']]
+
+    def test_admin_flight_list_and_detail(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self._codes(self.client.get('/api/flights/'), 'flight_code'), ['LA1003', 'LA1004'])
+
+        response = self.client.get('/api/flights/', {'include_archived': 'true'})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(self._codes(response, 'flight_code'), ['LA1002', 'LA1001', 'LA1003', 'LA1004'])
+        response = self.client.get('/api/flights/', {'include_archived': 'true', 'status': 'cancelled'})
+        self.assertEqual(self._codes(response, 'flight_code'), ['LA1002', 'LA1004'])
+
+        url = f'/api/flights/{self.old_arrived.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['flight_code'], 'LA1001')
+        self.assertEqual(response.data['airline']['code'], 'LA')
+
+    def test_non_admins_never_see_archived_rows(self):
+        response = self.client.get('/api/flights/', {'include_archived': 'true'})
+        self.assertEqual(self._codes(response, 'flight_code'), ['LA1003', 'LA1004'])
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/reservations/', {'include_archived': 'true'})
+        self.assertNotIn('RES-0001', self._codes(response, 'reservation_code'))
+        response = self.client.get(
+            f'/api/reservations/{self.old_cancelled_reservation.pk}/', {'include_archived': 'true'}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_admin_reservation_list_and_detail(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/reservations/', {'include_archived': 'true', 'ordering': 'reservation_date'})
+        self.assertEqual(response.data['count'], 4)
+        self.assertIn('RES-0001', self._codes(response, 'reservation_code'))
+
+        response = self.client.get(
+            f'/api/reservations/{self.old_cancelled_reservation.pk}/', {'include_archived': 'true'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user_info']['username'], 'owner')
+        self.assertEqual(response.data['status_display'], 'Cancelada')
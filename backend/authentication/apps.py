@@ -1,7 +1,23 @@
+from allauth.account import apps as allauth_apps
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
     verbose_name = 'Authentication'
+
+
+class AccountConfig(allauth_apps.AccountConfig):
+    """
+    allauth.account con nuestro AccountMiddleware (también async): allauth
+    0.57 exige en ready() su ruta exacta en MIDDLEWARE.
+    """
+    default = False
+
+    def ready(self):
+        required_mw = 'authentication.middleware.AccountMiddleware'
+        if required_mw not in settings.MIDDLEWARE:
+            raise ImproperlyConfigured(f'{required_mw} must be added to settings.MIDDLEWARE')
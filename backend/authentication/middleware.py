@@ -0,0 +1,37 @@
+# AccountMiddleware de allauth con soporte async nativo
+from allauth.account import middleware as allauth_middleware
+from allauth.core import context
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+
+class AccountMiddleware(allauth_middleware.AccountMiddleware):
+    """
+    La versión de allauth (0.57) solo es síncrona: bajo ASGI Django la
+    adapta y cada petición async (/api/async/) ocupa un hilo del
+    ThreadPoolExecutor durante toda la vista. Esta versión también es
+    async: el contexto de allauth usa un ContextVar y la sesión solo se
+    consulta (en un hilo) si la petición trae cookie de sesión.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        with context.request_context(request):
+            response = await self.get_response(request)
+            session = getattr(request, 'session', None)
+            # session_key no carga la sesión; sin cookie no hay login pendiente que borrar
+            if session is not None and session.session_key:
+                await sync_to_async(self._remove_dangling_login)(request, response)
+            return response
+
@@ -0,0 +1,31 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_user_options_user_city_user_country_and_more'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_document',
+            field=models.TextField(blank=True, db_column='search_document', default='', editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE auth_user SET search_document = lower(concat_ws(' ',
+                    NULLIF(username, ''), NULLIF(email, ''),
+                    NULLIF(first_name, ''), NULLIF(last_name, '')
+                ))
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='idx_user_search_document', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from search.models import SearchDocumentMixin
 
 
-class User(AbstractUser):
+class User(SearchDocumentMixin, AbstractUser):
     email = models.EmailField(unique=True)
     first_name = models.CharField(max_length=150)
     last_name = models.CharField(max_length=150)
@@ -18,8 +20,13 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    search_document_fields = ('username', 'email', 'first_name', 'last_name')
+
     class Meta:
         db_table = 'auth_user'
+        indexes = [
+            GinIndex(fields=['search_document'], name='idx_user_search_document', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -2,9 +2,12 @@ from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from search.filters import IndexedSearchFilter
 from .models import User
 from .serializers import UserSerializer
+from django.db import transaction
+from notifications import outbox
 from notifications.tasks import send_welcome_email # ¡Importamos la tarea de Celery!
 
 
@@ -16,7 +19,7 @@ class UserListView(generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['is_operator', 'is_staff', 'is_active']
     search_fields = ['username', 'email', 'first_name', 'last_name']
     ordering_fields = ['date_joined', 'created_at', 'email']
@@ -31,16 +34,17 @@ class UserListView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         """
-        Guarda el objeto User y, inmediatamente después, encola la tarea
-        para enviar el correo de bienvenida.
+        Guarda el objeto User y, en la misma transacción, deja el correo de
+        bienvenida en la bandeja de salida de notifications.
         """
-        # 1. Guarda el usuario en la base de datos (retorna el objeto User)
-        user = serializer.save() 
-        
-        # 2. DISPARAR LA TAREA DE CELERY
-        # Esto encola el envío del correo de bienvenida de forma asíncrona.
-        send_welcome_email.delay(user.id) 
-        
+        with transaction.atomic():
+            # 1. Guarda el usuario en la base de datos (retorna el objeto User)
+            user = serializer.save()
+
+            # 2. BANDEJA DE SALIDA: el despachador encola la tarea de Celery,
+            # así el request no espera al broker y no se pierde el correo.
+            outbox.enqueue(send_welcome_email, user.id)
+
         # El código 201 Created se retorna automáticamente.
 
 
@@ -0,0 +1,63 @@
+# Benchmark de conexiones: latencia por petición con conexión nueva, persistente o del pool
+import time
+
+import httpx
+from django.db import connections
+
+from monitoring.connections import get_connection_metrics
+
+from .scenarios import StepFailed, auth_headers, benchmark_user, summarize
+
+# CONN_MAX_AGE de cada modo que se compara sin pool
+CONNECTION_MODES = {
+    'per_request': 0,
+    'persistent': 60,
+}
+
+
+def _opened(alias):
+    return get_connection_metrics().get(alias, {}).get('opened', 0)
+
+
+def run_connection_benchmark(path='airlines/', requests=500, warmup=20, alias='default'):
+    """
+    Sirve `requests` peticiones GET en proceso con el handler WSGI real (que
+    cierra o conserva la conexión al terminar cada petición según
+    CONN_MAX_AGE) y devuelve la latencia y las conexiones abiertas por modo.
+    Con OPTIONS['pool'] solo se mide el pool: no se puede desactivar en caliente.
+    """
+    from config.wsgi import application
+
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    modes = {'pool': 0} if settings_dict.get('OPTIONS', {}).get('pool') else CONNECTION_MODES
+    original_max_age = settings_dict['CONN_MAX_AGE']
+    headers = auth_headers(benchmark_user('bench_client'))
+    separator = '&' if '?' in path else '?'
+    results = {}
+
+    try:
+        with httpx.Client(transport=httpx.WSGITransport(app=application), base_url='http://127.0.0.1/api/') as client:
+            for mode, max_age in modes.items():
+                # close_at se calcula al conectar: se cierra para que el nuevo valor cuente
+                connection.close()
+                settings_dict['CONN_MAX_AGE'] = max_age
+                # La URL cambia en cada petición para no servirla desde la caché
+                for index in range(warmup):
+                    client.get(f'{path}{separator}warmup={index}', headers=headers)
+
+                opened = _opened(alias)
+                latencies = []
+                for index in range(requests):
+                    start = time.perf_counter()
+                    response = client.get(f'{path}{separator}{mode}={index}', headers=headers)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    if response.status_code >= 400:
+                        raise StepFailed(f'{path} returned {response.status_code}')
+                results[mode] = dict(
+                    summarize(latencies), conn_max_age=max_age, connections_opened=_opened(alias) - opened
+                )
+    finally:
+        connection.close()
+        settings_dict['CONN_MAX_AGE'] = original_max_age
+    return results
@@ -0,0 +1,272 @@
+# Generador de datos sintéticos (volúmenes de producción) para los benchmarks
+import csv
+import io
+import random
+import time
+from array import array
+from datetime import timedelta
+from decimal import Decimal
+
+import factory.random
+from django.db import connection, transaction
+
+from authentication.models import User
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from reservation_passengers.models import PassengerType, ReservationPassenger, normalize_document
+from reservations.models import Reservation
+
+from .factories import (
+    AirlineFactory,
+    DestinationFactory,
+    FlightFactory,
+    FlightRequestFactory,
+    ReservationFactory,
+    ReservationPassengerFactory,
+    UserFactory,
+)
+
+# Volúmenes objetivo (--scale los multiplica)
+DEFAULT_SIZES = {
+    'airlines': 100,
+    'destinations': 500,
+    'users': 1_000_000,
+    'flights': 1_000_000,
+    'reservations': 5_000_000,
+    'passengers': 15_000_000,
+}
+
+# Filas por COPY (y por transacción)
+COPY_BATCH_SIZE = 50_000
+
+# Objetos construidos con las factories por tabla grande; cada fila copia uno
+# al azar y cambia solo claves, ids y fechas (Faker por fila costaría ~250µs)
+TEMPLATE_POOL_SIZE = 5_000
+
+COPY_NULL = r'\N'
+
+
+def scaled_sizes(scale=1.0, **overrides):
+    """DEFAULT_SIZES multiplicados por `scale` (mínimo 1 fila por tabla)"""
+    sizes = {name: max(1, int(size * scale)) for name, size in DEFAULT_SIZES.items()}
+    sizes.update({name: value for name, value in overrides.items() if value is not None})
+    return sizes
+
+
+class _Table:
+    """COPY de filas de un modelo con ids reservados de su propia secuencia"""
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model._meta.concrete_fields
+        self.table = model._meta.db_table
+        self.columns = [field.column for field in self.fields]
+        self.attnames = [field.attname for field in self.fields]
+        self.rows = 0
+
+    def template(self, instance):
+        """Valores de BD (por attname) de un objeto construido por una factory"""
+        return {
+            field.attname: field.get_db_prep_save(field.pre_save(instance, True), connection)
+            for field in self.fields
+        }
+
+    def reserve_ids(self, cursor, count):
+        # nextval en bloque: los ids quedan consumidos y la secuencia coherente
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [self.table, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def copy(self, cursor, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([COPY_NULL if row[name] is None else row[name] for name in self.attnames])
+        # NULL '\N': así '' sigue siendo una cadena vacía y no NULL
+        with cursor.copy(
+            f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        ) as copy:
+            copy.write(buffer.getvalue())
+        self.rows += len(rows)
+
+
+def _search_document(*values):
+    """Igual que search.models.build_search_document, sobre valores ya resueltos"""
+    return ' '.join(str(value) for value in values if value not in (None, '')).lower()
+
+
+def _route(places):
+    """Origen y destino distintos (salvo que solo haya uno)"""
+    return tuple(random.sample(places, 2)) if len(places) > 1 else (places[0], places[0])
+
+
+def _templates(table, factory_class, count, **kwargs):
+    return [table.template(factory_class.build(**kwargs)) for _ in range(count)]
+
+
+def _batches(total, size):
+    done = 0
+    while done < total:
+        yield min(size, total - done)
+        done += size
+
+
+class DatasetGenerator:
+    """
+    Carga el dominio completo (aerolíneas, destinos, usuarios, vuelos,
+    solicitudes, reservas y pasajeros) con COPY por lotes. Las tablas
+    pequeñas se crean con las factories tal cual; las grandes a partir de
+    un conjunto de plantillas generadas por ellas. Cada reserva tiene su
+    solicitud de vuelo y entre 1 y 2*(pasajeros/reservas)-1 pasajeros.
+    """
+
+    def __init__(self, sizes, batch_size=COPY_BATCH_SIZE, seed=None, log=None,
+                 template_pool_size=TEMPLATE_POOL_SIZE):
+        self.sizes = sizes
+        self.batch_size = batch_size
+        self.template_pool_size = template_pool_size
+        self.log = log or (lambda message: None)
+        if seed is not None:
+            random.seed(seed)
+            factory.random.reseed_random(seed)  # también siembra Faker
+
+    def run(self):
+        started = time.perf_counter()
+        self.airlines = self._small(AirlineFactory, self.sizes['airlines'])
+        self.destinations = self._small(DestinationFactory, self.sizes['destinations'])
+        self.user_ids = self._users(self.sizes['users'])
+        self._flights(self.sizes['flights'])
+        self._bookings(self.sizes['reservations'], self.sizes['passengers'])
+
+        with connection.cursor() as cursor:
+            for model in (User, Flight, FlightRequest, Reservation, ReservationPassenger):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        return {
+            'seconds': round(time.perf_counter() - started, 1),
+            'rows': {
+                'airlines': len(self.airlines),
+                'destinations': len(self.destinations),
+                'users': len(self.user_ids),
+                'flights': self.flight_table.rows,
+                'flight_requests': self.request_table.rows,
+                'reservations': self.reservation_table.rows,
+                'passengers': self.passenger_table.rows,
+            },
+        }
+
+    def _small(self, factory_class, count):
+        objects = factory_class._meta.model.objects.bulk_create(factory_class.build_batch(count))
+        self.log(f'{factory_class._meta.model._meta.db_table}: {count}')
+        return objects
+
+    def _users(self, total):
+        table = _Table(User)
+        templates = _templates(table, UserFactory, self.template_pool_size)
+        ids = array('q')
+        for count in _batches(total, self.batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                rows = []
+                for user_id in table.reserve_ids(cursor, count):
+                    row = dict(random.choice(templates))
+                    username = f'bench_{user_id}'
+                    row.update(
+                        id=user_id, username=username, email=f'{username}@example.com',
+                        search_document=_search_document(
+                            username, f'{username}@example.com', row['first_name'], row['last_name']
+                        ),
+                    )
+                    rows.append(row)
+                    ids.append(user_id)
+                table.copy(cursor, rows)
+            self.log(f'{table.table}: {table.rows}/{total}')
+        return ids
+
+    def _flights(self, total):
+        table = self.flight_table = _Table(Flight)
+        templates = _templates(table, FlightFactory, self.template_pool_size, airline=self.airlines[0])
+        cities = [destination.name for destination in self.destinations]
+        for count in _batches(total, self.batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                rows = []
+                for flight_id in table.reserve_ids(cursor, count):
+                    row = dict(random.choice(templates))
+                    airline = random.choice(self.airlines)
+                    origin, destination = _route(cities)
+                    flight_code = f'{airline.code}{flight_id}'
+                    row.update(
+                        id=flight_id, flight_code=flight_code, airline_id=airline.id,
+                        origin=origin, destination=destination,
+                        search_document=_search_document(
+                            flight_code, airline.name, origin, destination, row['notes']
+                        ),
+                    )
+                    rows.append(row)
+                table.copy(cursor, rows)
+            self.log(f'{table.table}: {table.rows}/{total}')
+
+    def _bookings(self, total, total_passengers):
+        self.request_table = _Table(FlightRequest)
+        self.reservation_table = _Table(Reservation)
+        self.passenger_table = _Table(ReservationPassenger)
+        request_templates = _templates(
+            self.request_table, FlightRequestFactory, self.template_pool_size,
+            user=None, origin=self.destinations[0], destination=self.destinations[-1]
+        )
+        reservation_templates = _templates(
+            self.reservation_table, ReservationFactory, self.template_pool_size, user=None, flight=None
+        )
+        passenger_templates = _templates(
+            self.passenger_table, ReservationPassengerFactory, self.template_pool_size, reservation=None
+        )
+        # Media de pasajeros por reserva; cada reserva recibe 1..2*media-1
+        max_passengers = max(1, round(2 * total_passengers / total) - 1)
+        destination_ids = [destination.id for destination in self.destinations]
+
+        for count in _batches(total, self.batch_size):
+            with transaction.atomic(), connection.cursor() as cursor:
+                requests, reservations, passengers = [], [], []
+                request_ids = self.request_table.reserve_ids(cursor, count)
+                reservation_ids = self.reservation_table.reserve_ids(cursor, count)
+                sizes = [random.randint(1, max_passengers) for _ in range(count)]
+                passenger_ids = iter(self.passenger_table.reserve_ids(cursor, sum(sizes)))
+
+                for request_id, reservation_id, size in zip(request_ids, reservation_ids, sizes):
+                    user_id = self.user_ids[random.randrange(len(self.user_ids))]
+                    request = dict(random.choice(request_templates))
+                    origin_id, destination_id = _route(destination_ids)
+                    request.update(
+                        id=request_id, user_id=user_id, origin_id=origin_id, destination_id=destination_id,
+                        companions=size,
+                    )
+                    requests.append(request)
+
+                    reservation = dict(random.choice(reservation_templates))
+                    reservation.update(
+                        id=reservation_id, reservation_code=f'BEN-{reservation_id}',
+                        user_id=user_id, flight_id=request_id,
+                        total_passengers=size, total_amount=Decimal(random.randint(60, 900)) * size,
+                        created_at=reservation['reservation_date'], updated_at=reservation['reservation_date'],
+                    )
+                    reservations.append(reservation)
+
+                    for index in range(size):
+                        passenger_id = next(passenger_ids)
+                        passenger = dict(random.choice(passenger_templates))
+                        document = f'{passenger_id % 24 + 1:02d}{passenger_id:08d}'
+                        passenger.update(
+                            id=passenger_id, reservation_id=reservation_id,
+                            passenger_type=PassengerType.MAIN if index == 0 else PassengerType.COMPANION,
+                            identity_document=document, identity_document_normalized=normalize_document(document),
+                            created_at=reservation['reservation_date'] + timedelta(seconds=index),
+                            search_document=_search_document(
+                                passenger['first_name'], passenger['last_name'], document, passenger['seat_number']
+                            ),
+                        )
+                        passengers.append(passenger)
+
+                self.request_table.copy(cursor, requests)
+                self.reservation_table.copy(cursor, reservations)
+                self.passenger_table.copy(cursor, passengers)
+            self.log(f'reservations: {self.reservation_table.rows}/{total}, passengers: {self.passenger_table.rows}')
@@ -0,0 +1,167 @@
+# Factories (factory_boy + Faker) del dominio de reservas para benchmarks y pruebas
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+import factory
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from airlines.models import Airline
+from authentication.models import User
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from reservation_passengers.models import Gender, PassengerCategory, PassengerType, ReservationPassenger
+from reservations.models import Reservation, ReservationStatus
+
+FAKER_LOCALE = 'es_ES'
+
+# Provincias de Ecuador y su caja de coordenadas aproximada
+PROVINCES = [
+    'Azuay', 'Bolívar', 'Cañar', 'Carchi', 'Chimborazo', 'Cotopaxi', 'El Oro', 'Esmeraldas',
+    'Galápagos', 'Guayas', 'Imbabura', 'Loja', 'Los Ríos', 'Manabí', 'Morona Santiago', 'Napo',
+    'Orellana', 'Pastaza', 'Pichincha', 'Santa Elena', 'Santo Domingo de los Tsáchilas',
+    'Sucumbíos', 'Tungurahua', 'Zamora Chinchipe',
+]
+LATITUDE_RANGE = (-5.0, 1.4)
+LONGITUDE_RANGE = (-81.0, -75.2)
+
+# Contraseña inutilizable: los usuarios sintéticos se autentican con JWT emitidos
+# por el propio benchmark y así no se paga un hash PBKDF2 por fila
+UNUSABLE_PASSWORD = '!benchmark'
+
+fake = Faker(FAKER_LOCALE)
+
+
+def faker(provider, **kwargs):
+    return factory.Faker(provider, locale=FAKER_LOCALE, **kwargs)
+
+
+def _weighted(choices):
+    """Elige un valor de [(valor, peso), ...]"""
+    values, weights = zip(*choices)
+    return factory.LazyFunction(lambda: random.choices(values, weights)[0])
+
+
+def _money(low, high):
+    return factory.LazyFunction(lambda: Decimal(random.randint(low * 100, high * 100)) / 100)
+
+
+class _ModelFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def _setup_next_sequence(cls):
+        # Las secuencias siguen tras el id más alto: se puede generar otra vez sobre la misma BD
+        return (cls._meta.model.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+
+
+class AirlineFactory(_ModelFactory):
+    class Meta:
+        model = Airline
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{fake.company()} Airlines {n}')
+    code = factory.Sequence(lambda n: f'B{n:03d}')
+    logo_url = faker('image_url')
+
+
+class DestinationFactory(_ModelFactory):
+    class Meta:
+        model = Destination
+
+    name = factory.LazyAttributeSequence(lambda o, n: f'{fake.city()} {n}')
+    code = factory.Sequence(lambda n: f'D{n:04d}')
+    province = factory.LazyFunction(lambda: random.choice(PROVINCES))
+    latitude = factory.LazyFunction(lambda: Decimal(f'{random.uniform(*LATITUDE_RANGE):.6f}'))
+    longitude = factory.LazyFunction(lambda: Decimal(f'{random.uniform(*LONGITUDE_RANGE):.6f}'))
+    is_active = _weighted([(True, 9), (False, 1)])
+
+
+class UserFactory(_ModelFactory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f'bench_user{n}')
+    email = factory.LazyAttribute(lambda o: f'{o.username}@example.com')
+    password = UNUSABLE_PASSWORD
+    first_name = faker('first_name')
+    last_name = faker('last_name')
+    phone = faker('numerify', text='09########')  # celular de Ecuador (max_length=15)
+    date_of_birth = faker('date_of_birth', minimum_age=18, maximum_age=80)
+    country = 'Ecuador'
+    city = faker('city')
+
+
+class FlightFactory(_ModelFactory):
+    class Meta:
+        model = Flight
+
+    airline = factory.SubFactory(AirlineFactory)
+    flight_code = factory.LazyAttributeSequence(lambda o, n: f'{o.airline.code}{n:07d}')
+    origin = faker('city')
+    destination = faker('city')
+    departure_datetime = factory.LazyFunction(
+        lambda: timezone.now().replace(minute=0, second=0, microsecond=0)
+        + timedelta(hours=random.randint(-24 * 30, 24 * 180))
+    )
+    arrival_datetime = factory.LazyAttribute(
+        lambda o: o.departure_datetime + timedelta(minutes=random.randint(45, 12 * 60))
+    )
+    number_of_stops = _weighted([(0, 7), (1, 2), (2, 1)])
+    adult_price = _money(60, 900)
+    child_price = factory.LazyAttribute(lambda o: (o.adult_price * Decimal('0.75')).quantize(Decimal('0.01')))
+    available_seats = factory.LazyFunction(lambda: random.randint(0, 220))
+    # Solo valores que aceptan tanto los choices como el CHECK de la tabla
+    status = _weighted([('scheduled', 90), ('delayed', 6), ('cancelled', 4)])
+
+
+class FlightRequestFactory(_ModelFactory):
+    class Meta:
+        model = FlightRequest
+
+    user = factory.SubFactory(UserFactory)
+    origin = factory.SubFactory(DestinationFactory)
+    destination = factory.SubFactory(DestinationFactory)
+    travel_date = factory.LazyFunction(lambda: timezone.localdate() + timedelta(days=random.randint(-30, 180)))
+    status = _weighted([('PENDING', 2), ('CONFIRMED', 7), ('CANCELLED', 1)])
+    companions = factory.LazyFunction(lambda: random.randint(1, 5))
+
+
+class ReservationFactory(_ModelFactory):
+    class Meta:
+        model = Reservation
+
+    reservation_code = factory.Sequence(lambda n: f'BEN-{n:09d}')
+    user = factory.SubFactory(UserFactory)
+    flight = factory.SubFactory(FlightRequestFactory, user=factory.SelfAttribute('..user'))
+    reservation_date = factory.LazyFunction(lambda: timezone.now() - timedelta(minutes=random.randint(0, 60 * 24 * 365)))
+    total_passengers = factory.LazyFunction(lambda: random.randint(1, 5))
+    total_amount = factory.LazyAttribute(lambda o: Decimal(random.randint(60, 900)) * o.total_passengers)
+    status = _weighted([
+        (ReservationStatus.PENDING, 2), (ReservationStatus.CONFIRMED, 7), (ReservationStatus.CANCELLED, 1),
+    ])
+
+
+class ReservationPassengerFactory(_ModelFactory):
+    class Meta:
+        model = ReservationPassenger
+
+    reservation = factory.SubFactory(ReservationFactory)
+    passenger_type = PassengerType.COMPANION
+    first_name = faker('first_name')
+    last_name = faker('last_name')
+    country_of_residence = _weighted([('Ecuador', 8), ('Colombia', 1), ('Perú', 1)])
+    identity_document = factory.Sequence(lambda n: f'{n % 24 + 1:02d}{n:08d}')
+    date_of_birth = faker('date_of_birth', minimum_age=0, maximum_age=85)
+    # El CHECK de reservation_passengers no admite 'O' ni 'infant'
+    gender = _weighted([(Gender.MALE, 1), (Gender.FEMALE, 1)])
+    passenger_category = factory.LazyAttribute(
+        lambda o: PassengerCategory.ADULT if o.date_of_birth.year <= timezone.localdate().year - 12
+        else PassengerCategory.CHILD
+    )
+    seat_number = factory.LazyFunction(
+        lambda: f'{random.randint(1, 40)}{random.choice("ABCDEF")}' if random.random() < 0.6 else None
+    )
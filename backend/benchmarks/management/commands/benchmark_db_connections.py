@@ -0,0 +1,47 @@
+# benchmarks/management/commands/benchmark_db_connections.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.connections import run_connection_benchmark
+from benchmarks.scenarios import StepFailed, git_revision
+
+
+class Command(BaseCommand):
+    """
+    Compara la latencia por petición abriendo una conexión a Postgres en
+    cada petición (CONN_MAX_AGE=0) y reutilizándola (CONN_MAX_AGE>0), o la
+    del pool si DB_POOL está activo. La diferencia de p50 es el coste de
+    conectar (TCP, TLS y autenticación) que ahorra la reutilización.
+    """
+    help = 'Mide el ahorro por petición de las conexiones persistentes o del pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='airlines/', help='Ruta bajo /api/ que se pide (GET autenticado).')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--output', help='Guardar los resultados en este archivo JSON.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests debe ser al menos 1')
+        try:
+            results = run_connection_benchmark(options['path'], options['requests'], options['warmup'])
+        except StepFailed as exc:
+            raise CommandError(str(exc))
+
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<12} CONN_MAX_AGE={result['conn_max_age']:<4} p50={result['p50_ms']:8.2f}ms "
+                f"p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms "
+                f"conexiones abiertas={result['connections_opened']}"
+            )
+        if {'per_request', 'persistent'} <= set(results):
+            saved = results['per_request']['p50_ms'] - results['persistent']['p50_ms']
+            self.stdout.write(self.style.SUCCESS(f'Ahorro por petición (p50): {saved:.2f}ms'))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({**git_revision(), 'path': options['path'], 'modes': results}, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
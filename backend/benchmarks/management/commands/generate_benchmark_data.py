@@ -0,0 +1,39 @@
+# benchmarks/management/commands/generate_benchmark_data.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.dataset import COPY_BATCH_SIZE, DEFAULT_SIZES, DatasetGenerator, scaled_sizes
+
+
+class Command(BaseCommand):
+    """
+    Genera el conjunto de datos sintético de los benchmarks sobre la BD
+    configurada (nunca en producción). Con --scale 1 son los volúmenes de
+    DEFAULT_SIZES: 100 aerolíneas, 500 destinos, 1M usuarios, 1M vuelos,
+    5M reservas (con su solicitud de vuelo) y 15M pasajeros.
+
+        python manage.py generate_benchmark_data --scale 0.01 --seed 42
+    """
+    help = 'Carga datos sintéticos realistas (factory_boy + Faker) para los benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplicador de los volúmenes por defecto.')
+        for name in DEFAULT_SIZES:
+            parser.add_argument(f'--{name}', type=int, help=f'Filas de {name} (ignora --scale).')
+        parser.add_argument('--batch-size', type=int, default=COPY_BATCH_SIZE, help='Filas por COPY.')
+        parser.add_argument('--seed', type=int, help='Semilla de random/Faker para repetir el mismo conjunto.')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale debe ser mayor que 0')
+        sizes = scaled_sizes(options['scale'], **{name: options[name] for name in DEFAULT_SIZES})
+        self.stdout.write(f'Generando: {json.dumps(sizes)}')
+
+        summary = DatasetGenerator(
+            sizes, batch_size=options['batch_size'], seed=options['seed'], log=self.stdout.write
+        ).run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos generados en {summary['seconds']}s: {json.dumps(summary['rows'])}"
+        ))
@@ -0,0 +1,93 @@
+# benchmarks/management/commands/run_benchmarks.py
+
+import asyncio
+import json
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from benchmarks.scenarios import SCENARIOS, BenchmarkContext, dataset_size, git_revision, run_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta los escenarios end-to-end (navegación del catálogo, búsqueda de
+    rutas, reserva con alta de pasajeros y estadísticas de administración)
+    contra Postgres y Redis locales, y guarda throughput y latencias
+    p50/p95/p99 en JSON junto con el commit y el tamaño de los datos:
+
+        gunicorn config.wsgi --workers 4 --bind 127.0.0.1:8000
+        python manage.py run_benchmarks --target http://127.0.0.1:8000/api/ \\
+            --iterations 500 --concurrency 20 --output bench-$(git rev-parse --short HEAD).json
+
+    Sin --target las peticiones van en proceso a la aplicación ASGI: no hace
+    falta servidor, pero el ORM se serializa en un hilo y la concurrencia
+    no es representativa. La reserva escribe datos nuevos en cada iteración.
+    """
+    help = 'Benchmark end-to-end del dominio de reservas con salida JSON comparable entre commits.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', help='URL base de la API (p. ej. http://127.0.0.1:8000/api/).')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios', choices=list(SCENARIOS),
+            help='Escenario a ejecutar; se puede repetir (por defecto todos).'
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Iteraciones por escenario.')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--output', help='Guardar los resultados en este archivo JSON.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--iterations y --concurrency deben ser al menos 1')
+        scenarios = options['scenarios'] or list(SCENARIOS)
+        ctx = BenchmarkContext()
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'target': options['target'] or 'in-process (ASGI)',
+            **git_revision(),
+            'dataset': dataset_size(),
+            'options': {key: options[key] for key in ('iterations', 'concurrency')},
+        }
+        report['scenarios'] = asyncio.run(self._run(ctx, scenarios, options))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
+
+    async def _run(self, ctx, scenarios, options):
+        if options['target']:
+            base_url = options['target'] if options['target'].endswith('/') else options['target'] + '/'
+            transport = None
+        else:
+            from config.asgi import application
+            # Como PROCESS_TYPE=asgi: el código síncrono corre en un hilo por
+            # petición y una conexión persistente quedaría huérfana en él
+            for connection in connections.all():
+                connection.settings_dict['CONN_MAX_AGE'] = 0
+            base_url = 'http://127.0.0.1/api/'
+            transport = httpx.ASGITransport(app=application)
+
+        limits = httpx.Limits(max_connections=options['concurrency'], max_keepalive_connections=options['concurrency'])
+        async with httpx.AsyncClient(
+            base_url=base_url, transport=transport, limits=limits, timeout=options['timeout']
+        ) as client:
+            return await run_benchmarks(
+                client, ctx, scenarios, options['iterations'], options['concurrency'], log=self._log
+            )
+
+    def _log(self, name, result):
+        latency = result['latency']
+        self.stdout.write(
+            f"{name:<18} {result['iterations_per_second']:8.1f} it/s {result['requests_per_second']:8.1f} req/s  "
+            f"p50={latency['p50_ms']:7.1f}ms p95={latency['p95_ms']:7.1f}ms p99={latency['p99_ms']:7.1f}ms  "
+            f"fallidas={result['failed_iterations']}"
+        )
+        for step, summary in result['steps'].items():
+            self.stdout.write(
+                f"    {step:<38} p50={summary['p50_ms']:7.1f}ms p95={summary['p95_ms']:7.1f}ms "
+                f"p99={summary['p99_ms']:7.1f}ms errores={summary['errors']}"
+            )
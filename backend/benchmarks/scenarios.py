@@ -0,0 +1,267 @@
+# Escenarios end-to-end del benchmark (httpx) y resumen de throughput/latencias
+import asyncio
+import math
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import httpx
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+from destinations.models import Destination
+from flights.models import Flight
+
+from .factories import UNUSABLE_PASSWORD, ReservationPassengerFactory
+
+# Muestras tomadas de la BD al preparar la ejecución
+SAMPLE_SIZE = 1000
+
+# Tablas cuyo tamaño (estimado por pg_class) se guarda con cada resultado
+DATASET_TABLES = [
+    'airlines', 'destinations', 'auth_user', 'flights',
+    'flightrequests', 'reservations', 'reservation_passengers',
+]
+
+
+class StepFailed(Exception):
+    """A request of a scenario failed; the rest of the iteration is skipped"""
+
+
+def percentile(sorted_values, q):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values), 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'max_ms': round(values[-1], 3) if values else 0.0,
+    }
+
+
+def benchmark_user(username, is_staff=False):
+    """Usuario de prueba del benchmark (se autentica con JWT, sin contraseña)"""
+    user, _created = User.objects.get_or_create(
+        username=username,
+        defaults={
+            'email': f'{username}@example.com', 'password': UNUSABLE_PASSWORD,
+            'first_name': 'Benchmark', 'last_name': username,
+            'is_staff': is_staff, 'is_superuser': is_staff,
+        }
+    )
+    return user
+
+
+def auth_headers(user, lifetime=timedelta(hours=6)):
+    token = AccessToken.for_user(user)
+    token.set_exp(lifetime=lifetime)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _local_date(value):
+    # Las columnas de fecha de la BD heredada son "timestamp without time zone"
+    return (timezone.localtime(value) if timezone.is_aware(value) else value).date()
+
+
+class BenchmarkContext:
+    """
+    Datos reales de la BD para parametrizar los escenarios (ids, rutas,
+    destinos) y tokens JWT de un cliente y de un administrador de prueba.
+    Se prepara de forma síncrona, antes de entrar al bucle asyncio.
+    """
+
+    def __init__(self, token_lifetime=timedelta(hours=6)):
+        self.client_user = benchmark_user('bench_client', is_staff=False)
+        self.admin_user = benchmark_user('bench_admin', is_staff=True)
+        self.client_headers = auth_headers(self.client_user, token_lifetime)
+        self.admin_headers = auth_headers(self.admin_user, token_lifetime)
+
+        self.flight_ids = list(Flight.objects.order_by('?').values_list('id', flat=True)[:SAMPLE_SIZE])
+        # Solo las 100 primeras páginas (PAGE_SIZE 10): las profundas miden el OFFSET
+        self.flight_pages = max(1, math.ceil(len(self.flight_ids) / 10) if len(self.flight_ids) < 1000 else 100)
+        self.routes = [
+            (origin, destination, _local_date(departure).isoformat())
+            for origin, destination, departure in Flight.objects.filter(status='scheduled')
+            .order_by('?').values_list('origin', 'destination', 'departure_datetime')[:SAMPLE_SIZE]
+        ]
+        self.destination_ids = list(Destination.objects.values_list('id', flat=True)[:SAMPLE_SIZE])
+        # Pasajeros ya construidos: las factories consultan la BD y no pueden
+        # llamarse desde el bucle asyncio
+        self.passengers = [self._passenger_payload() for _ in range(100)]
+
+    def _passenger_payload(self):
+        passenger = ReservationPassengerFactory.build(reservation=None)
+        return {
+            field: getattr(passenger, field)
+            for field in (
+                'first_name', 'last_name', 'country_of_residence', 'identity_document',
+                'gender', 'passenger_category', 'seat_number',
+            )
+        } | {'date_of_birth': passenger.date_of_birth.isoformat()}
+
+
+class Recorder:
+    """Ejecuta peticiones de un escenario y guarda la latencia de cada paso"""
+
+    def __init__(self, client):
+        self.client = client
+        self.steps = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, step, method, url, headers=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response, failed = None, True
+        self.steps[step].append((time.perf_counter() - start) * 1000)
+        if failed:
+            self.errors[step] += 1
+            raise StepFailed(step)
+        return response
+
+
+async def catalog_browsing(run, ctx):
+    """Listado paginado de vuelos, un detalle, destinos activos y aerolíneas"""
+    await run.request('flights.list', 'GET', f'flights/?page={random.randint(1, ctx.flight_pages)}')
+    if ctx.flight_ids:
+        await run.request('flights.retrieve', 'GET', f'flights/{random.choice(ctx.flight_ids)}/')
+    await run.request('destinations.active', 'GET', 'destinations/active/', headers=ctx.client_headers)
+    await run.request('airlines.list', 'GET', 'airlines/', headers=ctx.client_headers)
+
+
+async def route_search(run, ctx):
+    """Búsqueda de una ruta existente en una fecha concreta"""
+    origin, destination, day = random.choice(ctx.routes) if ctx.routes else ('Quito', 'Guayaquil', '')
+    query = urlencode({'origin': origin, 'destination': destination, 'date': day})
+    await run.request('flights.search_route', 'GET', f'flights/search_route/?{query}')
+
+
+async def booking(run, ctx):
+    """Solicitud de vuelo, reserva y alta de todos sus pasajeros con bulk_create"""
+    origin, destination = random.sample(ctx.destination_ids, 2) if len(ctx.destination_ids) > 1 else ctx.destination_ids * 2
+    passengers = random.sample(ctx.passengers, random.randint(1, 5))
+    headers = ctx.client_headers
+    flight_request = await run.request('flight_requests.create', 'POST', 'flight-requests/', headers=headers, json={
+        'origin': origin,
+        'destination': destination,
+        'travel_date': (timezone.localdate() + timedelta(days=random.randint(1, 180))).isoformat(),
+        'companions': len(passengers),
+    })
+    reservation = await run.request('reservations.create', 'POST', 'reservations/', headers=headers, json={
+        'user': ctx.client_user.id,
+        'flight': flight_request.json()['id'],
+        'reservation_date': timezone.now().isoformat(),
+        'total_passengers': len(passengers),
+        'total_amount': str(150 * len(passengers)),
+    })
+    reservation_id = reservation.json()['id']
+    await run.request('reservation_passengers.bulk_create', 'POST', 'reservation-passengers/bulk_create/', headers=headers, json={
+        'passengers': [
+            dict(passenger, reservation=reservation_id, passenger_type='main' if index == 0 else 'companion')
+            for index, passenger in enumerate(passengers)
+        ]
+    })
+
+
+async def admin_statistics(run, ctx):
+    """Paneles de estadísticas del administrador"""
+    await run.request('reservations.statistics', 'GET', 'reservations/statistics/', headers=ctx.admin_headers)
+    await run.request(
+        'reservation_passengers.statistics', 'GET', 'reservation-passengers/statistics/', headers=ctx.admin_headers
+    )
+
+
+SCENARIOS = {
+    'catalog_browsing': catalog_browsing,
+    'route_search': route_search,
+    'booking': booking,
+    'admin_statistics': admin_statistics,
+}
+
+
+async def run_scenario(client, scenario, ctx, iterations, concurrency):
+    """Ejecuta `iterations` veces el escenario con `concurrency` clientes simultáneos"""
+    run = Recorder(client)
+    durations = []
+    failed = 0
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining, failed
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                await scenario(run, ctx)
+            except StepFailed:
+                failed += 1
+                continue
+            durations.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, iterations)))))
+    elapsed = time.perf_counter() - started
+
+    requests = sum(len(latencies) for latencies in run.steps.values())
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'failed_iterations': failed,
+        'seconds': round(elapsed, 3),
+        'iterations_per_second': round(iterations / elapsed, 3) if elapsed else 0.0,
+        'requests_per_second': round(requests / elapsed, 3) if elapsed else 0.0,
+        'latency': summarize(durations),
+        'steps': {
+            step: dict(summarize(latencies), errors=run.errors[step])
+            for step, latencies in sorted(run.steps.items())
+        },
+    }
+
+
+async def run_benchmarks(client, ctx, scenarios, iterations, concurrency, log=None):
+    results = {}
+    for name in scenarios:
+        results[name] = await run_scenario(client, SCENARIOS[name], ctx, iterations, concurrency)
+        if log:
+            log(name, results[name])
+    return results
+
+
+def dataset_size():
+    """Filas estimadas (pg_class.reltuples, sin COUNT(*)) de las tablas del dominio"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s) AND relkind IN (%s, %s)',
+            [DATASET_TABLES, 'r', 'p']
+        )
+        return dict(cursor.fetchall())
+
+
+def git_revision():
+    """Commit actual (y si hay cambios sin commitear) para comparar ejecuciones"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
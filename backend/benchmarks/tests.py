@@ -0,0 +1,107 @@
+import httpx
+from asgiref.sync import async_to_sync
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase
+
+from authentication.models import User
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from reservation_passengers.models import PassengerType, ReservationPassenger
+from reservations.models import Reservation
+
+from .dataset import DatasetGenerator, scaled_sizes
+from .scenarios import SCENARIOS, BenchmarkContext, percentile, run_benchmarks, summarize
+
+TINY_SIZES = {
+    'airlines': 2, 'destinations': 4, 'users': 30, 'flights': 40,
+    'reservations': 50, 'passengers': 150,
+}
+
+
+class StatisticsTest(TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_summarize(self):
+        summary = summarize([30.0, 10.0, 20.0])
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['mean_ms'], 20.0)
+        self.assertEqual(summary['p50_ms'], 20.0)
+        self.assertEqual(summary['max_ms'], 30.0)
+        self.assertEqual(summarize([])['count'], 0)
+
+    def test_scaled_sizes(self):
+        sizes = scaled_sizes(0.001, users=7)
+        self.assertEqual(sizes['reservations'], 5000)
+        self.assertEqual(sizes['airlines'], 1)
+        self.assertEqual(sizes['users'], 7)
+
+
+class DatasetGeneratorTest(TestCase):
+    def setUp(self):
+        self.summary = DatasetGenerator(TINY_SIZES, batch_size=20, seed=1, template_pool_size=20).run()
+
+    def test_row_counts(self):
+        rows = self.summary['rows']
+        self.assertEqual(rows['users'], 30)
+        self.assertEqual(rows['flights'], 40)
+        self.assertEqual(rows['reservations'], 50)
+        self.assertEqual(rows['flight_requests'], 50)
+        self.assertEqual(Reservation.objects.count(), 50)
+        self.assertEqual(FlightRequest.objects.count(), 50)
+        self.assertEqual(ReservationPassenger.objects.count(), rows['passengers'])
+        self.assertGreaterEqual(User.objects.count(), 30)
+        self.assertEqual(Flight.objects.count(), 40)
+
+    def test_reservations_are_consistent(self):
+        reservation = Reservation.objects.select_related('flight').order_by('id').first()
+        passengers = reservation.passengers.order_by('id')
+        self.assertEqual(passengers.count(), reservation.total_passengers)
+        self.assertEqual(passengers[0].passenger_type, PassengerType.MAIN)
+        self.assertEqual(reservation.flight.user_id, reservation.user_id)
+        self.assertEqual(reservation.flight.companions, reservation.total_passengers)
+
+    def test_search_documents_are_populated(self):
+        passenger = ReservationPassenger.objects.order_by('id').first()
+        self.assertIn(passenger.identity_document, passenger.search_document)
+        self.assertIn(passenger.first_name.lower(), passenger.search_document)
+        flight = Flight.objects.order_by('id').first()
+        self.assertIn(flight.flight_code.lower(), flight.search_document)
+
+    def test_generating_twice_appends_rows(self):
+        DatasetGenerator(TINY_SIZES, batch_size=20, seed=2, template_pool_size=20).run()
+        self.assertEqual(Reservation.objects.count(), 100)
+
+
+class ScenarioTest(TestCase):
+    def setUp(self):
+        # Como el test client de Django: cerrar la conexión al acabar cada
+        # petición rompería la transacción del test
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def test_all_scenarios_run_in_process(self):
+        from config.asgi import application
+
+        DatasetGenerator(TINY_SIZES, seed=3, template_pool_size=20).run()
+        ctx = BenchmarkContext()
+
+        async def run():
+            async with httpx.AsyncClient(
+                base_url='http://127.0.0.1/api/', transport=httpx.ASGITransport(app=application)
+            ) as client:
+                return await run_benchmarks(client, ctx, list(SCENARIOS), iterations=2, concurrency=1)
+
+        results = async_to_sync(run)()
+        self.assertEqual(set(results), set(SCENARIOS))
+        for name, result in results.items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['failed_iterations'], 0)
+                self.assertEqual(result['latency']['count'], 2)
@@ -0,0 +1,8 @@
+# App configuration for catalog app
+from django.apps import AppConfig
+
+
+class CatalogConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'catalog'
+    verbose_name = 'Async Catalog'
@@ -0,0 +1,55 @@
+# Cliente Redis asíncrono compatible con las claves de django-redis
+import asyncio
+import pickle
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from redis import asyncio as aioredis
+
+# Un cliente por event loop: las conexiones de redis.asyncio no se pueden
+# compartir entre loops (tests, varios workers en el mismo proceso). El pool
+# es bloqueante: miles de peticiones concurrentes esperan turno en lugar de
+# abrir miles de conexiones a Redis.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            settings.CACHES['default']['LOCATION'],
+            max_connections=settings.ASYNC_REDIS_MAX_CONNECTIONS,
+        )
+        client = _clients[loop] = aioredis.Redis(connection_pool=pool)
+    return client
+
+
+def _decode(value):
+    # Igual que django_redis.client.DefaultClient.decode
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return pickle.loads(value)
+
+
+def _encode(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return pickle.dumps(value, settings.CACHES['default'].get('OPTIONS', {}).get('PICKLE_VERSION', -1))
+
+
+async def aget(key, default=None):
+    """cache.get() sin bloquear el event loop; comparte entradas con las vistas síncronas"""
+    value = await get_client().get(cache.make_key(key))
+    return default if value is None else _decode(value)
+
+
+async def aset(key, value, timeout=None):
+    """cache.set() asíncrono (timeout en segundos, por defecto API_CACHE_TIMEOUT)"""
+    await get_client().set(
+        cache.make_key(key),
+        _encode(value),
+        ex=settings.API_CACHE_TIMEOUT if timeout is None else timeout,
+    )
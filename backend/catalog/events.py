@@ -0,0 +1,89 @@
+# Hub de eventos de vuelos: una suscripción a Redis por proceso ASGI
+import asyncio
+import json
+import logging
+import weakref
+
+from flights.events import flight_events_channel
+
+from .cache import get_client
+
+logger = logging.getLogger(__name__)
+
+# Eventos pendientes por cliente SSE; si un cliente lento llena la cola se
+# descartan los más antiguos en lugar de frenar al resto
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+class Subscription:
+    def __init__(self, flight_ids):
+        self.flight_ids = flight_ids  # None = todos los vuelos
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        if self.flight_ids is not None and event.get('id') not in self.flight_ids:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class FlightEventHub:
+    """
+    Reparte los mensajes del canal flight_events entre las conexiones SSE del
+    proceso. Miles de clientes inactivos cuestan una cola cada uno y una
+    sola conexión pub/sub a Redis en total.
+    """
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.ready = asyncio.Event()
+        self.task = None
+
+    async def subscribe(self, flight_ids=None):
+        subscription = Subscription(flight_ids)
+        self.subscriptions.add(subscription)
+        if self.task is None or self.task.done():
+            self.ready.clear()
+            self.task = asyncio.create_task(self._listen())
+        await self.ready.wait()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, event):
+        for subscription in list(self.subscriptions):
+            subscription.offer(event)
+
+    async def _listen(self):
+        while True:
+            pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(flight_events_channel())
+                self.ready.set()
+                async for message in pubsub.listen():
+                    try:
+                        self.dispatch(json.loads(message['data']))
+                    except (TypeError, ValueError):
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning('Flight events subscription lost (%s), reconnecting', exc)
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.reset()
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """Hub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = FlightEventHub()
+    return hub
@@ -0,0 +1,111 @@
+# catalog/management/commands/loadtest_catalog.py
+
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+# Rutas relativas a cada --target (la versión síncrona cuelga de /api/,
+# la asíncrona de /api/async/)
+DEFAULT_PATHS = [
+    'flights/',
+    'flights/search_route/?origin=Quito&destination=Guayaquil',
+    'destinations/active/',
+]
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga WSGI vs ASGI de las lecturas del catálogo. Los servidores
+    se levantan aparte, por ejemplo:
+
+        gunicorn config.wsgi --workers 1 --threads 8 --bind 127.0.0.1:8000
+        uvicorn config.asgi:application --workers 1 --port 8001
+
+        python manage.py loadtest_catalog \\
+            --target wsgi=http://127.0.0.1:8000/api/ \\
+            --target asgi=http://127.0.0.1:8001/api/async/ \\
+            --concurrency 500 --requests 20000 --token <JWT>
+    """
+    help = 'Compara throughput y latencia p99 de las lecturas del catálogo entre servidores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True,
+            help='nombre=URL base; se puede repetir (p. ej. wsgi=http://127.0.0.1:8000/api/).'
+        )
+        parser.add_argument('--path', action='append', dest='paths', help='Ruta relativa a probar; se puede repetir.')
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=2000, help='Peticiones por ruta y target.')
+        parser.add_argument('--token', help='JWT de acceso (destinations/active/ lo requiere).')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--output', help='Guardar los resultados en este archivo JSON.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f'--target debe tener la forma nombre=URL: {target}')
+            targets.append((name, url if url.endswith('/') else url + '/'))
+
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        results = []
+        for name, base_url in targets:
+            for path in options['paths'] or DEFAULT_PATHS:
+                result = asyncio.run(self._run(
+                    base_url + path, headers, options['concurrency'], options['requests'], options['timeout']
+                ))
+                result.update(target=name, path=path)
+                results.append(result)
+                self.stdout.write(
+                    f"{name:<6} {path:<60} {result['requests_per_second']:9.1f} req/s  "
+                    f"p50={result['p50_ms']:7.1f}ms  p99={result['p99_ms']:7.1f}ms  "
+                    f"errores={result['errors']}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['output']}"))
+
+    async def _run(self, url, headers, concurrency, total, timeout):
+        latencies = []
+        errors = 0
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout) as client:
+            async def worker():
+                nonlocal errors
+                while not queue.empty():
+                    queue.get_nowait()
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'url': url,
+            'requests': total,
+            'concurrency': concurrency,
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'requests_per_second': total / elapsed if elapsed else 0.0,
+            'p50_ms': statistics.median(latencies),
+            'p99_ms': latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        }
@@ -0,0 +1,222 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from redis.exceptions import RedisError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from airlines.models import Airline
+from destinations.models import Destination
+from flights.events import publish_flight_event
+from flights.models import Flight
+
+User = get_user_model()
+
+
+class AsyncCatalogTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        departure = timezone.now() + timedelta(days=3)
+        for n in range(12):
+            Flight.objects.create(
+                flight_code=f'LA{n:04d}',
+                airline=self.airline,
+                origin='Quito',
+                destination='Guayaquil' if n % 2 else 'Cuenca',
+                departure_datetime=departure + timedelta(hours=n),
+                arrival_datetime=departure + timedelta(hours=n + 1),
+                adult_price=Decimal('150.00'),
+                child_price=Decimal('100.00'),
+                special_price=Decimal('120.00'),
+                available_seats=100,
+                status='scheduled',
+            )
+        Destination.objects.create(name='Quito', code='UIO', province='Pichincha', is_active=True)
+        Destination.objects.create(name='Loja', code='LOH', province='Loja', is_active=False)
+        self.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='testpass123'
+        )
+
+    def _sync(self, path, **extra):
+        cache.clear()
+        return APIClient().get(path, **extra)
+
+    async def _async(self, path, **extra):
+        await cache.aclear()
+        return await self.async_client.get(path, **extra)
+
+    async def test_flight_list_matches_sync_endpoint(self):
+        """Test /api/async/flights/ returns the same page as /api/flights/"""
+        for query in ('', '?page=2', '?ordering=-adult_price', f'?airline={self.airline.id}&search=cuenca'):
+            sync_response = await self._sync_in_thread(f'/api/flights/{query}')
+            async_response = await self._async(f'/api/async/flights/{query}')
+
+            self.assertEqual(async_response.status_code, 200)
+            # Solo cambian los enlaces next/previous (/api/async/ en lugar de /api/)
+            self.assertEqual(
+                async_response.content.decode().replace('/api/async/', '/api/'),
+                sync_response.content.decode(),
+                query
+            )
+
+    async def test_flight_list_shares_cache_with_sync_view(self):
+        """Test an entry cached by FlightViewSet.list is served by the async view"""
+        await self._sync_in_thread('/api/flights/?status=scheduled')
+        await Flight.objects.all().aupdate(status='delayed')
+
+        response = await self.async_client.get('/api/async/flights/?status=scheduled')
+        self.assertEqual(response.json()['count'], 12)
+
+    async def test_flight_list_invalid_filter(self):
+        """Test invalid filter values return 400 like django-filter"""
+        response = await self._async('/api/async/flights/?airline=999999')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('airline', response.json())
+
+    async def test_search_route(self):
+        """Test search_route requires origin/destination and filters by route"""
+        response = await self._async('/api/async/flights/search_route/?origin=Quito')
+        self.assertEqual(response.status_code, 400)
+
+        response = await self._async('/api/async/flights/search_route/?origin=quito&destination=guaya')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 6)
+        self.assertTrue(all(f['destination'] == 'Guayaquil' for f in response.json()['results']))
+
+    async def test_destinations_active_requires_jwt(self):
+        """Test /api/async/destinations/active/ authenticates with JWT"""
+        response = await self._async('/api/async/destinations/active/')
+        self.assertEqual(response.status_code, 401)
+
+        token = await self._token()
+        response = await self._async(
+            '/api/async/destinations/active/', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d['code'] for d in response.json()], ['UIO'])
+
+    async def _sync_in_thread(self, path):
+        return await sync_to_async(self._sync)(path)
+
+    async def _token(self):
+        return await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+
+
+class FlightStreamTest(TestCase):
+    def setUp(self):
+        airline = Airline.objects.create(name='Avianca', code='AV')
+        departure = timezone.now() + timedelta(days=1)
+        self.flight = Flight.objects.create(
+            flight_code='AV1000', airline=airline, origin='Quito', destination='Lima',
+            departure_datetime=departure, arrival_datetime=departure + timedelta(hours=2),
+            adult_price=Decimal('200.00'), child_price=Decimal('150.00'),
+            special_price=Decimal('180.00'), available_seats=50, status='scheduled',
+        )
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+
+    async def _next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        event, data = chunk.decode().strip().split('\n')
+        return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+    async def test_stream_sends_snapshot_then_deltas(self):
+        """Test subscribers get the current state and then only their flights' changes"""
+        response = await self.async_client.get(f'/api/async/flights/stream/?ids={self.flight.pk}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        event, snapshot = await self._next_event(stream)
+        self.assertEqual(event, 'snapshot')
+        self.assertEqual(snapshot[0]['status'], 'scheduled')
+
+        def publish():
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_flight_event(self.flight.pk + 1, 'status', {'status': 'delayed'})
+                publish_flight_event(self.flight.pk, 'seats', {'available_seats': 10})
+        await sync_to_async(publish)()
+
+        event, delta = await self._next_event(stream)
+        self.assertEqual(event, 'flight')
+        self.assertEqual(delta, {'id': self.flight.pk, 'event': 'seats', 'changes': {'available_seats': 10}})
+        await stream.aclose()
+
+    def test_write_actions_publish_deltas(self):
+        """Test change_status, update_seats and updates publish only what changed"""
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        url = f'/api/flights/{self.flight.pk}/'
+
+        with mock.patch('flights.views.publish_flight_event') as publish:
+            client.post(f'{url}change_status/', {'status': 'delayed'}, format='json')
+            client.post(f'{url}update_seats/', {'available_seats': 5}, format='json')
+            client.patch(url, {
+                'origin': 'Quito', 'destination': 'Lima', 'notes': 'Puerta 4', 'status': 'delayed'
+            }, format='json')
+
+        self.assertEqual(
+            [call.args for call in publish.call_args_list],
+            [
+                (self.flight.pk, 'status', {'status': 'delayed'}),
+                (self.flight.pk, 'seats', {'available_seats': 5}),
+                (self.flight.pk, 'update', {'notes': 'Puerta 4'}),
+            ]
+        )
+
+    def test_redis_failure_does_not_fail_the_write(self):
+        """Test a committed write still answers 200 when the event cannot be published"""
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        redis = mock.Mock(**{'publish.side_effect': RedisError('Connection refused')})
+
+        with mock.patch('flights.events.get_redis_connection', return_value=redis), \
+                self.assertLogs('flights.events', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/flights/{self.flight.pk}/change_status/', {'status': 'delayed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.status, 'delayed')
+
+    def test_stream_requires_asgi(self):
+        """Test the stream is refused under WSGI, where it would block a worker"""
+        response = self.client.get('/api/async/flights/stream/')
+        self.assertEqual(response.status_code, 501)
+
+    async def test_stream_rejects_invalid_ids(self):
+        """Test ids must be integers"""
+        response = await self.async_client.get('/api/async/flights/stream/?ids=a,b')
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncMiddlewareTest(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_no_middleware_is_adapted_under_asgi(self):
+        """Every middleware runs natively async: no thread is held for the whole async view"""
+        from django.core.handlers.asgi import ASGIHandler
+
+        with self.assertNoLogs('django.request', level='DEBUG'):
+            ASGIHandler()
+
+    def test_account_config_requires_the_async_account_middleware(self):
+        """allauth.account validates our AccountMiddleware, not allauth's sync one"""
+        from django.apps import apps
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+
+        config = apps.get_app_config('account')
+        config.ready()
+        middleware = [
+            'allauth.account.middleware.AccountMiddleware' if path == 'authentication.middleware.AccountMiddleware' else path
+            for path in settings.MIDDLEWARE
+        ]
+        with override_settings(MIDDLEWARE=middleware), self.assertRaises(ImproperlyConfigured):
+            config.ready()
@@ -0,0 +1,10 @@
+# URL patterns for catalog app (montadas en /api/async/)
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('flights/', views.flight_list, name='async-flight-list'),
+    path('flights/stream/', views.flight_stream, name='async-flight-stream'),
+    path('flights/search_route/', views.flight_search_route, name='async-flight-search-route'),
+    path('destinations/active/', views.destination_active, name='async-destination-active'),
+]
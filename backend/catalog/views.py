@@ -0,0 +1,257 @@
+# Vistas asíncronas (ASGI) de lectura del catálogo: vuelos y destinos
+import asyncio
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from asgiref.sync import sync_to_async
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from authentication.models import User
+from destinations.serializers import DestinationListSerializer
+from destinations.views import DestinationViewSet
+from flights.models import Flight
+from flights.serializers import FlightDetailSerializer, FlightListSerializer
+from flights.views import FlightViewSet
+
+from .cache import aget, aset
+from .events import get_hub
+
+# Stream SSE de vuelos
+STREAM_MAX_FLIGHTS = 100
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+def _json(data, status=200):
+    # Mismo formato que JSONRenderer de DRF (UNICODE_JSON, COMPACT_JSON)
+    return JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')}
+    )
+
+
+def _view(viewset_class, request, action):
+    """Instancia del ViewSet síncrono para reutilizar su configuración y filtros"""
+    drf_request = Request(request)
+    view = viewset_class(request=drf_request, format_kwarg=None, action=action, kwargs={})
+    return view, drf_request
+
+
+async def _filter_queryset(view, drf_request, queryset):
+    """
+    Aplica los filter_backends del ViewSet. Solo DjangoFilterBackend puede
+    consultar la BD (valida airline con un ModelChoiceFilter), así que pasa
+    por sync_to_async y únicamente cuando la petición trae esos filtros.
+    """
+    for backend_class in view.filter_backends:
+        backend = backend_class()
+        if isinstance(backend, DjangoFilterBackend):
+            if any(field in drf_request.query_params for field in view.filterset_fields):
+                queryset = await sync_to_async(backend.filter_queryset)(drf_request, queryset, view)
+            continue
+        queryset = backend.filter_queryset(drf_request, queryset, view)
+    return queryset
+
+
+async def _paginate(request, queryset, serializer_class):
+    """Equivalente asíncrono de PageNumberPagination (PAGE_SIZE)"""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get(PageNumberPagination.page_query_param, 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        raise exceptions.NotFound(PageNumberPagination.invalid_page_message)
+
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    if page > 1 and offset >= count:
+        raise exceptions.NotFound(PageNumberPagination.invalid_page_message)
+
+    items = [obj async for obj in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    return {
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': serializer_class(items, many=True).data,
+    }
+
+
+async def _authenticate(request):
+    """JWTAuthentication sin hilos: valida el token y comprueba el usuario con el ORM async"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raise exceptions.NotAuthenticated()
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        raise exceptions.AuthenticationFailed()
+
+    lookup = {jwt_settings.USER_ID_FIELD: user_id, 'is_active': True}
+    if not await User.objects.filter(**lookup).aexists():
+        raise exceptions.AuthenticationFailed()
+
+
+def _api_view(func):
+    """Convierte las APIException de DRF en la misma respuesta JSON que DRF"""
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({'detail': str(exceptions.MethodNotAllowed(request.method).detail)}, status=405)
+        try:
+            response = await func(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = _json({'detail': str(exc.detail)}, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = 'Bearer realm="api"'
+        patch_vary_headers(response, ['Authorization'])
+        return response
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+@_api_view
+async def flight_list(request):
+    """Async version of GET /api/flights/ (comparte caché con FlightViewSet.list)"""
+    cache_key = f"flights_list_{request.GET.urlencode()}"
+    cached_data = await aget(cache_key)
+    if cached_data:
+        return _json(cached_data)
+
+    view, drf_request = _view(FlightViewSet, request, 'list')
+    try:
+        queryset = await _filter_queryset(view, drf_request, view.get_queryset())
+    except exceptions.ValidationError as exc:
+        return _json(exc.detail, status=400)
+
+    response_data = await _paginate(request, queryset, FlightListSerializer)
+    await aset(cache_key, response_data)
+    return _json(response_data)
+
+
+@_api_view
+async def flight_search_route(request):
+    """Async version of GET /api/flights/search_route/"""
+    origin = request.GET.get('origin')
+    destination = request.GET.get('destination')
+    departure_date = request.GET.get('date')
+
+    if not origin or not destination:
+        return _json({'error': 'Origin and destination are required'}, status=400)
+
+    # Mismo prefijo que cache_page: _clear_flight_cache también la borra
+    cache_key = f"flights_search_route_async_{request.GET.urlencode()}"
+    cached_data = await aget(cache_key)
+    if cached_data:
+        return _json(cached_data)
+
+    view, _drf_request = _view(FlightViewSet, request, 'search_route')
+    flights = view.get_queryset().filter(
+        origin__icontains=origin,
+        destination__icontains=destination,
+        status='scheduled'
+    )
+    if departure_date:
+        flights = flights.filter(departure_datetime__date=departure_date)
+
+    response_data = await _paginate(request, flights, FlightDetailSerializer)
+    await aset(cache_key, response_data)
+    return _json(response_data)
+
+
+@_api_view
+async def destination_active(request):
+    """Async version of GET /api/destinations/active/ (requiere JWT)"""
+    await _authenticate(request)
+
+    # Mismo prefijo que cache_page: _clear_destination_cache también la borra
+    cache_key = f"destinations_active_async_{request.GET.urlencode()}"
+    cached_data = await aget(cache_key)
+    if cached_data is not None:
+        return _json(cached_data)
+
+    view, _drf_request = _view(DestinationViewSet, request, 'active')
+    queryset = view.get_queryset().filter(is_active=True)
+    response_data = DestinationListSerializer([d async for d in queryset], many=True).data
+
+    await aset(cache_key, response_data)
+    return _json(response_data)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder, separators=(',', ':'))}\n\n"
+
+
+async def _flight_events(flight_ids):
+    hub = get_hub()
+    subscription = await hub.subscribe(flight_ids)
+    try:
+        # Estado actual de los vuelos pedidos: el cliente no necesita el detalle
+        if flight_ids:
+            snapshot = [
+                flight async for flight in Flight.objects.filter(id__in=flight_ids).values(
+                    'id', 'status', 'available_seats', 'departure_datetime', 'arrival_datetime'
+                )
+            ]
+            yield _sse('snapshot', snapshot)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ': ping\n\n'
+                continue
+            yield _sse('flight', event)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def flight_stream(request):
+    """
+    Server-sent events con los cambios de vuelos (change_status,
+    update_seats y actualizaciones): GET /api/async/flights/stream/?ids=1,2
+    Sin ids se reciben todos los vuelos. Solo bajo ASGI.
+    """
+    if request.method != 'GET':
+        return _json({'detail': str(exceptions.MethodNotAllowed(request.method).detail)}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return _json({'error': 'El stream de vuelos requiere un servidor ASGI'}, status=501)
+
+    flight_ids = None
+    raw_ids = request.GET.get('ids')
+    if raw_ids:
+        try:
+            flight_ids = {int(value) for value in raw_ids.split(',') if value.strip()}
+        except ValueError:
+            return _json({'error': 'ids must be a comma separated list of integers'}, status=400)
+        if len(flight_ids) > STREAM_MAX_FLIGHTS:
+            return _json({'error': f'At most {STREAM_MAX_FLIGHTS} ids per stream'}, status=400)
+
+    response = StreamingHttpResponse(_flight_events(flight_ids), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: no acumular el stream
+    return response
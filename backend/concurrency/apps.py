@@ -0,0 +1,8 @@
+# App configuration for concurrency app
+from django.apps import AppConfig
+
+
+class ConcurrencyConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'concurrency'
+    verbose_name = 'Optimistic Concurrency'
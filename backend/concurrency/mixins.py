@@ -0,0 +1,58 @@
+# If-Match / ETag y respuestas 412 para los modelos con VersionedModelMixin
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .models import VersionConflict
+
+
+def version_etag(version):
+    return f'"{version}"'
+
+
+def check_if_match(request, instance):
+    """Lanza VersionConflict si el If-Match de la petición no coincide con la versión de instance"""
+    header = request.headers.get('If-Match')
+    if not header:
+        return
+    etags = parse_etags(header)
+    if '*' not in etags and version_etag(instance.version) not in etags:
+        raise VersionConflict(
+            f'If-Match {header} no coincide con la versión actual ({instance.version})'
+        )
+
+
+class OptimisticLockMixin:
+    """
+    Concurrencia optimista en los ViewSets: las respuestas de detalle llevan
+    ETag: "<version>" y no entran en la caché de página, las escrituras
+    comprueban If-Match (opcional) antes de tocar la fila, y un
+    VersionConflict (If-Match distinto o fila guardada por otra petición
+    entre la lectura y el save()) responde 412.
+    """
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            check_if_match(self.request, instance)
+        return instance
+
+    def handle_exception(self, exc):
+        if isinstance(exc, VersionConflict):
+            return Response(
+                {'error': 'El recurso fue modificado por otra petición; vuelve a leerlo e inténtalo de nuevo'},
+                status=status.HTTP_412_PRECONDITION_FAILED
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        data = getattr(response, 'data', None)
+        if self.detail and status.is_success(response.status_code) and isinstance(data, dict) and 'version' in data:
+            response['ETag'] = version_etag(data['version'])
+            # La caché de página (UpdateCacheMiddleware) no se invalida al escribir:
+            # un ETag viejo haría fallar con 412 todos los If-Match siguientes
+            patch_cache_control(response, private=True)
+        return response
@@ -0,0 +1,48 @@
+# Models for concurrency app
+from django.db import models
+
+
+class VersionConflict(Exception):
+    """The row was modified (its version changed) since it was read"""
+
+
+class VersionedModelMixin(models.Model):
+    """
+    Abstract model con control de concurrencia optimista: cada UPDATE lleva
+    WHERE id = %s AND version = %s y sube la versión en uno. Si otra petición
+    guardó la fila entre la lectura y el save() se lanza VersionConflict en
+    lugar de sobrescribir sus cambios (sin SELECT ... FOR UPDATE).
+    """
+    version = models.PositiveIntegerField(
+        default=1,
+        db_default=1,
+        editable=False,
+        db_column='version'
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            # La versión y los auto_now (updated_at) siempre acompañan al UPDATE parcial
+            auto_now = [field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)]
+            kwargs['update_fields'] = {*update_fields, 'version', *auto_now}
+        super().save(*args, **kwargs)
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = self.version
+        version_field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, expected + 1))
+        updated = super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update
+        )
+        if updated:
+            self.version = expected + 1
+        elif base_qs.filter(pk=pk_val).exists():
+            raise VersionConflict(
+                f'{self._meta.object_name} {pk_val} fue modificado por otra petición (versión {expected})'
+            )
+        return updated
@@ -0,0 +1,14 @@
+# Serializers helpers for concurrency app
+
+
+class UpdateFieldsSerializerMixin:
+    """
+    update() que guarda solo los campos enviados con save(update_fields=[...])
+    en lugar de reescribir la fila entera. Para serializers sin campos M2M.
+    """
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
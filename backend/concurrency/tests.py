@@ -0,0 +1,118 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from airlines.models import Airline
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from reservations.models import Reservation, ReservationStatus
+
+from .models import VersionConflict
+
+User = get_user_model()
+
+
+class ConcurrencyTestData:
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        departure = timezone.now() + timedelta(days=10)
+        self.flight = Flight.objects.create(
+            flight_code='LA2001', airline=airline, origin='Quito', destination='Guayaquil',
+            departure_datetime=departure, arrival_datetime=departure + timedelta(hours=1),
+            adult_price=Decimal('150.00'), child_price=Decimal('100.00'), available_seats=10,
+        )
+        origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        trip = FlightRequest.objects.create(
+            user=self.admin, origin=origin, destination=destination, travel_date=departure.date()
+        )
+        self.reservation = Reservation.objects.create(
+            reservation_code='RES-0001', user=self.admin, flight=trip, reservation_date=timezone.now(),
+            total_passengers=1, total_amount=Decimal('150.00'),
+        )
+
+
+class VersionedModelTest(ConcurrencyTestData, TestCase):
+    def test_stale_save_raises_instead_of_overwriting(self):
+        self.assertEqual(self.flight.version, 1)
+        stale = Flight.objects.get(pk=self.flight.pk)
+
+        self.flight.status = 'delayed'
+        self.flight.save(update_fields=['status'])
+        self.assertEqual(self.flight.version, 2)
+
+        stale.available_seats = 0
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            stale.save(update_fields=['available_seats'])
+        fresh = Flight.objects.get(pk=self.flight.pk)
+        self.assertEqual((fresh.status, fresh.available_seats, fresh.version), ('delayed', 10, 2))
+
+    def test_update_fields_writes_only_changed_columns(self):
+        self.reservation.status = ReservationStatus.CONFIRMED
+        with CaptureQueriesContext(connection) as queries:
+            self.reservation.save(update_fields=['status'])
+        (update,) = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertIn('"version" = 1', update.split('WHERE')[1])
+        self.assertNotIn('total_amount', update)
+        self.assertNotIn('reservation_code', update)
+        self.reservation.refresh_from_db()
+        self.assertEqual((self.reservation.status, self.reservation.version), ('confirmed', 2))
+
+
+class IfMatchTest(ConcurrencyTestData, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_flight_change_status_with_if_match(self):
+        url = f'/api/flights/{self.flight.pk}/'
+        self.assertEqual(self.client.get(url)['ETag'], '"1"')
+
+        response = self.client.post(f'{url}change_status/', {'status': 'delayed'}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+        self.assertEqual(response.data['version'], 2)
+
+        # Segundo administrador con la versión que leyó antes
+        response = self.client.post(f'{url}change_status/', {'status': 'cancelled'}, HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 412)
+        self.assertIn('error', response.data)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.status, 'delayed')
+
+        self.assertEqual(self.client.get(url)['ETag'], '"2"')
+
+    def test_reservation_actions_and_update(self):
+        url = f'/api/reservations/{self.reservation.pk}/'
+        response = self.client.post(f'{url}confirm/', HTTP_IF_MATCH='"7"')
+        self.assertEqual(response.status_code, 412)
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, ReservationStatus.PENDING)
+
+        # Sin If-Match la escritura sigue funcionando y sube la versión
+        response = self.client.patch(f'{url}update_amount/', {'total_amount': '200.00'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"2"')
+
+        response = self.client.patch(url, {'total_passengers': 2}, format='json', HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['version'], 3)
+        self.reservation.refresh_from_db()
+        self.assertEqual(
+            (self.reservation.total_passengers, self.reservation.total_amount), (2, Decimal('200.00'))
+        )
+
+        response = self.client.post(f'{url}cancel/', HTTP_IF_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"4"')
@@ -0,0 +1,179 @@
+# Enrutado de lecturas a réplicas con "read-your-writes" por usuario
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from catalog.cache import aget, aset
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# False: primario (por defecto fuera de una petición: Celery, shell, comandos)
+_read_from_replica = contextvars.ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Lecturas del bloque a una réplica (enabled=False: al primario)"""
+    token = _read_from_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def use_primary():
+    return use_replica(False)
+
+
+def _sticky_key(user_key):
+    return f'replica_sticky:{user_key}'
+
+
+def mark_recent_write(user_key):
+    """Durante REPLICA_STICKY_SECONDS las lecturas de este usuario van al primario"""
+    if user_key is not None:
+        cache.set(_sticky_key(user_key), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def has_recent_write(user_key):
+    return user_key is not None and cache.get(_sticky_key(user_key)) is not None
+
+
+async def amark_recent_write(user_key):
+    """mark_recent_write() sin bloquear el event loop"""
+    if user_key is not None:
+        await aset(_sticky_key(user_key), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+async def ahas_recent_write(user_key):
+    return user_key is not None and await aget(_sticky_key(user_key)) is not None
+
+
+class ReplicaRouter:
+    """
+    Lecturas a una réplica solo dentro de use_replica() (lo activa
+    ReplicaRoutingMiddleware en peticiones de lectura) y fuera de una
+    transacción del primario: dentro de atomic() se lee lo recién escrito
+    (y en los TestCase, cuyos datos solo ve la conexión del primario).
+    Escrituras y migraciones siempre al primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = settings.DATABASE_REPLICAS
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación
+        return db not in settings.DATABASE_REPLICAS
+
+
+# La petición no trae JWT: se mira el usuario de la sesión
+_NO_TOKEN = object()
+
+
+def _token_user_key(request):
+    """Id del usuario del JWT (solo se valida la firma, sin consultar la BD)"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return _NO_TOKEN
+    try:
+        return authentication.get_validated_token(raw_token).get(jwt_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError):
+        return None
+
+
+def _session_user_key(user):
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def _user_key(request):
+    """Id del usuario del JWT o de la sesión"""
+    key = _token_user_key(request)
+    if key is not _NO_TOKEN:
+        return key
+    return _session_user_key(getattr(request, 'user', None))
+
+
+async def _auser_key(request):
+    """_user_key() para peticiones async: request.auser() carga la sesión sin bloquear"""
+    key = _token_user_key(request)
+    if key is not _NO_TOKEN:
+        return key
+    auser = getattr(request, 'auser', None)
+    return _session_user_key(await auser() if auser is not None else None)
+
+
+def _successful_write(request, response):
+    return request.method not in SAFE_METHODS and response.status_code < 400
+
+
+def _replica_iterator(content):
+    # Las respuestas en streaming consultan la BD después de salir del middleware
+    with use_replica():
+        yield from content
+
+
+class ReplicaRoutingMiddleware:
+    """
+    GET/HEAD/OPTIONS leen de una réplica salvo que el usuario haya escrito
+    hace menos de REPLICA_STICKY_SECONDS; una escritura con éxito (POST,
+    PUT, PATCH, DELETE < 400) abre esa ventana. Sin réplicas configuradas
+    no hace nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        user_key = _user_key(request)
+        replica = request.method in SAFE_METHODS and not has_recent_write(user_key)
+        with use_replica(replica):
+            response = self.get_response(request)
+        if _successful_write(request, response):
+            mark_recent_write(user_key)
+        return self._finish(response, replica)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        # Sin cache.get()/set() síncronos: bloquearían el event loop
+        user_key = await _auser_key(request)
+        replica = request.method in SAFE_METHODS and not await ahas_recent_write(user_key)
+        with use_replica(replica):
+            response = await self.get_response(request)
+        if _successful_write(request, response):
+            await amark_recent_write(user_key)
+        return self._finish(response, replica)
+
+    def _finish(self, response, replica):
+        if replica and response.streaming and not response.is_async:
+            response.streaming_content = _replica_iterator(response.streaming_content)
+        return response
@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
 
     # Terceros
@@ -34,7 +36,8 @@ INSTALLED_APPS = [
     'django_filters',
     'dj_rest_auth',
     'allauth',
-    'allauth.account',
+    # allauth.account, pero validando authentication.middleware.AccountMiddleware
+    'authentication.apps.AccountConfig',
     'dj_rest_auth.registration',
     'djcelery_email',
 
@@ -47,11 +50,19 @@ INSTALLED_APPS = [
     'flight_requests',
     'reservations',
     'reservation_passengers',
+    'search',
+    'catalog',
+    'monitoring',
+    'benchmarks',
+    'archive',
+    'concurrency',
 ]
 
 # --- ¡CORRECCIÓN DE CACHÉ! ---
 # Añadimos los middleware de caché. El orden es MUY importante.
 MIDDLEWARE = [
+    # Primero: mide la petición completa y su Server-Timing no se cachea
+    'monitoring.middleware.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -59,9 +70,12 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Tras la autenticación: las lecturas de la petición pueden ir a una réplica
+    'config.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'allauth.account.middleware.AccountMiddleware',
+    # AccountMiddleware de allauth, también async
+    'authentication.middleware.AccountMiddleware',
     'django.middleware.cache.FetchFromCacheMiddleware',
 ]
 # --- FIN DE LA CORRECCIÓN ---
@@ -92,6 +106,30 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# --- CONEXIONES A LA BASE DE DATOS ---
+# Cada tipo de proceso reutiliza sus conexiones de forma distinta. PROCESS_TYPE
+# (web, asgi, worker, beat) se deduce de la línea de comandos de Celery y
+# config/asgi.py fija 'asgi'; se puede forzar por entorno.
+PROCESS_TYPE = os.getenv('PROCESS_TYPE') or (
+    'beat' if 'beat' in sys.argv else 'worker' if 'worker' in sys.argv else 'web'
+)
+DB_CONNECTION_PROFILES = {
+    # gunicorn/runserver: una conexión por hilo, reutilizada entre peticiones
+    'web': {'conn_max_age': 60, 'pool': False, 'pool_min_size': 2, 'pool_max_size': 10},
+    # ASGI: el código síncrono corre en hilos distintos por petición y una
+    # conexión persistente quedaría huérfana: las conexiones salen de un pool
+    'asgi': {'conn_max_age': 0, 'pool': True, 'pool_min_size': 2, 'pool_max_size': 10},
+    # Worker de Celery: tareas seguidas en el mismo proceso (prefork)
+    'worker': {'conn_max_age': 300, 'pool': False, 'pool_min_size': 1, 'pool_max_size': 4},
+    # Beat apenas toca la BD
+    'beat': {'conn_max_age': 0, 'pool': False, 'pool_min_size': 0, 'pool_max_size': 1},
+}
+DB_CONNECTION_PROFILE = DB_CONNECTION_PROFILES[PROCESS_TYPE]
+
+# Pool de psycopg 3 integrado en Django: por defecto solo en ASGI; DB_POOL
+# (true/false) lo fuerza en cualquier tipo de proceso
+DB_POOL = os.getenv('DB_POOL', str(DB_CONNECTION_PROFILE['pool'])).lower() == 'true'
+
 # Base de datos
 DATABASES = {
     'default': {
@@ -101,9 +139,45 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': 5432,
+        # Segundos que se reutiliza una conexión; se comprueba antes de
+        # reutilizarla para no fallar tras un reinicio de Postgres
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', DB_CONNECTION_PROFILE['conn_max_age'])),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Réplica de lectura (misma credencial que el primario). En tests usa la
+# BD de test del primario (MIRROR); para probar con dos Postgres locales
+# basta con DB_REPLICA_NAME apuntando a otra base de datos.
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Alias a los que ReplicaRouter manda las lecturas seguras
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+# Segundos que un usuario lee del primario tras escribir (read-your-writes)
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '15'))
+
+if DB_POOL:
+    # Con pool, Django devuelve la conexión al terminar cada petición; con
+    # CONN_HEALTH_CHECKS el pool la comprueba (check_connection) al prestarla
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', DB_CONNECTION_PROFILE['pool_min_size'])),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', DB_CONNECTION_PROFILE['pool_max_size'])),
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            },
+        }
+# --- FIN DE CONEXIONES A LA BASE DE DATOS ---
+
 # Validadores de contraseñas
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -144,7 +218,8 @@ CACHES = {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': f'redis://{REDIS_HOST}:{REDIS_PORT}/1',
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # DefaultClient con contadores de aciertos/fallos (monitoring)
+            'CLIENT_CLASS': 'monitoring.cache.InstrumentedClient',
             'PICKLE_VERSION': -1,
         },
         'KEY_PREFIX': 'flight_system',
@@ -158,6 +233,8 @@ SESSION_CACHE_ALIAS = 'default'
 
 # Configuración personalizada de caché para API
 API_CACHE_TIMEOUT = 600
+# Conexiones máximas del cliente Redis asíncrono por worker ASGI (app catalog)
+ASYNC_REDIS_MAX_CONNECTIONS = int(os.getenv('ASYNC_REDIS_MAX_CONNECTIONS', '50'))
 # --- FIN DE CONFIGURACIÓN DE REDIS Y CACHÉ ---
 
 # --- CONFIGURACIÓN DE CELERY ---
@@ -173,16 +250,88 @@ CELERY_TIMEZONE = TIME_ZONE
 from celery.schedules import timedelta
 
 CELERY_BEAT_SCHEDULE = {
-    'send-flight-reminders-daily': {
-        'task': 'django.core.management.call_command',
-        'schedule': timedelta(days=1), 
-        'args': ['send_flight_reminders'],
+    # Ventana deslizante + ledger (notification_reminders): se puede
+    # ejecutar cada pocos minutos sin enviar duplicados.
+    'send-flight-reminders': {
+        'task': 'notifications.tasks.schedule_flight_reminders',
+        'schedule': timedelta(minutes=5),
+    },
+    'send-flight-request-reminders': {
+        'task': 'notifications.tasks.schedule_flight_request_reminders',
+        'schedule': timedelta(minutes=5),
+    },
+    # Respaldo del despachador dedicado (manage.py dispatch_outbox --loop)
+    'dispatch-notification-outbox': {
+        'task': 'notifications.tasks.dispatch_outbox',
+        'schedule': timedelta(seconds=10),
+    },
+    # Archivos de exportaciones asíncronas caducados (EXPORT_JOB_TTL)
+    'purge-export-jobs': {
+        'task': 'reservations.tasks.purge_export_jobs',
+        'schedule': timedelta(hours=1),
+    },
+    # Particiones mensuales de los próximos meses y retención (reservations.partitioning)
+    'maintain-partitions': {
+        'task': 'reservations.tasks.maintain_partitions',
+        'schedule': timedelta(days=1),
+    },
+    # Vuelos y reservas terminados a las tablas *_archive (archive.archiver)
+    'archive-finished-rows': {
+        'task': 'archive.tasks.archive_finished_rows',
+        'schedule': timedelta(days=1),
     },
 }
 # --- FIN DE CONFIGURACIÓN DE CELERY BEAT ---
 
+# --- INSTRUMENTACIÓN (monitoring) ---
+# Token Bearer de /metrics; sin él el endpoint solo responde con DEBUG
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Máximo de consultas SQL por vista (view_name). Pasarse queda en el log y
+# en query_budget_exceeded_total; los tests lo convierten en error.
+QUERY_BUDGETS = {
+    # Consultas medidas con 1 y 10 filas + la de JWTAuthentication
+    'airline-list': 3,
+    'destination-list': 3,
+    'flight-list': 3,
+    'flight-detail': 2,
+    'flightrequest-list': 3,
+    'flightrequest-detail': 2,
+    'reservation-list': 3,
+    'reservation-detail': 2,
+    'reservation-statistics': 7,
+    'reservationpassenger-list': 3,
+    'reservationpassenger-detail': 2,
+    'reservationpassenger-statistics': 12,
+}
+QUERY_BUDGET_ENFORCE = False
+
+# --- EXPORTACIONES ASÍNCRONAS (reservations.export_jobs) ---
+EXPORT_JOBS_DIR = os.getenv('EXPORT_JOBS_DIR', str(BASE_DIR / 'exports'))
+# Rango de ids que escribe cada tarea de Celery
+EXPORT_JOB_CHUNK_IDS = int(os.getenv('EXPORT_JOB_CHUNK_IDS', '50000'))
+# Segundos que se conservan el estado en Redis y el archivo generado
+EXPORT_JOB_TTL = int(os.getenv('EXPORT_JOB_TTL', str(24 * 60 * 60)))
+
+# --- PARTICIONADO MENSUAL (reservations.partitioning) ---
+# Meses futuros con la partición ya creada (sin partición DEFAULT)
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))
+# Meses completos que siguen adjuntos además del actual; 0 = sin retención
+PARTITION_RETENTION_MONTHS = int(os.getenv('PARTITION_RETENTION_MONTHS', '0'))
+# Las particiones separadas se mueven a este esquema, o se borran
+PARTITION_ARCHIVE_SCHEMA = os.getenv('PARTITION_ARCHIVE_SCHEMA', 'archive')
+PARTITION_DROP_DETACHED = os.getenv('PARTITION_DROP_DETACHED', 'false').lower() == 'true'
+
+# --- ARCHIVADO (archive.archiver) ---
+# Vuelos y reservas terminados hace más de estos días pasan a las tablas *_archive
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))
+# Filas por lote: cada lote es una transacción corta
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+# Segundos de pausa entre lotes (deja respirar al primario y a las réplicas)
+ARCHIVE_BATCH_PAUSE = float(os.getenv('ARCHIVE_BATCH_PAUSE', '0.1'))
+
 # --- CONFIGURACIÓN DE EMAIL ---
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend" 
+# En producción: EMAIL_BACKEND=notifications.backends.PooledSMTPEmailBackend
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', "django.core.mail.backends.console.EmailBackend")
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_USE_TLS = True
 EMAIL_PORT = 587
@@ -190,6 +339,10 @@ EMAIL_USE_SSL = False
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER') 
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD') 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+# PooledSMTPEmailBackend: envíos por segundo por proceso (0 = sin límite)
+# y segundos sin uso tras los que se valida la conexión con NOOP
+EMAIL_POOL_RATE_LIMIT = float(os.getenv('EMAIL_POOL_RATE_LIMIT', '10'))
+EMAIL_POOL_MAX_IDLE = float(os.getenv('EMAIL_POOL_MAX_IDLE', '30'))
 # --- FIN DE CONFIGURACIÓN DE EMAIL ---
 
 # Django REST Framework y JWT
@@ -205,6 +358,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'monitoring.renderers.InstrumentedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.models import User
+from flights.models import Flight
+
+from .routers import ReplicaRoutingMiddleware, mark_recent_write, use_primary, use_replica
+
+
+def _read_alias():
+    return router.db_for_read(Flight)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=30)
+class ReplicaRouterTest(SimpleTestCase):
+    """Solo decisiones del router: ninguna consulta llega a ejecutarse"""
+
+    def test_reads_go_to_primary_by_default(self):
+        self.assertEqual(_read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_use_replica(self):
+        with use_replica():
+            self.assertEqual(_read_alias(), 'replica')
+            with use_primary():
+                self.assertEqual(_read_alias(), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Flight), DEFAULT_DB_ALIAS)
+
+    def test_atomic_block_reads_from_primary(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        connection.in_atomic_block = True
+        self.addCleanup(setattr, connection, 'in_atomic_block', False)
+        with use_replica():
+            self.assertEqual(_read_alias(), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        with use_replica():
+            self.assertEqual(_read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'flights'))
+        self.assertFalse(router.allow_migrate('replica', 'flights'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_SECONDS=30)
+class ReplicaRoutingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.routed = []
+
+    def _call(self, method, user_id=None, status=200, streaming=False):
+        def view(request):
+            self.routed.append(_read_alias())
+            if streaming:
+                return StreamingHttpResponse(_read_alias() for _chunk in range(1))
+            return HttpResponse(status=status)
+
+        headers = {}
+        if user_id is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(User(id=user_id))}'
+        request = getattr(self.factory, method)('/api/flights/', **headers)
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_methods_read_from_replica(self):
+        self._call('get', user_id=1)
+        self._call('head')
+        self.assertEqual(self.routed, ['replica', 'replica'])
+
+    def test_writes_stay_on_primary(self):
+        self._call('post', user_id=1)
+        self.assertEqual(self.routed, [DEFAULT_DB_ALIAS])
+
+    def test_read_your_writes(self):
+        self._call('patch', user_id=1)
+        self._call('get', user_id=1)
+        self._call('get', user_id=2)
+        self.assertEqual(self.routed, [DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS, 'replica'])
+
+    def test_failed_write_is_not_sticky(self):
+        self._call('post', user_id=1, status=400)
+        self._call('get', user_id=1)
+        self.assertEqual(self.routed[-1], 'replica')
+
+    def test_sticky_window(self):
+        mark_recent_write(3)
+        self._call('get', user_id=3)
+        cache.delete('replica_sticky:3')
+        self._call('get', user_id=3)
+        self.assertEqual(self.routed, [DEFAULT_DB_ALIAS, 'replica'])
+
+    async def test_async_requests_do_not_block_on_the_cache(self):
+        async def view(request):
+            self.routed.append(_read_alias())
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(User(id=4))}'}
+        # El camino async usa el cliente redis.asyncio, nunca cache.get()/set()
+        with mock.patch.object(cache, 'get', side_effect=AssertionError), \
+                mock.patch.object(cache, 'set', side_effect=AssertionError):
+            await middleware(self.factory.get('/api/flights/', **headers))
+            await middleware(self.factory.post('/api/flights/', **headers))
+            await middleware(self.factory.get('/api/flights/', **headers))
+        self.assertEqual(self.routed, ['replica', DEFAULT_DB_ALIAS, DEFAULT_DB_ALIAS])
+        # Comparte la ventana con el camino síncrono
+        self._call('get', user_id=4)
+        self.assertEqual(self.routed[-1], DEFAULT_DB_ALIAS)
+
+    def test_streaming_content_reads_from_replica(self):
+        response = self._call('get', streaming=True)
+        # El contenido se genera fuera del middleware, ya con el contexto restaurado
+        self.assertEqual(_read_alias(), DEFAULT_DB_ALIAS)
+        self.assertEqual(b''.join(response.streaming_content), b'replica')
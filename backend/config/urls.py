@@ -7,6 +7,7 @@ from airlines.views import AirlineViewSet
 from flight_requests.views import FlightRequestViewSet
 from reservations.views import ReservationViewSet
 from reservation_passengers.views import ReservationPassengerViewSet
+from monitoring.views import metrics
 
 
 
@@ -25,6 +26,8 @@ router.register(r'reservation-passengers', ReservationPassengerViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),  # Prometheus
+    path('api/async/', include('catalog.urls')),  # Lecturas asíncronas (ASGI)
     path('api/', include(router.urls)),
     path('api/', include('authentication.urls')),
     path('api/auth/', include('dj_rest_auth.urls')),
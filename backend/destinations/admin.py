@@ -1,6 +1,7 @@
 # Admin configuration for destinations app
 from django.contrib import admin
 from .models import Destination
+from .geo import invalidate_nearby_index
 
 
 @admin.register(Destination)
@@ -49,11 +50,13 @@ class DestinationAdmin(admin.ModelAdmin):
     def activate_destinations(self, request, queryset):
         """Activate selected destinations"""
         updated = queryset.update(is_active=True)
+        invalidate_nearby_index()
         self.message_user(request, f'{updated} destination(s) activated successfully.')
     activate_destinations.short_description = 'Activate selected destinations'
     
     def deactivate_destinations(self, request, queryset):
         """Deactivate selected destinations"""
         updated = queryset.update(is_active=False)
+        invalidate_nearby_index()
         self.message_user(request, f'{updated} destination(s) deactivated successfully.')
     deactivate_destinations.short_description = 'Deactivate selected destinations'
@@ -6,3 +6,12 @@ class DestinationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'destinations'
     verbose_name = 'Destinations Management'
+
+    def ready(self):
+        # Cualquier escritura de destinos invalida el índice de cercanía
+        from django.db.models.signals import post_save, post_delete
+        from .geo import invalidate_nearby_index
+        from .models import Destination
+
+        post_save.connect(invalidate_nearby_index, sender=Destination, dispatch_uid='destinations_nearby_save')
+        post_delete.connect(invalidate_nearby_index, sender=Destination, dispatch_uid='destinations_nearby_delete')
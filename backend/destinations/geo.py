@@ -0,0 +1,149 @@
+# Geospatial helpers for destinations app
+import heapq
+import math
+import threading
+from collections import defaultdict
+
+from django.core.cache import cache
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_CELL_DEGREES = 1.0
+
+# Versión compartida del índice (Redis): cualquier proceso que escriba
+# destinos la incrementa y los demás reconstruyen su copia local.
+NEARBY_INDEX_VERSION_KEY = 'destinations_nearby_index_version'
+# key_prefix del cache_page de la acción nearby; sus claves son
+# views.decorators.cache.cache_{page,header}.<prefijo>.<método>.<hash>...
+NEARBY_CACHE_PREFIX = 'destinations_nearby'
+
+
+class GridIndex:
+    """
+    In-memory grid index over (id, latitude, longitude) points.
+    Only the cells touched by the search radius are scanned, so a query
+    measures a handful of candidates instead of the whole catalog.
+    """
+
+    def __init__(self, points, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.columns = int(round(360 / cell_degrees))
+        self.cells = defaultdict(list)
+        self.size = 0
+
+        for pk, lat, lng in points:
+            lat, lng = float(lat), float(lng)
+            lat_rad = math.radians(lat)
+            self.cells[self._cell(lat, lng)].append(
+                (pk, lat_rad, math.radians(lng), math.cos(lat_rad))
+            )
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _row(self, lat):
+        return int(math.floor(lat / self.cell_degrees))
+
+    def _column(self, lng):
+        return int(math.floor((lng + 180) / self.cell_degrees)) % self.columns
+
+    def _cell(self, lat, lng):
+        return (self._row(lat), self._column(lng))
+
+    def _candidate_cells(self, lat, lng, radius_km):
+        """Cells overlapping the bounding box of the search circle"""
+        angular = radius_km / EARTH_RADIUS_KM
+        delta_lat = math.degrees(angular)
+        lat_min, lat_max = lat - delta_lat, lat + delta_lat
+
+        if lat_min <= -90 or lat_max >= 90:
+            # El círculo contiene un polo: todas las longitudes
+            lat_min, lat_max = max(lat_min, -90.0), min(lat_max, 90.0)
+            columns = range(self.columns)
+        else:
+            ratio = math.sin(angular) / math.cos(math.radians(lat))
+            delta_lng = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+            first = int(math.floor((lng - delta_lng + 180) / self.cell_degrees))
+            last = int(math.floor((lng + delta_lng + 180) / self.cell_degrees))
+            if last - first + 1 >= self.columns:
+                columns = range(self.columns)
+            else:
+                columns = {column % self.columns for column in range(first, last + 1)}
+
+        for row in range(self._row(lat_min), self._row(lat_max) + 1):
+            for column in columns:
+                yield (row, column)
+
+    def nearby(self, lat, lng, radius_km, limit=None, exclude=None):
+        """Return [(distance_km, id)] within radius_km, closest first"""
+        lat_rad, lng_rad = math.radians(lat), math.radians(lng)
+        cos_lat = math.cos(lat_rad)
+        matches = []
+
+        for cell in self._candidate_cells(lat, lng, radius_km):
+            for pk, p_lat, p_lng, p_cos in self.cells.get(cell, ()):
+                if pk == exclude:
+                    continue
+                a = (
+                    math.sin((p_lat - lat_rad) / 2) ** 2
+                    + cos_lat * p_cos * math.sin((p_lng - lng_rad) / 2) ** 2
+                )
+                distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+                if distance <= radius_km:
+                    matches.append((distance, pk))
+
+        if limit is not None:
+            return heapq.nsmallest(limit, matches)
+        return sorted(matches)
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def build_nearby_index():
+    """Build a GridIndex with every active destination that has coordinates"""
+    from .models import Destination
+
+    points = Destination.objects.filter(
+        is_active=True,
+        latitude__isnull=False,
+        longitude__isnull=False,
+    ).values_list('id', 'latitude', 'longitude')
+    return GridIndex(points.iterator())
+
+
+def get_nearby_index():
+    """Return this process' index, rebuilding it if another process wrote destinations"""
+    global _index, _index_version
+
+    version = cache.get(NEARBY_INDEX_VERSION_KEY, 0)
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = build_nearby_index()
+            _index_version = version
+    return _index
+
+
+def clear_nearby_cache():
+    """Delete the cached nearby responses (cache_page) of every destination"""
+    cache.delete_pattern(f'views.decorators.cache.cache_*.{NEARBY_CACHE_PREFIX}.*')
+
+
+def invalidate_nearby_index(*args, **kwargs):
+    """
+    Mark the nearby index as stale in every process and drop the cached
+    nearby responses built from it (usable as a signal receiver)
+    """
+    global _index
+
+    _index = None
+    clear_nearby_cache()
+    try:
+        cache.incr(NEARBY_INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(NEARBY_INDEX_VERSION_KEY, 1, None)
@@ -1,10 +1,13 @@
 # Tests for destinations app
-from django.test import TestCase
+import json
+from django.test import TestCase, SimpleTestCase
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from decimal import Decimal
 from .models import Destination
+from .geo import GridIndex
 
 User = get_user_model()
 
@@ -204,6 +207,97 @@ class DestinationAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, dict)
 
+    def test_by_province_single_query(self):
+        """Test by_province groups destinations with a single query"""
+        Destination.objects.create(name="City A1", code="CA1", province="Province A")
+        Destination.objects.create(name="City A2", code="CA2", province="Province A")
+        Destination.objects.create(name="City B1", code="CB1", province="Province B")
+        cache.clear()
+        
+        self.client.force_authenticate(user=self.normal_user)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/destinations/by_province/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [d['name'] for d in response.data['Province A']],
+            ['City A1', 'City A2']
+        )
+        self.assertEqual(len(response.data['Province B']), 1)
+    
+    def test_by_province_stream(self):
+        """Test by_province can stream the grouped JSON"""
+        Destination.objects.create(name="City A1", code="CA1", province="Province A")
+        Destination.objects.create(name="City B1", code="CB1", province="Province B")
+        
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get('/api/destinations/by_province/?stream=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(set(data), {'Province A', 'Province B', 'Test Province'})
+        self.assertEqual(data['Province A'][0]['code'], 'CA1')
+
+    def test_nearby_destinations(self):
+        """Test nearby returns destinations inside the radius, closest first"""
+        quito = Destination.objects.create(
+            name="Quito", code="UIO", province="Pichincha",
+            latitude=Decimal("-0.180653"), longitude=Decimal("-78.467838")
+        )
+        Destination.objects.create(
+            name="Latacunga", code="LTX", province="Cotopaxi",
+            latitude=Decimal("-0.933333"), longitude=Decimal("-78.616667")
+        )
+        Destination.objects.create(
+            name="Ibarra", code="IBR", province="Imbabura",
+            latitude=Decimal("0.351708"), longitude=Decimal("-78.122334")
+        )
+        Destination.objects.create(
+            name="Guayaquil", code="GYE", province="Guayas",
+            latitude=Decimal("-2.170998"), longitude=Decimal("-79.922356")
+        )
+        
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(f'/api/destinations/{quito.id}/nearby/?radius_km=150')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [d['code'] for d in response.data['results']],
+            ['IBR', 'LTX']
+        )
+        self.assertLess(response.data['results'][0]['distance_km'], 80)
+    
+    def test_admin_actions_clear_cached_nearby(self):
+        """Test (de)activating from the admin drops the cached nearby responses"""
+        cache.clear()
+        quito = Destination.objects.create(
+            name="Quito", code="UIO", province="Pichincha",
+            latitude=Decimal("-0.180653"), longitude=Decimal("-78.467838")
+        )
+        ibarra = Destination.objects.create(
+            name="Ibarra", code="IBR", province="Imbabura",
+            latitude=Decimal("0.351708"), longitude=Decimal("-78.122334")
+        )
+        url = f'/api/destinations/{quito.id}/nearby/?radius_km=150'
+        self.client.force_authenticate(user=self.normal_user)
+        self.assertEqual([d['code'] for d in self.client.get(url).data['results']], ['IBR'])
+
+        self.client.force_login(self.admin_user)
+        for action, expected in (('deactivate_destinations', []), ('activate_destinations', ['IBR'])):
+            response = self.client.post(
+                '/admin/destinations/destination/', {'action': action, '_selected_action': [ibarra.id]}
+            )
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual([d['code'] for d in self.client.get(url).data['results']], expected)
+    
+    def test_nearby_invalid_radius(self):
+        """Test nearby rejects an invalid radius"""
+        quito = Destination.objects.create(
+            name="Quito", code="UIO", province="Pichincha",
+            latitude=Decimal("-0.180653"), longitude=Decimal("-78.467838")
+        )
+        self.client.force_authenticate(user=self.normal_user)
+        response = self.client.get(f'/api/destinations/{quito.id}/nearby/?radius_km=-5')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class DestinationValidationTest(TestCase):
     """Test Destination validation"""
@@ -296,3 +390,17 @@ class DestinationValidationTest(TestCase):
         response = self.client.post('/api/destinations/', data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertIsNotNone(response.data.get('coordinates'))
+
+
+class GridIndexTest(SimpleTestCase):
+    """Test the in-memory nearby index"""
+    
+    def test_nearby_across_antimeridian(self):
+        """Test points on both sides of longitude 180 are found"""
+        index = GridIndex([(1, 0, 179.9), (2, 0, -179.9), (3, 10, 0)])
+        self.assertEqual([pk for _, pk in index.nearby(0, 179.95, 50)], [1, 2])
+    
+    def test_nearby_limit_and_exclude(self):
+        """Test limit keeps the closest points and exclude skips the origin"""
+        index = GridIndex([(1, 0, 0), (2, 0, 0.5), (3, 0, 1), (4, 0, 2)])
+        self.assertEqual([pk for _, pk in index.nearby(0, 0, 500, limit=2, exclude=1)], [2, 3])
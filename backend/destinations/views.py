@@ -1,10 +1,16 @@
 # Views for destinations app
+from itertools import groupby
+from operator import attrgetter
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import StreamingHttpResponse
 
 from .models import Destination
+from .geo import NEARBY_CACHE_PREFIX, get_nearby_index
 from .serializers import (
     DestinationSerializer,
     DestinationListSerializer,
@@ -18,6 +24,15 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 # --- FIN DE ADICIONES ---
 
+# Filas por viaje a la BD al transmitir by_province (?stream=true)
+BY_PROVINCE_CHUNK_SIZE = 2000
+
+# Parámetros de búsqueda de destinos cercanos
+NEARBY_DEFAULT_RADIUS_KM = 100
+NEARBY_MAX_RADIUS_KM = 20000
+NEARBY_DEFAULT_LIMIT = 10
+NEARBY_MAX_LIMIT = 100
+
 
 class DestinationViewSet(viewsets.ModelViewSet):
     """
@@ -79,7 +94,7 @@ class DestinationViewSet(viewsets.ModelViewSet):
         # Borra los cachés de las acciones personalizadas (key_prefix)
         cache.delete_pattern("destinations_active*")
         cache.delete_pattern("destinations_by_province*")
-        cache.delete_pattern("destinations_nearby*")
+        # Las respuestas de nearby las borra invalidate_nearby_index (señales de Destination)
 
 
     # --- ACCIÓN 'list' MODIFICADA CON CACHÉ MANUAL ---
@@ -211,20 +226,46 @@ class DestinationViewSet(viewsets.ModelViewSet):
     @method_decorator(cache_page(settings.API_CACHE_TIMEOUT, key_prefix="destinations_by_province"))
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def by_province(self, request):
-        """Group destinations by province"""
-        provinces = self.get_queryset().values_list('province', flat=True).distinct()
+        """
+        Group destinations by province.
+        Una sola consulta ordenada por provincia, agrupada en Python.
+        Con ?stream=true la respuesta se envía provincia por provincia.
+        """
+        queryset = self.get_queryset().order_by('province', 'name')
+
+        stream = request.query_params.get('stream', '')
+        if stream.lower() == 'true':
+            return StreamingHttpResponse(
+                self._stream_by_province(queryset),
+                content_type='application/json'
+            )
+
         result = {}
-        
-        for province in provinces:
-            destinations = self.get_queryset().filter(province=province)
-            result[province] = DestinationListSerializer(destinations, many=True).data
-        
+        for province, destinations in groupby(queryset, key=attrgetter('province')):
+            result[province] = DestinationListSerializer(list(destinations), many=True).data
+
         return Response(result)
 
-    @method_decorator(cache_page(settings.API_CACHE_TIMEOUT, key_prefix="destinations_nearby"))
+    def _stream_by_province(self, queryset):
+        """Genera el JSON agrupado por provincia en trozos (memoria acotada)"""
+        encoder = JSONEncoder()
+        rows = queryset.iterator(chunk_size=BY_PROVINCE_CHUNK_SIZE)
+
+        yield '{'
+        for index, (province, destinations) in enumerate(groupby(rows, key=attrgetter('province'))):
+            data = DestinationListSerializer(list(destinations), many=True).data
+            separator = ',' if index else ''
+            yield f'{separator}{encoder.encode(province)}:{encoder.encode(data)}'
+        yield '}'
+
+    @method_decorator(cache_page(settings.API_CACHE_TIMEOUT, key_prefix=NEARBY_CACHE_PREFIX))
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def nearby(self, request, pk=None):
-        """Get nearby destinations (placeholder - would need geospatial queries)"""
+        """
+        Get active destinations within ?radius_km= of this one (closest first).
+        Usa el índice en memoria de destinations.geo; cache_page guarda el
+        resultado por (destino, radius_km, limit).
+        """
         destination = self.get_object()
         
         if not destination.latitude or not destination.longitude:
@@ -233,9 +274,34 @@ class DestinationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Simple implementation - would be better with PostGIS
+        try:
+            radius_km = float(request.query_params.get('radius_km', NEARBY_DEFAULT_RADIUS_KM))
+            limit = int(request.query_params.get('limit', NEARBY_DEFAULT_LIMIT))
+            if not (0 < radius_km <= NEARBY_MAX_RADIUS_KM) or not (0 < limit <= NEARBY_MAX_LIMIT):
+                raise ValueError()
+        except (ValueError, TypeError):
+            return Response(
+                {"error": f"radius_km must be between 0 and {NEARBY_MAX_RADIUS_KM} "
+                          f"and limit between 1 and {NEARBY_MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        lat, lng = destination.get_coordinates()
+        matches = get_nearby_index().nearby(lat, lng, radius_km, limit=limit, exclude=destination.pk)
+        
+        destinations = Destination.objects.in_bulk([pk for _, pk in matches])
+        results = []
+        for distance, match_pk in matches:
+            if match_pk not in destinations:
+                continue
+            item = DestinationListSerializer(destinations[match_pk]).data
+            item['distance_km'] = round(distance, 2)
+            results.append(item)
+        
         return Response({
-            "message": "Nearby destinations feature",
             "destination": destination.name,
-            "coordinates": destination.get_coordinates()
+            "coordinates": destination.get_coordinates(),
+            "radius_km": radius_km,
+            "count": len(results),
+            "results": results,
         })
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    flightrequests es una tabla no gestionada (managed=False): el índice se
+    crea con RunSQL y state_operations mantiene el estado de Django al día.
+    """
+
+    dependencies = [
+        ('flight_requests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS idx_flightrequests_traveldate ON flightrequests (traveldate)",
+            reverse_sql="DROP INDEX IF EXISTS idx_flightrequests_traveldate",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flightrequest',
+                    index=models.Index(fields=['travel_date'], name='idx_flightrequests_traveldate'),
+                ),
+            ],
+        ),
+    ]
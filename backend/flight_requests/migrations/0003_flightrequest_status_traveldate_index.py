@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    flightrequests es una tabla no gestionada (managed=False): el índice se
+    crea con RunSQL y state_operations mantiene el estado de Django al día.
+    """
+
+    dependencies = [
+        ('flight_requests', '0002_flightrequest_traveldate_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS idx_flightrequests_status_date ON flightrequests (status, traveldate)",
+            reverse_sql="DROP INDEX IF EXISTS idx_flightrequests_status_date",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flightrequest',
+                    index=models.Index(fields=['status', 'travel_date'], name='idx_flightrequests_status_date'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    flightrequests es una tabla no gestionada (managed=False): el índice se
+    crea con RunSQL (CONCURRENTLY, fuera de transacción) y state_operations
+    mantiene el estado de Django al día.
+    """
+    atomic = False
+
+    dependencies = [
+        ('flight_requests', '0003_flightrequest_status_traveldate_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flightreq_user_created ON flightrequests (userid, createdat DESC)",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_flightreq_user_created",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flightrequest',
+                    index=models.Index(fields=['user', '-created_at'], name='idx_flightreq_user_created'),
+                ),
+            ],
+        ),
+    ]
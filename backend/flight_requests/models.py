@@ -66,6 +66,13 @@ class FlightRequest(models.Model):
         managed = False
         db_table = 'flightrequests'
         ordering = ['-created_at']
+        indexes = [
+            # Ventana de recordatorios (notifications)
+            models.Index(fields=['travel_date'], name='idx_flightrequests_traveldate'),
+            models.Index(fields=['status', 'travel_date'], name='idx_flightrequests_status_date'),
+            # Listado del cliente (user=request.user) con el orden por defecto
+            models.Index(fields=['user', '-created_at'], name='idx_flightreq_user_created'),
+        ]
 
     def __str__(self):
         return f"Flight Request {self.id} - {self.destination.name} on {self.travel_date}"
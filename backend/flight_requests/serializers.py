@@ -30,7 +30,8 @@ class FlightRequestDetailSerializer(serializers.ModelSerializer):
 class FlightRequestCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = FlightRequest
-        fields = ['destination', 'origin', 'travel_date', 'status', 'companions', 'notes']
+        fields = ['id', 'destination', 'origin', 'travel_date', 'status', 'companions', 'notes']
+        read_only_fields = ['id']  # El cliente necesita el id para reservar sobre la solicitud
         
     def validate_companions(self, value):
         if value < 1:
@@ -1,6 +1,40 @@
+from functools import partial
+
 from django.apps import AppConfig
 
+# Hasta este número de vuelos el search_document se rehace en la misma
+# petición; por encima, en una tarea de Celery
+AIRLINE_REFRESH_INLINE_LIMIT = 500
+
 
 class FlightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flights'
+
+    def ready(self):
+        # Renombrar una aerolínea debe refrescar el search_document de sus vuelos
+        from django.db import transaction
+        from django.db.models.signals import post_save, pre_save
+        from airlines.models import Airline
+        from search.models import refresh_search_documents
+        from .models import Flight
+        from .tasks import refresh_airline_search_documents
+
+        def snapshot_airline_name(sender, instance, raw=False, update_fields=None, **kwargs):
+            # Nombre guardado antes del save(); solo se consulta si el save() puede cambiarlo
+            instance._saved_name = None
+            if not raw and instance.pk is not None and (update_fields is None or 'name' in update_fields):
+                instance._saved_name = Airline.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+        def refresh_airline_flights(sender, instance, created, raw=False, **kwargs):
+            saved_name = getattr(instance, '_saved_name', None)
+            if created or raw or saved_name is None or saved_name == instance.name:
+                return
+            flights = Flight.objects.filter(airline=instance)
+            if flights.count() > AIRLINE_REFRESH_INLINE_LIMIT:
+                transaction.on_commit(partial(refresh_airline_search_documents.delay, instance.pk))
+            else:
+                refresh_search_documents(flights)
+
+        pre_save.connect(snapshot_airline_name, sender=Airline, weak=False, dispatch_uid='flights_airline_saved_name')
+        post_save.connect(refresh_airline_flights, sender=Airline, weak=False, dispatch_uid='flights_airline_search_document')
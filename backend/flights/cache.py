@@ -0,0 +1,19 @@
+# Invalidación de las cachés de vuelos (vistas síncronas y asíncronas)
+from django.core.cache import cache
+
+
+def clear_flight_cache(pk=None, all_details=False):
+    """Limpia el caché de detalle (de pk, o de todos con all_details) y todas las listas/acciones GET."""
+    if all_details:
+        cache.delete_pattern("flight_detail_*")
+    elif pk:
+        # Borra el detalle (independiente del token, ya que es público)
+        cache.delete_pattern(f"flight_detail_{pk}*")
+
+    # Borra todos los cachés de listas (independiente del token)
+    cache.delete_pattern("flights_list_*")
+    # Borra los cachés de las acciones personalizadas (key_prefix)
+    cache.delete_pattern("flights_available*")
+    cache.delete_pattern("flights_upcoming*")
+    cache.delete_pattern("flights_search_route*")
+    cache.delete_pattern("flights_by_airline*")
@@ -0,0 +1,46 @@
+# Publicación de cambios de vuelos en Redis pub/sub (consumidos por el SSE de catalog)
+import json
+import logging
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+FLIGHT_EVENTS_CHANNEL = 'flight_events'
+
+
+def flight_events_channel():
+    # Respeta el KEY_PREFIX de CACHES['default'] (varios entornos, un Redis)
+    return cache.make_key(FLIGHT_EVENTS_CHANNEL)
+
+
+def _publish(payload):
+    # En autocommit on_commit() publica en el acto: la escritura ya está
+    # guardada y una caída de Redis no debe convertirla en un 500
+    try:
+        get_redis_connection('default').publish(flight_events_channel(), payload)
+    except RedisError as exc:
+        logger.warning('Flight event not published (%s): %s', exc, payload)
+
+
+def publish_flight_event(flight_id, event, changes):
+    """
+    Publish {'id', 'event', 'changes'} for a flight once the current
+    transaction commits, so subscribers never see rolled-back data.
+    """
+    payload = json.dumps(
+        {
+            'id': flight_id,
+            'event': event,
+            'changes': {
+                name: value.pk if isinstance(value, models.Model) else value
+                for name, value in changes.items()
+            },
+        },
+        cls=JSONEncoder,
+    )
+    transaction.on_commit(lambda: _publish(payload))
@@ -0,0 +1,390 @@
+# Importación masiva de itinerarios de vuelos (CSV / JSON) con COPY + upsert
+import csv
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from airlines.models import Airline
+
+from .cache import clear_flight_cache
+from .models import Flight
+
+# Filas por lote: validación, resolución de aerolíneas y un COPY por lote
+IMPORT_BATCH_SIZE = 5000
+# Errores de fila que se devuelven en el resumen (el total siempre se cuenta)
+MAX_REPORTED_ERRORS = 100
+JSON_READ_SIZE = 64 * 1024
+# Un objeto JSON más grande que esto se considera un archivo corrupto
+MAX_JSON_RECORD_SIZE = 1024 * 1024
+
+IMPORT_FIELDS = (
+    'flight_code', 'airline', 'origin', 'destination', 'departure_datetime',
+    'arrival_datetime', 'number_of_stops', 'adult_price', 'child_price',
+    'special_price', 'available_seats', 'status', 'notes',
+)
+REQUIRED_FIELDS = (
+    'flight_code', 'airline', 'origin', 'destination',
+    'departure_datetime', 'arrival_datetime', 'adult_price', 'child_price',
+)
+# numeric(10, 2)
+MAX_PRICE = Decimal('99999999.99')
+# integer (int4): number_of_stops, available_seats
+MAX_COUNT = 2147483647
+# Los que admite el CHECK flights_status_check de la tabla (no Flight.STATUS_CHOICES):
+# un estado fuera de esta lista haría fallar el upsert y toda la importación
+VALID_STATUSES = {'scheduled', 'boarding', 'departed', 'arrived', 'cancelled', 'delayed'}
+
+STAGING_TABLE = 'flight_import_staging'
+STAGING_COLUMNS = (
+    'row_number', 'flight_code', 'airline_id', 'origin', 'destination',
+    'departure_datetime', 'arrival_datetime', 'number_of_stops',
+    'adult_price', 'child_price', 'special_price', 'available_seats',
+    'status', 'notes',
+)
+UPDATE_COLUMNS = STAGING_COLUMNS[2:] + ('search_document', 'updated_at')
+
+
+class FlightImportError(ValueError):
+    """The file cannot be read (unknown format, malformed JSON, missing columns)"""
+
+
+def detect_format(filename, content_type=None):
+    """'csv' or 'json' from the file extension or content type"""
+    name = (filename or '').lower()
+    if name.endswith('.csv') or content_type == 'text/csv':
+        return 'csv'
+    if name.endswith(('.json', '.jsonl', '.ndjson')) or content_type in ('application/json', 'application/x-ndjson'):
+        return 'json'
+    raise FlightImportError('Unsupported file format, expected CSV or JSON')
+
+
+def _text(fileobj):
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+
+
+def iter_csv_records(fileobj):
+    """Una fila del CSV (dict) cada vez; la cabecera nombra las columnas"""
+    reader = csv.DictReader(_text(fileobj))
+    missing = set(REQUIRED_FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        raise FlightImportError(f'Missing columns: {", ".join(sorted(missing))}')
+    yield from reader
+
+
+def iter_json_records(fileobj):
+    """
+    Objetos de un array JSON o de un archivo JSON Lines, decodificados de
+    forma incremental: nunca se carga el archivo entero en memoria.
+    """
+    stream = _text(fileobj)
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    in_array = None
+    eof = False
+
+    while True:
+        # Salta separadores entre objetos
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(buffer):
+            if eof:
+                break
+            buffer, position = stream.read(JSON_READ_SIZE), 0
+            eof = not buffer
+            continue
+
+        if in_array is None:
+            in_array = buffer[position] == '['
+            if in_array:
+                position += 1
+            continue
+        if in_array and buffer[position] == ']':
+            break
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as exc:
+            chunk = '' if eof else stream.read(JSON_READ_SIZE)
+            if not chunk or len(buffer) - position > MAX_JSON_RECORD_SIZE:
+                raise FlightImportError(f'Malformed JSON: {exc.msg}') from exc
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        if not isinstance(record, dict):
+            raise FlightImportError('Each JSON record must be an object')
+        yield record
+        position = end
+
+
+def _read_errors(records):
+    """Los errores de lectura del archivo (codificación, CSV mal formado) como FlightImportError"""
+    try:
+        yield from records
+    except UnicodeDecodeError as exc:
+        raise FlightImportError('File must be UTF-8 encoded') from exc
+    except csv.Error as exc:
+        raise FlightImportError(f'Malformed CSV: {exc}') from exc
+
+
+def _batches(records, size):
+    batch = []
+    for row_number, record in enumerate(records, start=1):
+        batch.append((row_number, record))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        value = str(value)
+    return value.strip()
+
+
+def _parse_datetime(value, default_timezone):
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=default_timezone)
+    # Columnas timestamp sin zona: Django guarda UTC
+    return parsed.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def _parse_price(value, field, errors, required=True):
+    if value == '':
+        if required:
+            errors.append(f'{field} is required')
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        errors.append(f'{field} must be a number')
+        return None
+    if not price.is_finite() or price < 0 or price > MAX_PRICE:
+        errors.append(f'{field} must be between 0 and {MAX_PRICE}')
+        return None
+    return price
+
+
+def _parse_count(value, field, errors, default):
+    if value == '':
+        return default
+    try:
+        count = int(value)
+    except ValueError:
+        errors.append(f'{field} must be an integer')
+        return None
+    if count < 0:
+        errors.append(f'{field} cannot be negative')
+        return None
+    if count > MAX_COUNT:
+        errors.append(f'{field} must be between 0 and {MAX_COUNT}')
+        return None
+    return count
+
+
+def _resolve_airlines(batch, airline_ids):
+    """Completa airline_ids (código o id -> id) con una consulta por lote"""
+    pending = {
+        _clean(record.get('airline')) for _row_number, record in batch
+    } - airline_ids.keys() - {''}
+    if not pending:
+        return
+    codes = {value for value in pending if not value.isdigit()}
+    ids = {int(value) for value in pending if value.isdigit()}
+    for airline_id, code in Airline.objects.filter(code__in=codes).values_list('id', 'code'):
+        airline_ids[code] = airline_id
+    for airline_id in Airline.objects.filter(id__in=ids).values_list('id', flat=True):
+        airline_ids[str(airline_id)] = airline_id
+    for value in pending - airline_ids.keys():
+        airline_ids[value] = None
+
+
+def validate_batch(batch, airline_ids):
+    """
+    Valida un lote de (row_number, record). Devuelve las filas listas para
+    COPY y los errores [{'row': n, 'errors': [...]}] de las rechazadas.
+    Mismas reglas que FlightCreateUpdateSerializer.
+    """
+    _resolve_airlines(batch, airline_ids)
+    # Fechas sin zona: TIME_ZONE, igual que los DateTimeField de DRF
+    default_timezone = timezone.get_current_timezone()
+    rows = []
+    rejected = []
+    for row_number, record in batch:
+        errors = []
+        values = {field: _clean(record.get(field)) for field in IMPORT_FIELDS}
+
+        for field in ('flight_code', 'origin', 'destination'):
+            if not values[field]:
+                errors.append(f'{field} is required')
+        for field, max_length in (('flight_code', 20), ('origin', 255), ('destination', 255)):
+            if len(values[field]) > max_length:
+                errors.append(f'{field} cannot be longer than {max_length} characters')
+
+        airline_id = airline_ids.get(values['airline'])
+        if not values['airline']:
+            errors.append('airline is required')
+        elif airline_id is None:
+            errors.append(f"Unknown airline: {values['airline']}")
+
+        departure = arrival = None
+        for field in ('departure_datetime', 'arrival_datetime'):
+            if not values[field]:
+                errors.append(f'{field} is required')
+                continue
+            try:
+                parsed = _parse_datetime(values[field], default_timezone)
+            except ValueError:
+                errors.append(f'{field} must be an ISO 8601 datetime')
+                continue
+            if field == 'departure_datetime':
+                departure = parsed
+            else:
+                arrival = parsed
+        if departure and arrival and arrival <= departure:
+            errors.append('Arrival datetime must be after departure datetime')
+
+        if values['origin'] and values['origin'] == values['destination']:
+            errors.append('Origin and destination cannot be the same')
+
+        adult_price = _parse_price(values['adult_price'], 'adult_price', errors)
+        child_price = _parse_price(values['child_price'], 'child_price', errors)
+        special_price = _parse_price(values['special_price'], 'special_price', errors, required=False)
+        number_of_stops = _parse_count(values['number_of_stops'], 'number_of_stops', errors, 0)
+        available_seats = _parse_count(values['available_seats'], 'available_seats', errors, 0)
+
+        flight_status = values['status'] or 'scheduled'
+        if flight_status not in VALID_STATUSES:
+            errors.append(f'Status must be one of: {", ".join(sorted(VALID_STATUSES))}')
+
+        if errors:
+            rejected.append({'row': row_number, 'errors': errors})
+            continue
+
+        rows.append((
+            row_number, values['flight_code'], airline_id, values['origin'], values['destination'],
+            departure, arrival, number_of_stops, adult_price, child_price, special_price,
+            available_seats, flight_status, values['notes'] or None,
+        ))
+    return rows, rejected
+
+
+def _create_staging_table(cursor):
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE {STAGING_TABLE} (
+            row_number bigint NOT NULL,
+            flight_code varchar(20) NOT NULL,
+            airline_id integer NOT NULL,
+            origin varchar(255) NOT NULL,
+            destination varchar(255) NOT NULL,
+            departure_datetime timestamp NOT NULL,
+            arrival_datetime timestamp NOT NULL,
+            number_of_stops integer NOT NULL,
+            adult_price numeric(10, 2) NOT NULL,
+            child_price numeric(10, 2) NOT NULL,
+            special_price numeric(10, 2),
+            available_seats integer NOT NULL,
+            status varchar(20) NOT NULL,
+            notes text
+        ) ON COMMIT DROP
+    """)
+
+
+def _copy_rows(cursor, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    # CSV de COPY: un campo vacío sin comillas es NULL. copy() es del cursor
+    # de psycopg 3: sus errores se traducen a los de django.db (DataError)
+    with connection.wrap_database_errors:
+        with cursor.copy(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+        ) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _upsert(cursor):
+    """Un único INSERT ... ON CONFLICT desde staging; si un código se repite gana la última fila"""
+    insert_columns = STAGING_COLUMNS[1:] + ('search_document', 'created_at', 'updated_at')
+    select_columns = ', '.join(f's.{column}' for column in STAGING_COLUMNS[1:])
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in UPDATE_COLUMNS)
+    # Una fila actualizada cambia de versión: los If-Match leídos antes fallan con 412
+    updates += f', version = {Flight._meta.db_table}.version + 1'
+    now = timezone.now()
+    cursor.execute(f"""
+        WITH upserted AS (
+            INSERT INTO {Flight._meta.db_table} ({', '.join(insert_columns)})
+            SELECT DISTINCT ON (s.flight_code) {select_columns},
+                lower(concat_ws(' ',
+                    NULLIF(s.flight_code, ''), NULLIF(a.name, ''),
+                    NULLIF(s.origin, ''), NULLIF(s.destination, ''), NULLIF(s.notes, '')
+                )),
+                %s, %s
+            FROM {STAGING_TABLE} s
+            JOIN {Airline._meta.db_table} a ON a.id = s.airline_id
+            ORDER BY s.flight_code, s.row_number DESC
+            ON CONFLICT (flight_code) DO UPDATE SET {updates}
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted)
+        FROM upserted
+    """, [now, now])
+    return cursor.fetchone()
+
+
+def import_flights(records, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa (crea o actualiza por flight_code) los registros de vuelos en una
+    sola transacción: cada lote validado entra por COPY a una tabla temporal
+    y al final un solo upsert pasa todo a flights. Las filas inválidas se
+    descartan y se informan. La caché de vuelos se limpia una sola vez.
+    """
+    airline_ids = {}
+    summary = {'rows': 0, 'created': 0, 'updated': 0, 'invalid': 0, 'errors': []}
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            _create_staging_table(cursor)
+            staged = 0
+            for batch in _batches(records, max(1, batch_size)):
+                rows, rejected = validate_batch(batch, airline_ids)
+                summary['rows'] += len(batch)
+                summary['invalid'] += len(rejected)
+                room = MAX_REPORTED_ERRORS - len(summary['errors'])
+                summary['errors'].extend(rejected[:max(0, room)])
+                if rows:
+                    _copy_rows(cursor, rows)
+                    staged += len(rows)
+            if staged:
+                summary['created'], summary['updated'] = _upsert(cursor)
+            # ON COMMIT DROP no basta si la importación corre dentro de otra transacción
+            cursor.execute(f'DROP TABLE {STAGING_TABLE}')
+
+    if summary['updated']:
+        # Los detalles cacheados de los vuelos actualizados llevan la versión
+        # (ETag) anterior: con ella los If-Match fallarían con 412
+        clear_flight_cache(all_details=True)
+    elif summary['created']:
+        clear_flight_cache()
+    return summary
+
+
+def import_flights_file(fileobj, file_format, batch_size=IMPORT_BATCH_SIZE):
+    """import_flights() for an open CSV or JSON file (text or binary)"""
+    if file_format == 'csv':
+        records = iter_csv_records(fileobj)
+    elif file_format == 'json':
+        records = iter_json_records(fileobj)
+    else:
+        raise FlightImportError('Unsupported file format, expected CSV or JSON')
+    return import_flights(_read_errors(records), batch_size=batch_size)
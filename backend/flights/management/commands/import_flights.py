@@ -0,0 +1,50 @@
+# flights/management/commands/import_flights.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DataError, IntegrityError
+
+from flights.importer import (
+    IMPORT_BATCH_SIZE,
+    FlightImportError,
+    detect_format,
+    import_flights_file,
+)
+
+
+class Command(BaseCommand):
+    """
+    Importa itinerarios completos (temporadas de aerolíneas) desde CSV o JSON:
+    crea los vuelos nuevos y actualiza los existentes por flight_code.
+    """
+    help = 'Importa vuelos de forma masiva desde un archivo CSV o JSON (array o JSON Lines).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo CSV o JSON a importar.')
+        parser.add_argument(
+            '--format', dest='file_format', choices=['csv', 'json'],
+            help='Formato del archivo (por defecto se deduce de la extensión).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Filas validadas y copiadas por lote (por defecto %(default)s).'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            file_format = options['file_format'] or detect_format(options['path'])
+            with open(options['path'], 'rb') as fileobj:
+                summary = import_flights_file(fileobj, file_format, batch_size=options['batch_size'])
+        except (OSError, FlightImportError, IntegrityError, DataError) as exc:
+            raise CommandError(str(exc))
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f"Fila {error['row']}: {'; '.join(error['errors'])}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación completada en {time.perf_counter() - start:.1f}s: {summary['rows']} filas, "
+            f"{summary['created']} creados, {summary['updated']} actualizados, {summary['invalid']} inválidas."
+        ))
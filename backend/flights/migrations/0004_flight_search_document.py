@@ -0,0 +1,47 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    flights es una tabla no gestionada (managed=False): el DDL se aplica
+    con RunSQL y state_operations mantiene el estado de Django al día.
+    """
+
+    dependencies = [
+        ('flights', '0003_flight_delete_flightrequest'),
+        ('airlines', '0001_initial'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "ALTER TABLE flights ADD COLUMN IF NOT EXISTS search_document text NOT NULL DEFAULT ''",
+                """
+                UPDATE flights f SET search_document = lower(concat_ws(' ',
+                    NULLIF(f.flight_code, ''), NULLIF(a.name, ''),
+                    NULLIF(f.origin, ''), NULLIF(f.destination, ''), NULLIF(f.notes, '')
+                ))
+                FROM airlines a
+                WHERE a.id = f.airline_id
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_flight_search_document ON flights USING gin (search_document gin_trgm_ops)",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS idx_flight_search_document",
+                "ALTER TABLE flights DROP COLUMN IF EXISTS search_document",
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='flight',
+                    name='search_document',
+                    field=models.TextField(blank=True, db_column='search_document', default='', editable=False),
+                ),
+                migrations.AddIndex(
+                    model_name='flight',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='idx_flight_search_document', opclasses=['gin_trgm_ops']),
+                ),
+            ],
+        ),
+    ]
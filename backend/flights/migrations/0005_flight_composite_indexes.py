@@ -0,0 +1,58 @@
+from django.db import migrations, models
+from django.db.models import Q
+
+
+class Migration(migrations.Migration):
+    """
+    flights es una tabla no gestionada (managed=False): los índices se crean
+    con RunSQL y state_operations mantiene el estado de Django al día.
+    CONCURRENTLY no bloquea las escrituras, pero no puede ir dentro de una
+    transacción: la migración es atomic = False.
+    """
+    atomic = False
+
+    dependencies = [
+        ('flights', '0004_flight_search_document'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_available ON flights (departure_datetime)
+                WHERE status = 'scheduled' AND available_seats > 0
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_flight_available",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flight',
+                    index=models.Index(
+                        condition=Q(status='scheduled', available_seats__gt=0),
+                        fields=['departure_datetime'], name='idx_flight_available',
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_status_departure ON flights (status, departure_datetime)",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_flight_status_departure",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flight',
+                    index=models.Index(fields=['status', 'departure_datetime'], name='idx_flight_status_departure'),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_flight_airline_status
+                ON flights (airline_id, status, departure_datetime)
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS idx_flight_airline_status",
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='flight',
+                    index=models.Index(fields=['airline', 'status', 'departure_datetime'], name='idx_flight_airline_status'),
+                ),
+            ],
+        ),
+    ]
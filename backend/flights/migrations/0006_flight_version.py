@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    flights es una tabla no gestionada (managed=False): la columna version
+    se añade con RunSQL y state_operations mantiene el estado de Django al
+    día. Con un DEFAULT constante PostgreSQL no reescribe la tabla.
+    """
+
+    dependencies = [
+        ('flights', '0005_flight_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="ALTER TABLE flights ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1",
+            reverse_sql="ALTER TABLE flights DROP COLUMN IF EXISTS version",
+            state_operations=[
+                migrations.AddField(
+                    model_name='flight',
+                    name='version',
+                    field=models.PositiveIntegerField(db_column='version', db_default=1, default=1, editable=False),
+                ),
+            ],
+        ),
+    ]
@@ -1,7 +1,11 @@
 ﻿from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from concurrency.models import VersionedModelMixin
+from search.models import SearchDocumentMixin
 
 
-class Flight(models.Model):
+class Flight(VersionedModelMixin, SearchDocumentMixin, models.Model):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
         ('delayed', 'Delayed'),
@@ -25,10 +29,24 @@ class Flight(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    search_document_fields = ('flight_code', 'airline__name', 'origin', 'destination', 'notes')
+
     class Meta:
         managed = False
         db_table = 'flights'
         ordering = ['departure_datetime']
+        indexes = [
+            GinIndex(fields=['search_document'], name='idx_flight_search_document', opclasses=['gin_trgm_ops']),
+            # available: parcial, solo los vuelos reservables y ya en el orden del listado
+            models.Index(
+                fields=['departure_datetime'], name='idx_flight_available',
+                condition=Q(status='scheduled', available_seats__gt=0),
+            ),
+            # upcoming, search_route y ?status=: igualdad en status y rango/orden por salida
+            models.Index(fields=['status', 'departure_datetime'], name='idx_flight_status_departure'),
+            # by_airline y ?airline=&status=
+            models.Index(fields=['airline', 'status', 'departure_datetime'], name='idx_flight_airline_status'),
+        ]
 
     def __str__(self):
         return f"{self.flight_code} - {self.origin} to {self.destination}"
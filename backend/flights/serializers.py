@@ -1,4 +1,5 @@
 ﻿from rest_framework import serializers
+from concurrency.serializers import UpdateFieldsSerializerMixin
 from .models import Flight
 from airlines.serializers import AirlineSerializer
 
@@ -24,18 +25,18 @@ class FlightDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Flight
-        fields = '__all__'
+        exclude = ['search_document']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class FlightCreateUpdateSerializer(serializers.ModelSerializer):
+class FlightCreateUpdateSerializer(UpdateFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = [
             'flight_code', 'airline', 'origin', 'destination',
             'departure_datetime', 'arrival_datetime', 'number_of_stops',
             'adult_price', 'child_price', 'special_price',
-            'available_seats', 'status', 'notes'
+            'available_seats', 'status', 'notes', 'version'
         ]
         
     def validate(self, data):
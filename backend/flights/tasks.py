@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from flights.models import Flight
+from search.models import refresh_search_documents
+
+
+@shared_task
+def refresh_airline_search_documents(airline_id):
+    """Reconstruye el search_document de los vuelos de una aerolínea renombrada"""
+    updated = refresh_search_documents(Flight.objects.filter(airline_id=airline_id))
+    return f"search_document actualizado en {updated} vuelos de la aerolínea {airline_id}."
@@ -3,8 +3,14 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
+from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from .models import Flight
 from airlines.models import Airline
 
@@ -43,6 +49,27 @@ class FlightModelTest(TestCase):
         expected = f"{self.flight.flight_code} - {self.flight.origin} to {self.flight.destination}"
         self.assertEqual(str(self.flight), expected)
 
+    def test_airline_rename_refreshes_search_document(self):
+        # Guardar sin cambiar el nombre no reescribe los vuelos
+        with CaptureQueriesContext(connection) as queries:
+            self.airline.save()
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('UPDATE "flights"')])
+
+        self.airline.name = 'LATAM Ecuador'
+        self.airline.save()
+        self.flight.refresh_from_db()
+        self.assertIn('latam ecuador', self.flight.search_document)
+
+    def test_large_airline_rename_runs_in_celery(self):
+        self.airline.name = 'LATAM Ecuador'
+        with mock.patch('flights.apps.AIRLINE_REFRESH_INLINE_LIMIT', 0), \
+                mock.patch('flights.tasks.refresh_airline_search_documents.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.airline.save()
+        delay.assert_called_once_with(self.airline.pk)
+        self.flight.refresh_from_db()
+        self.assertNotIn('latam ecuador', self.flight.search_document)
+
 class FlightAPITest(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -199,3 +226,203 @@ class FlightAPITest(APITestCase):
         response = self.client.get(f'/api/flights/by_airline/?airline_id={self.airline.id}')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
+
+
+class FlightImportTest(APITestCase):
+    CSV_HEADER = (
+        'flight_code,airline,origin,destination,departure_datetime,arrival_datetime,'
+        'number_of_stops,adult_price,child_price,special_price,available_seats,status,notes\n'
+    )
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin',
+            password='admin123',
+            email='admin@example.com'
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            email='test@example.com'
+        )
+        self.airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        self.flight = Flight.objects.create(
+            flight_code='LA2501',
+            airline=self.airline,
+            origin='Quito',
+            destination='Guayaquil',
+            departure_datetime=timezone.make_aware(datetime(2030, 1, 1, 8, 0)),
+            arrival_datetime=timezone.make_aware(datetime(2030, 1, 1, 9, 0)),
+            adult_price=Decimal('150.00'),
+            child_price=Decimal('100.00'),
+            available_seats=180
+        )
+
+    def _csv(self, *rows):
+        return (self.CSV_HEADER + ''.join(row + '\n' for row in rows)).encode()
+
+    def test_csv_import_creates_updates_and_reports_invalid_rows(self):
+        from io import BytesIO
+        from .importer import import_flights_file
+
+        data = self._csv(
+            'LA2501,LA,Quito,Guayaquil,2030-01-01T08:00:00,2030-01-01T09:00:00,0,199.90,120,,150,delayed,',
+            f'LA9001,{self.airline.id},Quito,Cuenca,2030-02-01 10:00,2030-02-01 11:00,0,90,60,70,100,,Temporada alta',
+            'LA9002,LA,Quito,Quito,2030-02-01T10:00:00,2030-02-01T11:00:00,0,90,60,,100,,',
+            'LA9003,XX,Quito,Loja,2030-02-01T11:00:00,2030-02-01T10:00:00,0,-1,60,,100,,',
+        )
+        summary = import_flights_file(BytesIO(data), 'csv', batch_size=2)
+
+        self.assertEqual(summary['rows'], 4)
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['updated'], 1)
+        self.assertEqual(summary['invalid'], 2)
+        self.assertEqual([error['row'] for error in summary['errors']], [3, 4])
+        self.assertIn('Origin and destination cannot be the same', summary['errors'][0]['errors'])
+        self.assertEqual(len(summary['errors'][1]['errors']), 3)
+
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.adult_price, Decimal('199.90'))
+        self.assertEqual(self.flight.status, 'delayed')
+        self.assertEqual(self.flight.version, 2)
+        created = Flight.objects.get(flight_code='LA9001')
+        self.assertEqual(created.version, 1)
+        self.assertEqual(created.airline, self.airline)
+        self.assertEqual(created.status, 'scheduled')
+        self.assertEqual(created.duration_minutes, 60)
+        self.assertEqual(created.search_document, 'la9001 latam airlines quito cuenca temporada alta')
+        self.assertFalse(Flight.objects.filter(flight_code__in=['LA9002', 'LA9003']).exists())
+
+    def test_json_array_and_lines_are_parsed_incrementally(self):
+        import json
+        from io import StringIO
+        from unittest import mock
+        from . import importer
+
+        records = [
+            {
+                'flight_code': f'LA{9100 + n}', 'airline': 'LA', 'origin': 'Quito',
+                'destination': 'Manta', 'departure_datetime': '2030-03-01T07:00:00-05:00',
+                'arrival_datetime': '2030-03-01T08:00:00-05:00', 'adult_price': 80,
+                'child_price': 50, 'available_seats': 120, 'notes': 'ñandú ' * 5,
+            }
+            for n in range(30)
+        ]
+        # La última fila con el mismo flight_code gana
+        records.append(dict(records[0], available_seats=7))
+
+        with mock.patch.object(importer, 'JSON_READ_SIZE', 64):
+            parsed = list(importer.iter_json_records(StringIO(json.dumps(records, ensure_ascii=False))))
+            self.assertEqual(parsed, records)
+            lines = '\n'.join(json.dumps(record) for record in records)
+            self.assertEqual(list(importer.iter_json_records(StringIO(lines))), records)
+
+            summary = importer.import_flights_file(StringIO(json.dumps(records)), 'json', batch_size=7)
+        self.assertEqual(summary['created'], 30)
+        self.assertEqual(Flight.objects.get(flight_code='LA9100').available_seats, 7)
+
+        with self.assertRaises(importer.FlightImportError):
+            list(importer.iter_json_records(StringIO('[{"flight_code": "LA1"')))
+
+    def test_import_endpoint_requires_admin_and_clears_cache_once(self):
+        from unittest import mock
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        def upload():
+            return SimpleUploadedFile('schedule.csv', self._csv(
+                'LA9201,LA,Quito,Cuenca,2030-02-01T10:00:00,2030-02-01T11:00:00,0,90,60,,100,,',
+                'LA9202,LA,Cuenca,Quito,2030-02-01T12:00:00,2030-02-01T13:00:00,0,90,60,,100,,',
+            ), content_type='text/csv')
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/flights/import/', {'file': upload()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.admin)
+        with mock.patch('flights.importer.clear_flight_cache') as clear_cache:
+            response = self.client.post('/api/flights/import/', {'file': upload()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        clear_cache.assert_called_once_with()
+
+        response = self.client.post('/api/flights/import/', {
+            'file': SimpleUploadedFile('schedule.csv', b'flight_code,origin\nLA1,Quito\n', content_type='text/csv')
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Missing columns', response.data['error'])
+
+    def test_out_of_range_counts_are_row_errors(self):
+        from io import BytesIO
+        from .importer import import_flights_file
+
+        summary = import_flights_file(BytesIO(self._csv(
+            'LA9301,LA,Quito,Cuenca,2030-02-01T10:00:00,2030-02-01T11:00:00,3000000000,90,60,,100,,',
+            'LA9302,LA,Quito,Cuenca,2030-02-01T10:00:00,2030-02-01T11:00:00,0,90,60,,2147483647,,',
+        )), 'csv')
+        self.assertEqual((summary['created'], summary['invalid']), (1, 1))
+        self.assertEqual(summary['errors'][0]['row'], 1)
+        self.assertIn('number_of_stops must be between 0 and 2147483647', summary['errors'][0]['errors'])
+
+    def test_bad_status_is_a_row_error(self):
+        from io import BytesIO
+        from .importer import import_flights_file
+
+        summary = import_flights_file(BytesIO(self._csv(
+            'LA9501,LA,Quito,Cuenca,2030-02-01T10:00:00,2030-02-01T11:00:00,0,90,60,,100,completed,',
+            'LA9502,LA,Quito,Cuenca,2030-02-01T12:00:00,2030-02-01T13:00:00,0,90,60,,100,arrived,',
+            'LA9503,LA,Quito,Cuenca,2030-02-01T14:00:00,2030-02-01T15:00:00,0,90,60,,100,boarding,',
+        )), 'csv')
+        self.assertEqual((summary['created'], summary['invalid']), (2, 1))
+        self.assertEqual(summary['errors'][0]['row'], 1)
+        self.assertEqual(
+            dict(Flight.objects.filter(flight_code__startswith='LA95').values_list('flight_code', 'status')),
+            {'LA9502': 'arrived', 'LA9503': 'boarding'}
+        )
+
+    def test_update_clears_cached_flight_detail(self):
+        from django.core.cache import cache
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+        url = f'/api/flights/{self.flight.pk}/'
+        response = self.client.get(url)
+        self.assertEqual((response.data['available_seats'], response['ETag']), (180, '"1"'))
+
+        response = self.client.post('/api/flights/import/', {'file': SimpleUploadedFile('schedule.csv', self._csv(
+            'LA2501,LA,Quito,Guayaquil,2030-01-01T08:00:00,2030-01-01T09:00:00,0,150,100,,42,,',
+        ), content_type='text/csv')}, format='multipart')
+        self.assertEqual(response.data['updated'], 1)
+
+        response = self.client.get(url)
+        self.assertEqual((response.data['available_seats'], response['ETag']), (42, '"2"'))
+        response = self.client.post(f'{url}update_seats/', {'available_seats': 40}, format='json', HTTP_IF_MATCH='"2"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unreadable_files_return_400(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.core.management import CommandError, call_command
+        from tempfile import NamedTemporaryFile
+
+        row = 'LA9401,LA,Quito,Cuenca,2030-02-01T10:00:00,2030-02-01T11:00:00,0,90,60,,100,,{notes}'
+        files = {
+            'latin-1': (self.CSV_HEADER + row.format(notes='Año nuevo')).encode('latin-1'),
+            'malformed csv': self._csv(row.format(notes='x' * 200000)),
+            # Pasa la validación pero PostgreSQL la rechaza en el COPY (DataError)
+            'nul byte': self._csv(row.format(notes='a\x00b')),
+        }
+        self.client.force_authenticate(self.admin)
+        for name, content in files.items():
+            with self.subTest(name):
+                response = self.client.post('/api/flights/import/', {
+                    'file': SimpleUploadedFile('schedule.csv', content, content_type='text/csv')
+                }, format='multipart')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+
+                with NamedTemporaryFile(suffix='.csv') as fileobj:
+                    fileobj.write(content)
+                    fileobj.flush()
+                    with self.assertRaises(CommandError):
+                        call_command('import_flights', fileobj.name, stdout=StringIO())
+        self.assertFalse(Flight.objects.filter(flight_code='LA9401').exists())
@@ -1,12 +1,21 @@
 ﻿from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from search.filters import IndexedSearchFilter
+from django.db import DataError, IntegrityError
 from django.utils import timezone
 from datetime import timedelta
+from archive.mixins import IncludeArchivedMixin
+from archive.models import ArchivedFlight
+from concurrency.mixins import OptimisticLockMixin
 from .models import Flight
+from .cache import clear_flight_cache
+from .events import publish_flight_event
+from .importer import FlightImportError, detect_format, import_flights_file
 from .serializers import (
     FlightListSerializer,
     FlightDetailSerializer,
@@ -22,9 +31,11 @@ from django.views.decorators.vary import vary_on_headers # ¡CORRECCIÓN JWT!
 # --- FIN DE ADICIONES ---
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(OptimisticLockMixin, IncludeArchivedMixin, viewsets.ModelViewSet):
     queryset = Flight.objects.select_related('airline').all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ?include_archived=true para administradores (archive.mixins)
+    archived_queryset = ArchivedFlight.objects.select_related('airline')
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['status', 'airline', 'number_of_stops']
     search_fields = ['flight_code', 'notes', 'airline__name', 'origin', 'destination']
     ordering_fields = ['departure_datetime', 'adult_price', 'available_seats']
@@ -38,7 +49,7 @@ class FlightViewSet(viewsets.ModelViewSet):
         return FlightDetailSerializer
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'update_seats', 'change_status']:
+        if self.action in ['create', 'update', 'partial_update', 'destroy', 'update_seats', 'change_status', 'import_flights']:
             # Solo Admin puede escribir
             return [IsAdminUser()]
         # Permitir que cualquiera lea (list, retrieve, actions GET)
@@ -47,17 +58,7 @@ class FlightViewSet(viewsets.ModelViewSet):
     # --- FUNCIÓN HELPER PARA LIMPIAR CACHÉ ---
     def _clear_flight_cache(self, pk=None):
         """Limpia el caché de detalle y todas las listas/acciones GET."""
-        if pk:
-            # Borra el detalle (independiente del token, ya que es público)
-            cache.delete_pattern(f"flight_detail_{pk}*")
-        
-        # Borra todos los cachés de listas (independiente del token)
-        cache.delete_pattern("flights_list_*")
-        # Borra los cachés de las acciones personalizadas (key_prefix)
-        cache.delete_pattern("flights_available*")
-        cache.delete_pattern("flights_upcoming*")
-        cache.delete_pattern("flights_search_route*")
-        cache.delete_pattern("flights_by_airline*")
+        clear_flight_cache(pk)
 
     # --- ACCIONES DE LECTURA (GET) CON CACHÉ ---
 
@@ -67,6 +68,9 @@ class FlightViewSet(viewsets.ModelViewSet):
         """List all flights (con caché manual)"""
         # Clave de caché única basada en los parámetros de consulta
         cache_key = f"flights_list_{request.query_params.urlencode()}"
+        if self.include_archived():
+            # La caché de listas es común a todos los usuarios
+            cache_key = f"flights_list_archived_{request.query_params.urlencode()}"
         
         cached_data = cache.get(cache_key)
         if cached_data:
@@ -92,6 +96,8 @@ class FlightViewSet(viewsets.ModelViewSet):
         """Get a single flight by ID (con caché manual)"""
         pk = kwargs.get('pk')
         cache_key = f"flight_detail_{pk}" # Clave simple, vary_on_headers hace la magia
+        if self.include_archived():
+            cache_key += '_archived'
 
         cached_data = cache.get(cache_key)
         if cached_data:
@@ -112,8 +118,19 @@ class FlightViewSet(viewsets.ModelViewSet):
         self._clear_flight_cache() # ¡LIMPIAR CACHÉ!
 
     def perform_update(self, serializer):
+        instance = serializer.instance
+        previous = {field: getattr(instance, field) for field in serializer.validated_data}
         serializer.save()
-        self._clear_flight_cache(pk=serializer.instance.pk) # ¡LIMPIAR CACHÉ!
+        self._clear_flight_cache(pk=instance.pk) # ¡LIMPIAR CACHÉ!
+
+        # Solo los campos que cambiaron (delta para el stream SSE)
+        changes = {
+            field: getattr(instance, field)
+            for field, value in previous.items()
+            if getattr(instance, field) != value
+        }
+        if changes:
+            publish_flight_event(instance.pk, 'update', changes)
 
     def perform_destroy(self, instance):
         pk = instance.pk
@@ -241,9 +258,10 @@ class FlightViewSet(viewsets.ModelViewSet):
             )
         
         flight.available_seats = seats
-        flight.save()
+        flight.save(update_fields=['available_seats'])
         
         self._clear_flight_cache(pk=flight.pk) # ¡LIMPIAR CACHÉ!
+        publish_flight_event(flight.pk, 'seats', {'available_seats': flight.available_seats})
         
         serializer = self.get_serializer(flight)
         return Response(serializer.data)
@@ -262,10 +280,32 @@ class FlightViewSet(viewsets.ModelViewSet):
             )
         
         flight.status = new_status
-        flight.save()
+        flight.save(update_fields=['status'])
         
         self._clear_flight_cache(pk=flight.pk) # ¡LIMPIAR CACHÉ!
+        publish_flight_event(flight.pk, 'status', {'status': flight.status})
         
         serializer = self.get_serializer(flight)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def import_flights(self, request):
+        """Bulk create/update flights (by flight_code) from a CSV or JSON file"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            file_format = request.data.get('file_format') or detect_format(upload.name, upload.content_type)
+            # Lee el archivo subido por lotes; la caché se limpia una sola vez al final
+            summary = import_flights_file(upload.file, file_format)
+        except (FlightImportError, IntegrityError, DataError) as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(summary)
@@ -0,0 +1,12 @@
+# App configuration for monitoring app
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+    verbose_name = 'Monitoring'
+
+    def ready(self):
+        # Señales de conexión (connection_created, worker_process_init) también en Celery
+        from . import connections  # noqa: F401
@@ -0,0 +1,26 @@
+# Cliente de django-redis que cuenta aciertos/fallos de caché por petición
+import time
+
+from django_redis.client import DefaultClient
+
+from .metrics import record_cache
+
+_MISSING = object()
+
+
+class InstrumentedClient(DefaultClient):
+    """CLIENT_CLASS de CACHES['default']: mismas operaciones, con métricas de lectura"""
+
+    def get(self, key, default=None, version=None, client=None):
+        start = time.perf_counter()
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        hit = value is not _MISSING
+        record_cache(int(hit), int(not hit), time.perf_counter() - start)
+        return value if hit else default
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        start = time.perf_counter()
+        values = super().get_many(keys, version=version, client=client)
+        record_cache(len(values), len(keys) - len(values), time.perf_counter() - start)
+        return values
@@ -0,0 +1,71 @@
+# Métricas de conexiones a la BD: aperturas, reutilización y estado del pool de psycopg 3
+import threading
+from collections import defaultdict
+
+from celery.signals import worker_process_init
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Contadores del proceso por alias de BD: ver get_connection_metrics()
+_metrics = defaultdict(lambda: {'opened': 0, 'reused': 0})
+_metrics_lock = threading.Lock()
+
+# Claves de psycopg_pool.ConnectionPool.get_stats() que se exponen
+POOL_GAUGES = ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')
+POOL_COUNTERS = ('requests_num', 'requests_queued', 'requests_errors', 'connections_num', 'connections_errors',
+                 'connections_lost', 'returns_bad')
+
+
+def _record(alias, name):
+    with _metrics_lock:
+        _metrics[alias][name] += 1
+
+
+def _connection_opened(sender, connection, **kwargs):
+    # Con pool la señal solo salta cuando el pool abre una conexión nueva
+    _record(connection.alias, 'opened')
+
+
+def record_reuse():
+    """
+    Al empezar una petición: cuenta las conexiones que siguen abiertas de la
+    anterior (CONN_MAX_AGE). Con pool la conexión se devuelve en cada
+    petición y la reutilización se ve en pool_stats().
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _record(connection.alias, 'reused')
+
+
+def pool_stats():
+    """{alias: get_stats() del pool} de las BD configuradas con OPTIONS['pool']"""
+    stats = {}
+    for alias in connections:
+        if connections.settings[alias].get('OPTIONS', {}).get('pool'):
+            stats[alias] = connections[alias].pool.get_stats()
+    return stats
+
+
+def get_connection_metrics():
+    """Copy of this process' connection counters, per database alias"""
+    with _metrics_lock:
+        return {alias: dict(values) for alias, values in _metrics.items()}
+
+
+def reset_connection_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def _discard_inherited_pools(*args, **kwargs):
+    """
+    Cada proceso hijo de Celery (prefork) crea su propio pool: el heredado
+    del padre comparte sockets con él, así que se descarta sin cerrarlo.
+    """
+    for alias in connections:
+        if connections.settings[alias].get('OPTIONS', {}).get('pool'):
+            type(connections[alias])._connection_pools.pop(alias, None)
+
+
+connection_created.connect(_connection_opened, dispatch_uid='monitoring_connection_opened')
+worker_process_init.connect(_discard_inherited_pools, dispatch_uid='monitoring_discard_inherited_pools')
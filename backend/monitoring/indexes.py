@@ -0,0 +1,161 @@
+# Informe de índices: sin uso, redundantes y que faltan (pg_stat_user_indexes / pg_stat_user_tables)
+from django.apps import apps
+from django.db import connection
+from django.db.models import ForeignKey
+
+# Tablas por debajo de este tamaño se leen enteras sin problema
+MIN_SEQ_SCAN_ROWS = 10_000
+
+INDEXES_SQL = """
+    SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid),
+           i.indisunique OR i.indisprimary, am.amname,
+           pg_get_expr(i.indpred, i.indrelid),
+           ARRAY(
+               SELECT coalesce(a.attname, '(expr)') || CASE WHEN k.option & 1 = 1 THEN ' DESC' ELSE '' END
+                      || CASE WHEN opc.opcdefault THEN '' ELSE ' ' || opc.opcname END
+               FROM unnest(i.indkey[0:i.indnkeyatts - 1], i.indoption[0:i.indnkeyatts - 1],
+                           i.indclass[0:i.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, option, opclass, n)
+               LEFT JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+               JOIN pg_opclass opc ON opc.oid = k.opclass
+               ORDER BY k.n
+           )
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    JOIN pg_class c ON c.oid = s.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE s.schemaname = current_schema()
+    ORDER BY s.relname, s.indexrelname
+"""
+
+TABLES_SQL = """
+    SELECT relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = current_schema()
+    ORDER BY relname
+"""
+
+
+def index_stats():
+    """Índices del esquema con su uso (idx_scan), tamaño y columnas clave"""
+    with connection.cursor() as cursor:
+        cursor.execute(INDEXES_SQL)
+        return [
+            {
+                'table': table, 'index': index, 'scans': scans, 'size': size, 'unique': unique,
+                'method': method, 'predicate': predicate, 'columns': columns,
+            }
+            for table, index, scans, size, unique, method, predicate, columns in cursor.fetchall()
+        ]
+
+
+def table_stats():
+    with connection.cursor() as cursor:
+        cursor.execute(TABLES_SQL)
+        return [
+            {'table': table, 'seq_scan': seq_scan, 'seq_tup_read': seq_tup_read, 'idx_scan': idx_scan, 'rows': rows}
+            for table, seq_scan, seq_tup_read, idx_scan, rows in cursor.fetchall()
+        ]
+
+
+def stats_since():
+    """Desde cuándo acumulan las estadísticas (pg_stat_reset o reinicio)"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()')
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def unused_indexes(indexes, max_scans=0):
+    """Índices no únicos con idx_scan <= max_scans (los únicos garantizan integridad)"""
+    return [index for index in indexes if not index['unique'] and index['scans'] <= max_scans]
+
+
+def redundant_indexes(indexes):
+    """
+    Índices no únicos cuyas columnas son prefijo de otro índice de la misma
+    tabla (mismo método y mismo predicado): el índice mayor ya los cubre.
+    """
+    redundant = []
+    for index in indexes:
+        if index['unique']:
+            continue
+        for other in indexes:
+            if (
+                other is not index
+                and other['table'] == index['table']
+                and other['method'] == index['method']
+                and other['predicate'] == index['predicate']
+                and len(other['columns']) >= len(index['columns'])
+                and other['columns'][:len(index['columns'])] == index['columns']
+                # Dos índices idénticos: solo se informa uno
+                and (len(other['columns']) > len(index['columns']) or other['index'] < index['index'])
+            ):
+                redundant.append(dict(index, covered_by=other['index']))
+                break
+    return redundant
+
+
+def _leading_columns(indexes):
+    """{tabla: {primera columna de cada índice}}"""
+    leading = {}
+    for index in indexes:
+        if index['columns'] and index['predicate'] is None:
+            leading.setdefault(index['table'], set()).add(index['columns'][0].split(' ')[0])
+    return leading
+
+
+def missing_indexes(indexes, tables, min_rows=MIN_SEQ_SCAN_ROWS):
+    """
+    Índices que faltan:
+    - declarados en Meta.indexes pero ausentes en la BD (migración sin aplicar
+      o tabla no gestionada creada a mano);
+    - claves foráneas sin índice que empiece por su columna (JOIN y borrados
+      en cascada recorren la tabla entera);
+    - tablas de más de min_rows filas leídas sobre todo con seq scans.
+    """
+    existing = {(index['table'], index['index']) for index in indexes}
+    leading = _leading_columns(indexes)
+    known_tables = {table['table'] for table in tables}
+    missing = []
+
+    for model in apps.get_models():
+        table = model._meta.db_table
+        if table not in known_tables or model._meta.proxy:
+            continue
+        for index in model._meta.indexes:
+            if (table, index.name) not in existing:
+                missing.append({
+                    'table': table, 'reason': 'declared', 'index': index.name,
+                    'detail': f'{model._meta.label}.Meta.indexes',
+                })
+        for field in model._meta.local_concrete_fields:
+            if isinstance(field, ForeignKey) and field.column not in leading.get(table, ()):
+                missing.append({
+                    'table': table, 'reason': 'foreign_key', 'index': None,
+                    'detail': f'{field.column} -> {field.related_model._meta.db_table}',
+                })
+
+    for table in tables:
+        if table['rows'] >= min_rows and table['seq_scan'] > table['idx_scan']:
+            missing.append({
+                'table': table['table'], 'reason': 'seq_scan', 'index': None,
+                'detail': (
+                    f"{table['seq_scan']} seq scans ({table['seq_tup_read']} filas leídas) "
+                    f"frente a {table['idx_scan']} index scans, {table['rows']} filas"
+                ),
+            })
+    return missing
+
+
+def index_report(max_scans=0, min_rows=MIN_SEQ_SCAN_ROWS, tables=None):
+    indexes = index_stats()
+    table_rows = table_stats()
+    if tables:
+        indexes = [index for index in indexes if index['table'] in tables]
+        table_rows = [table for table in table_rows if table['table'] in tables]
+    return {
+        'stats_since': stats_since(),
+        'unused': unused_indexes(indexes, max_scans),
+        'redundant': redundant_indexes(indexes),
+        'missing': missing_indexes(indexes, table_rows, min_rows),
+    }
@@ -0,0 +1,60 @@
+# monitoring/management/commands/index_report.py
+
+import json
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from monitoring.indexes import MIN_SEQ_SCAN_ROWS, index_report
+
+
+class Command(BaseCommand):
+    """
+    Informe de índices a partir de pg_stat_user_indexes y pg_stat_user_tables:
+    índices sin uso, índices redundantes (prefijo de otro) y los que faltan
+    (declarados en los modelos pero no creados, claves foráneas sin índice y
+    tablas grandes leídas con seq scans). Las estadísticas son por servidor
+    y desde el último pg_stat_reset: conviene ejecutarlo en el primario tras
+    varios días de tráfico real antes de borrar nada.
+    """
+    help = 'Informa de índices sin uso, redundantes o que faltan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-scans', type=int, default=0,
+            help='Se considera sin uso un índice con idx_scan menor o igual a este valor.'
+        )
+        parser.add_argument(
+            '--min-rows', type=int, default=MIN_SEQ_SCAN_ROWS,
+            help='Tamaño mínimo de tabla para avisar de seq scans.'
+        )
+        parser.add_argument('--table', action='append', dest='tables', help='Limitar a esta tabla (se puede repetir).')
+        parser.add_argument('--json', action='store_true', help='Salida en JSON.')
+
+    def handle(self, *args, **options):
+        report = index_report(options['max_scans'], options['min_rows'], options['tables'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        self.stdout.write(f"Estadísticas desde: {report['stats_since'] or 'inicio del servidor'}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nÍndices sin uso ({len(report['unused'])})"))
+        for index in report['unused']:
+            self.stdout.write(
+                f"  {index['table']}.{index['index']} ({', '.join(index['columns'])}) "
+                f"{index['scans']} scans, {filesizeformat(index['size'])}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nÍndices redundantes ({len(report['redundant'])})"))
+        for index in report['redundant']:
+            self.stdout.write(
+                f"  {index['table']}.{index['index']} ({', '.join(index['columns'])}) "
+                f"cubierto por {index['covered_by']}, {filesizeformat(index['size'])}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\nÍndices que faltan ({len(report['missing'])})"))
+        for missing in report['missing']:
+            name = f" {missing['index']}" if missing['index'] else ''
+            self.stdout.write(self.style.WARNING(f"  {missing['table']} [{missing['reason']}]{name}: {missing['detail']}"))
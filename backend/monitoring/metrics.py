@@ -0,0 +1,177 @@
+# Métricas por petición (contextvar) y acumulados del proceso para Prometheus
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+# Límites (segundos) del histograma de duración de peticiones
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Contadores de una petición: SQL, caché y renderizado"""
+
+    __slots__ = (
+        'queries', 'db_time', 'cache_hits', 'cache_misses', 'cache_time',
+        'render_time', 'started',
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+        self.render_time = 0.0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing (duraciones en ms)"""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.2f};desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'render;dur={self.render_time * 1000:.2f}',
+            f'total;dur={self.elapsed * 1000:.2f}',
+        ])
+
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+def current_metrics():
+    """RequestMetrics of the request being served, or None (shell, Celery...)"""
+    return _current.get()
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper: cuenta y cronometra cada consulta SQL"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def record_cache(hits, misses, elapsed):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+        metrics.cache_time += elapsed
+
+
+def record_render(elapsed):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.render_time += elapsed
+
+
+class _Registry:
+    """Acumulados del proceso; cada worker expone los suyos en /metrics"""
+
+    COUNTERS = {
+        'http_requests_total': 'Requests served',
+        'db_queries_total': 'SQL queries executed',
+        'db_query_duration_seconds_total': 'Time spent in SQL queries',
+        'cache_hits_total': 'Cache reads that found a value',
+        'cache_misses_total': 'Cache reads that found nothing',
+        'render_duration_seconds_total': 'Time spent rendering API responses',
+        'query_budget_exceeded_total': 'Requests over their QUERY_BUDGETS entry',
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counters = {name: defaultdict(float) for name in self.COUNTERS}
+        self.buckets = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self.durations = defaultdict(float)
+
+    def observe(self, view, method, status_code, metrics, duration, over_budget):
+        with self.lock:
+            self.counters['http_requests_total'][(view, method, str(status_code))] += 1
+            self.counters['db_queries_total'][(view,)] += metrics.queries
+            self.counters['db_query_duration_seconds_total'][(view,)] += metrics.db_time
+            self.counters['cache_hits_total'][(view,)] += metrics.cache_hits
+            self.counters['cache_misses_total'][(view,)] += metrics.cache_misses
+            self.counters['render_duration_seconds_total'][(view,)] += metrics.render_time
+            if over_budget:
+                self.counters['query_budget_exceeded_total'][(view,)] += 1
+
+            buckets = self.buckets[view]
+            for index, limit in enumerate(DURATION_BUCKETS):
+                if duration <= limit:
+                    buckets[index] += 1
+            buckets[-1] += 1  # +Inf
+            self.durations[view] += duration
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, help_text in self.COUNTERS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                label_names = ('view', 'method', 'status') if name == 'http_requests_total' else ('view',)
+                for labels, value in sorted(self.counters[name].items()):
+                    lines.append(f'{name}{{{_labels(label_names, labels)}}} {_number(value)}')
+
+            name = 'http_request_duration_seconds'
+            lines.append(f'# HELP {name} Request duration')
+            lines.append(f'# TYPE {name} histogram')
+            for view, buckets in sorted(self.buckets.items()):
+                for limit, count in zip(DURATION_BUCKETS + ('+Inf',), buckets):
+                    lines.append(f'{name}_bucket{{{_labels(("view", "le"), (view, str(limit)))}}} {count}')
+                lines.append(f'{name}_sum{{{_labels(("view",), (view,))}}} {_number(self.durations[view])}')
+                lines.append(f'{name}_count{{{_labels(("view",), (view,))}}} {buckets[-1]}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = _Registry()
+
+
+def render_prometheus(extra=None):
+    """
+    Text exposition format (version 0.0.4) of this process' metrics.
+    `extra` maps metric name -> (type, help, value); value is a number or
+    {database alias: number} for metrics labeled by database.
+    """
+    lines = registry.render()
+    for name, (metric_type, help_text, value) in (extra or {}).items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if isinstance(value, dict):
+            for alias, number in sorted(value.items()):
+                lines.append(f'{name}{{{_labels(("database",), (alias,))}}} {_number(number)}')
+        else:
+            lines.append(f'{name} {_number(value)}')
+    return '\n'.join(lines) + '\n'
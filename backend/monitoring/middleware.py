@@ -0,0 +1,92 @@
+# Middleware de instrumentación: SQL, caché y renderizado por petición
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .connections import record_reuse
+from .metrics import end_request, query_wrapper, registry, start_request
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A view ran more SQL queries than its QUERY_BUDGETS entry allows"""
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else '<unresolved>'
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada petición (consultas SQL y su tiempo, aciertos/fallos de caché y
+    tiempo de renderizado de DRF), añade la cabecera Server-Timing y acumula
+    los totales por vista para /metrics.
+
+    QUERY_BUDGETS = {'reservation-list': 4, ...} fija el máximo de consultas
+    por vista (view_name del router). Pasarse se registra en el log y en
+    query_budget_exceeded_total; con QUERY_BUDGET_ENFORCE (tests) además
+    lanza QueryBudgetExceeded. Debe ir la primera en MIDDLEWARE para que
+    la cabecera no quede guardada en la caché de UpdateCacheMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        record_reuse()
+        metrics, token = start_request()
+        try:
+            with self._wrap_connections():
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = start_request()
+        # Las conexiones son por hilo y las consultas del ORM async corren en
+        # el hilo de sync_to_async de la petición: los wrappers van en ese hilo
+        wrappers = await sync_to_async(self._start_async_request)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    def _start_async_request(self):
+        record_reuse()
+        return self._wrap_connections()
+
+    def _wrap_connections(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(query_wrapper))
+        return stack
+
+    def _finish(self, request, response, metrics):
+        view = _view_name(request)
+        budget = settings.QUERY_BUDGETS.get(view)
+        over_budget = budget is not None and metrics.queries > budget
+
+        response['Server-Timing'] = metrics.server_timing()
+        registry.observe(view, request.method, response.status_code, metrics, metrics.elapsed, over_budget)
+
+        if over_budget:
+            message = f'{view} ran {metrics.queries} SQL queries (budget {budget})'
+            if settings.QUERY_BUDGET_ENFORCE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,15 @@
+# Renderer JSON de DRF que mide el tiempo de serialización de cada respuesta
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import record_render
+
+
+class InstrumentedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            record_render(time.perf_counter() - start)
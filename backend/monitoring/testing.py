@@ -0,0 +1,69 @@
+# Utilidades de test: detección de N+1 comparando consultas con 1, 10 y 100 filas
+import difflib
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Filas sembradas en cada pasada
+ROW_COUNTS = (1, 10, 100)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\?, )*\?\)')
+
+
+def normalize_sql(sql):
+    """SQL sin literales, para que dos pasadas con datos distintos sean comparables"""
+    sql = _NUMBER.sub('?', _STRING.sub('?', sql))
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class QueryScalingMixin:
+    """
+    Mixin de TestCase: assertQueriesConstant siembra 1, 10 y 100 filas y
+    comprueba que cada endpoint ejecuta el mismo número de consultas en las
+    tres pasadas. Si un serializer o una vista añade una consulta por fila,
+    el fallo muestra un diff del SQL (normalizado) entre pasadas.
+    """
+    row_counts = ROW_COUNTS
+
+    def assertQueriesConstant(self, endpoints, seed):
+        """
+        endpoints: {nombre: callable() -> response}; se llaman tras vaciar la
+        caché para medir siempre el camino que va a la base de datos.
+        seed(count): completa los datos hasta `count` filas.
+        """
+        runs = {name: [] for name in endpoints}
+        for count in self.row_counts:
+            seed(count)
+            for name, call in endpoints.items():
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = call()
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertLess(
+                    response.status_code, 400,
+                    f'{name} returned {response.status_code} with {count} rows'
+                )
+                runs[name].append((count, [query['sql'] for query in queries]))
+
+        for name, results in runs.items():
+            with self.subTest(endpoint=name):
+                base_count, base_sql = results[0]
+                for count, sql in results[1:]:
+                    if len(sql) != len(base_sql):
+                        self.fail(self._scaling_message(name, base_count, base_sql, count, sql))
+
+    def _scaling_message(self, name, base_count, base_sql, count, sql):
+        diff = difflib.unified_diff(
+            [normalize_sql(query) for query in base_sql],
+            [normalize_sql(query) for query in sql],
+            fromfile=f'{base_count} rows', tofile=f'{count} rows', lineterm=''
+        )
+        return (
+            f'{name}: {len(base_sql)} queries with {base_count} rows but '
+            f'{len(sql)} with {count} rows (N+1?)\n' + '\n'.join(diff)
+        )
@@ -0,0 +1,498 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airlines.models import Airline
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from flights.models import Flight
+from reservation_passengers.models import ReservationPassenger
+from reservations.models import Reservation
+
+from .connections import get_connection_metrics, record_reuse, reset_connection_metrics
+from .indexes import index_report, index_stats, redundant_indexes, unused_indexes
+from .metrics import registry
+from .middleware import QueryBudgetExceeded
+from .testing import QueryScalingMixin
+
+User = get_user_model()
+
+IMPORT_CSV_HEADER = (
+    'flight_code,airline,origin,destination,departure_datetime,arrival_datetime,'
+    'number_of_stops,adult_price,child_price,special_price,available_seats,status,notes\n'
+)
+
+
+def _timing(response):
+    """Server-Timing header as {'db': {'dur': '1.20', 'desc': '3 queries'}, ...}"""
+    metrics = {}
+    for name, dur, desc in re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response['Server-Timing']):
+        metrics[name] = {'dur': dur, 'desc': desc}
+    return metrics
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        Flight.objects.create(
+            flight_code='LA2501', airline=self.airline, origin='Quito', destination='Guayaquil',
+            departure_datetime=timezone.now() + timedelta(days=1),
+            arrival_datetime=timezone.now() + timedelta(days=1, hours=1),
+            adult_price=Decimal('150.00'), child_price=Decimal('100.00'), available_seats=180
+        )
+        self.client = APIClient()
+
+    def test_server_timing_reports_queries_and_cache(self):
+        """Test the header matches the queries run and the cache reads"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/flights/')
+        timing = _timing(response)
+        self.assertEqual(timing['db']['desc'], f'{len(queries)} queries')
+        self.assertRegex(timing['cache']['desc'], r'^0 hits, [1-9]\d* misses$')
+        self.assertIn('render', timing)
+        self.assertGreater(float(timing['total']['dur']), 0)
+
+        # Segunda petición: la lista sale de la caché, sin SQL
+        response = self.client.get('/api/flights/')
+        timing = _timing(response)
+        self.assertEqual(timing['db']['desc'], '0 queries')
+        self.assertRegex(timing['cache']['desc'], r'^[1-9]\d* hits')
+
+    def test_async_views_are_instrumented(self):
+        """Test the ASGI catalog views get the same header"""
+        response = async_to_sync(self.async_client.get)('/api/async/flights/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(_timing(response)['db']['desc'], '0 queries')
+
+    @override_settings(QUERY_BUDGETS={'flight-list': 0}, QUERY_BUDGET_ENFORCE=True)
+    def test_budget_is_enforced_in_tests(self):
+        """Test going over a view's budget raises when enforcement is on"""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/flights/')
+
+    @override_settings(QUERY_BUDGETS={'flight-list': 0}, QUERY_BUDGET_ENFORCE=False)
+    def test_budget_is_counted_in_production(self):
+        """Test going over a budget only logs and counts when not enforced"""
+        with self.assertLogs('monitoring.middleware', 'WARNING'):
+            response = self.client.get('/api/flights/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'query_budget_exceeded_total{view="flight-list"} 1',
+            registry_text()
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint(self):
+        """Test /metrics requires the token and exposes per-view counters"""
+        self.client.get('/api/flights/')
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_requests_total{view="flight-list",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="flight-list"} 1', body)
+        self.assertIn('# TYPE db_queries_total counter', body)
+        self.assertIn('email_sent_total', body)
+        self.assertIn('db_connections_reused_total{database="default"}', body)
+
+
+def registry_text():
+    return '\n'.join(registry.render())
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTest(TestCase):
+    """The QUERY_BUDGETS in settings hold with 1 and 10 rows (no N+1)"""
+
+    def setUp(self):
+        cache.clear()
+        self.origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        self.destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        self.airline = Airline.objects.create(name='LATAM Airlines', code='LA')
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.client = APIClient()
+        # JWT real: la consulta de autenticación cuenta dentro del presupuesto
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+
+    def _create_rows(self, count):
+        for n in range(count):
+            user = User.objects.create_user(
+                username=f'user{self.created}', email=f'user{self.created}@example.com', password='testpass123'
+            )
+            flight_request = FlightRequest.objects.create(
+                user=user, origin=self.origin, destination=self.destination, travel_date=timezone.localdate()
+            )
+            self.reservation = Reservation.objects.create(
+                reservation_code=f'RES-{self.created:04d}', user=user, flight=flight_request,
+                reservation_date=timezone.now(), total_passengers=1, total_amount=Decimal('100.00')
+            )
+            self.passenger = ReservationPassenger.objects.create(
+                reservation=self.reservation, first_name='Ana', last_name='Pérez',
+                country_of_residence='Ecuador', identity_document=f'09{self.created:08d}',
+                date_of_birth=date(1990, 1, 1), gender='F'
+            )
+            self.flight = Flight.objects.create(
+                flight_code=f'LA{self.created:04d}', airline=self.airline, origin='Quito', destination='Cuenca',
+                departure_datetime=timezone.now() + timedelta(days=1),
+                arrival_datetime=timezone.now() + timedelta(days=1, hours=1),
+                adult_price=Decimal('90.00'), child_price=Decimal('60.00'), available_seats=100
+            )
+            self.created += 1
+
+    def test_configured_budgets_hold(self):
+        self.created = 0
+        for count in (1, 9):
+            self._create_rows(count)
+            cache.clear()
+            for path in [
+                '/api/airlines/',
+                '/api/destinations/',
+                '/api/flights/',
+                f'/api/flights/{self.flight.id}/',
+                '/api/flight-requests/',
+                f'/api/flight-requests/{self.reservation.flight_id}/',
+                '/api/reservations/',
+                f'/api/reservations/{self.reservation.id}/',
+                '/api/reservations/statistics/',
+                '/api/reservation-passengers/',
+                f'/api/reservation-passengers/{self.passenger.id}/',
+                '/api/reservation-passengers/statistics/',
+            ]:
+                with self.subTest(path=path, rows=self.created):
+                    self.assertEqual(self.client.get(path).status_code, 200)
+
+
+class NPlusOneTest(QueryScalingMixin, TestCase):
+    """Every list and custom action runs a constant number of queries for 1, 10 and 100 rows"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.rows = 0
+
+    def seed(self, count):
+        """Completa hasta `count` filas de cada tabla (una reserva con dos pasajeros por usuario)"""
+        for n in range(self.rows, count):
+            self.airline = Airline.objects.create(name=f'Airline {n}', code=f'A{n:03d}')
+            self.origin = Destination.objects.create(
+                name=f'Origin {n}', code=f'O{n:03d}', province='Pichincha',
+                latitude=Decimal('-0.180653') + n, longitude=Decimal('-78.467834')
+            )
+            self.destination = Destination.objects.create(
+                name=f'Destination {n}', code=f'D{n:03d}', province='Guayas',
+                latitude=Decimal('-2.170998'), longitude=Decimal('-79.922359')
+            )
+            self.flight = Flight.objects.create(
+                flight_code=f'FL{n:04d}', airline=self.airline, origin='Quito', destination='Cuenca',
+                departure_datetime=timezone.now() + timedelta(days=1),
+                arrival_datetime=timezone.now() + timedelta(days=1, hours=1),
+                adult_price=Decimal('90.00'), child_price=Decimal('60.00'), available_seats=100
+            )
+            # Sin contraseña: el hash de create_user domina el tiempo del test
+            self.user = User.objects.create(username=f'user{n}', email=f'user{n}@example.com')
+            self.flight_request = FlightRequest.objects.create(
+                user=self.user, origin=self.origin, destination=self.destination,
+                travel_date=timezone.localdate(), reservation_code=f'FR-{n:04d}', reserved_by=self.admin
+            )
+            self.reservation = Reservation.objects.create(
+                reservation_code=f'RES-{n:04d}', user=self.user, flight=self.flight_request,
+                reservation_date=timezone.now(), total_passengers=1, total_amount=Decimal('100.00')
+            )
+            self.passenger = ReservationPassenger.objects.create(
+                reservation=self.reservation, first_name='Ana', last_name='Pérez',
+                country_of_residence='Ecuador', identity_document=f'09{n:08d}',
+                date_of_birth=date(1990, 1, 1), gender='F', passenger_category='adult'
+            )
+            # Un acompañante niño por reserva: ningún filtro queda vacío en la primera pasada
+            ReservationPassenger.objects.create(
+                reservation=self.reservation, passenger_type='companion', first_name='Luis', last_name='Pérez',
+                country_of_residence='Ecuador', identity_document=f'17{n:08d}',
+                date_of_birth=date(2018, 1, 1), gender='M', passenger_category='child'
+            )
+        self.rows = count
+
+    def _csv_import(self):
+        """Archivo de itinerario con tantas filas como la tabla (upsert por flight_code)"""
+        rows = ''.join(
+            f'FL{n:04d},{self.airline.code},Quito,Cuenca,2030-01-01T08:00:00,2030-01-01T09:00:00,0,95,60,,100,,\n'
+            for n in range(self.rows)
+        )
+        upload = SimpleUploadedFile('flights.csv', (IMPORT_CSV_HEADER + rows).encode(), content_type='text/csv')
+        return self.client.post('/api/flights/import/', {'file': upload}, format='multipart')
+
+    def test_flights(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/flights/'),
+            'retrieve': lambda: self.client.get(f'/api/flights/{self.flight.id}/'),
+            'available': lambda: self.client.get('/api/flights/available/'),
+            'upcoming': lambda: self.client.get('/api/flights/upcoming/'),
+            'search_route': lambda: self.client.get('/api/flights/search_route/?origin=Quito&destination=Cuenca'),
+            'by_airline': lambda: self.client.get(f'/api/flights/by_airline/?airline_id={self.airline.id}'),
+            'update_seats': lambda: self.client.post(
+                f'/api/flights/{self.flight.id}/update_seats/', {'available_seats': 50}, format='json'
+            ),
+            'change_status': lambda: self.client.post(
+                f'/api/flights/{self.flight.id}/change_status/', {'status': 'delayed'}, format='json'
+            ),
+            'import': self._csv_import,
+        }, self.seed)
+
+    def test_reservations(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/reservations/'),
+            'retrieve': lambda: self.client.get(f'/api/reservations/{self.reservation.id}/'),
+            'my_reservations': lambda: self.client.get('/api/reservations/my_reservations/'),
+            'pending': lambda: self.client.get('/api/reservations/pending/'),
+            'confirmed': lambda: self.client.get('/api/reservations/confirmed/'),
+            'recent': lambda: self.client.get('/api/reservations/recent/'),
+            'by_flight': lambda: self.client.get(f'/api/reservations/by_flight/?flight_id={self.flight_request.id}'),
+            'statistics': lambda: self.client.get('/api/reservations/statistics/'),
+            'export': lambda: self.client.get('/api/reservations/export/?file_format=ndjson'),
+            'confirm': lambda: self.client.post(f'/api/reservations/{self.reservation.id}/confirm/'),
+            'update_amount': lambda: self.client.patch(
+                f'/api/reservations/{self.reservation.id}/update_amount/', {'total_amount': 120}, format='json'
+            ),
+            'change_status': lambda: self.client.post(
+                f'/api/reservations/{self.reservation.id}/change_status/', {'status': 'pending'}, format='json'
+            ),
+            'cancel': lambda: self.client.post(f'/api/reservations/{self.reservation.id}/cancel/'),
+        }, self.seed)
+
+    def test_reservation_passengers(self):
+        def bulk_assign_seats():
+            # Un asiento por pasajero existente: el lote crece con las filas
+            return self.client.post('/api/reservation-passengers/bulk_assign_seats/', {
+                'assignments': [
+                    {'passenger_id': passenger_id, 'seat_number': f'{passenger_id}A'}
+                    for passenger_id in ReservationPassenger.objects.values_list('id', flat=True)
+                ]
+            }, format='json')
+
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/reservation-passengers/'),
+            'retrieve': lambda: self.client.get(f'/api/reservation-passengers/{self.passenger.id}/'),
+            'by_reservation': lambda: self.client.get(
+                f'/api/reservation-passengers/by_reservation/?reservation_id={self.reservation.id}'
+            ),
+            'main_passengers': lambda: self.client.get('/api/reservation-passengers/main_passengers/'),
+            'companions': lambda: self.client.get('/api/reservation-passengers/companions/'),
+            'adults': lambda: self.client.get('/api/reservation-passengers/adults/'),
+            'children': lambda: self.client.get('/api/reservation-passengers/children/'),
+            'statistics': lambda: self.client.get('/api/reservation-passengers/statistics/'),
+            'search_by_document': lambda: self.client.get(
+                '/api/reservation-passengers/search_by_document/?document=09&mode=prefix'
+            ),
+            'by_reservation_code': lambda: self.client.get(
+                f'/api/reservation-passengers/by_reservation_code/?code={self.reservation.reservation_code}'
+            ),
+            'unassigned_seats': lambda: self.client.get('/api/reservation-passengers/unassigned_seats/'),
+            'export': lambda: self.client.get('/api/reservation-passengers/export/'),
+            'assign_seat': lambda: self.client.patch(
+                f'/api/reservation-passengers/{self.passenger.id}/assign_seat/', {'seat_number': '1A'}, format='json'
+            ),
+            'update_category': lambda: self.client.patch(
+                f'/api/reservation-passengers/{self.passenger.id}/update_category/',
+                {'passenger_category': 'child'}, format='json'
+            ),
+            'bulk_assign_seats': bulk_assign_seats,
+        }, self.seed)
+
+    def test_flight_requests(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/flight-requests/'),
+            'retrieve': lambda: self.client.get(f'/api/flight-requests/{self.flight_request.id}/'),
+            'my_requests': lambda: self.client.get('/api/flight-requests/my_requests/'),
+            'pending': lambda: self.client.get('/api/flight-requests/pending/'),
+            'confirm': lambda: self.client.post(f'/api/flight-requests/{self.flight_request.id}/confirm/'),
+            'cancel': lambda: self.client.post(f'/api/flight-requests/{self.flight_request.id}/cancel/'),
+        }, self.seed)
+
+    def test_destinations(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/destinations/'),
+            'retrieve': lambda: self.client.get(f'/api/destinations/{self.destination.id}/'),
+            'active': lambda: self.client.get('/api/destinations/active/'),
+            'by_province': lambda: self.client.get('/api/destinations/by_province/'),
+            'by_province_stream': lambda: self.client.get('/api/destinations/by_province/?stream=true'),
+            'nearby': lambda: self.client.get(f'/api/destinations/{self.origin.id}/nearby/?radius_km=2000'),
+            'toggle_active': lambda: self.client.post(f'/api/destinations/{self.destination.id}/toggle_active/'),
+        }, self.seed)
+
+    def test_airlines(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/airlines/'),
+            'retrieve': lambda: self.client.get(f'/api/airlines/{self.airline.id}/'),
+            'duplicate': lambda: self.client.post(
+                f'/api/airlines/{self.airline.id}/duplicate/',
+                {'new_code': f'C{self.rows:03d}', 'new_name': f'Copy {self.rows}'}, format='json'
+            ),
+        }, self.seed)
+
+    def test_users(self):
+        self.assertQueriesConstant({
+            'list': lambda: self.client.get('/api/users/'),
+            'retrieve': lambda: self.client.get(f'/api/users/{self.user.id}/'),
+            'search': lambda: self.client.get('/api/users/?search=user'),
+        }, self.seed)
+
+
+class ConnectionMetricsTest(TestCase):
+    def setUp(self):
+        reset_connection_metrics()
+        self.addCleanup(reset_connection_metrics)
+
+    def test_opened_connections_are_counted(self):
+        extra = connections.create_connection('default')
+        try:
+            extra.ensure_connection()
+        finally:
+            extra.close()
+        self.assertEqual(get_connection_metrics()['default']['opened'], 1)
+
+    def test_open_connection_counts_as_reused(self):
+        connection.ensure_connection()
+        record_reuse()
+        record_reuse()
+        self.assertEqual(get_connection_metrics()['default']['reused'], 2)
+
+    def test_database_settings(self):
+        database = connections['default'].settings_dict
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+        self.assertGreater(database['CONN_MAX_AGE'], 0)
+
+    def test_async_requests_count_reuse(self):
+        connection.ensure_connection()
+        async_to_sync(self.async_client.get)('/api/async/destinations/active/')
+        self.assertEqual(get_connection_metrics()['default']['reused'], 1)
+
+    def test_asgi_profile_uses_the_pool(self):
+        script = (
+            "from django.conf import settings; database = settings.DATABASES['default']; "
+            "print(database['CONN_MAX_AGE'], database['OPTIONS']['pool']['max_size'])"
+        )
+        env = {**os.environ, 'PROCESS_TYPE': 'asgi', 'DJANGO_SETTINGS_MODULE': 'config.settings'}
+        env.pop('DB_POOL', None)
+        output = subprocess.run(
+            [sys.executable, '-c', f'import django; django.setup(); {script}'],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+        self.assertEqual(output.split(), ['0', '10'])
+
+    def test_pooled_connections_and_metrics(self):
+        settings_dict = {
+            **connection.settings_dict, 'CONN_MAX_AGE': 0,
+            'OPTIONS': {'pool': {'min_size': 1, 'max_size': 2}},
+        }
+        # Mismo alias: django.contrib.postgres consulta los OIDs vía connections[alias]
+        pooled = type(connections['default'])(settings_dict, alias='default')
+        try:
+            for _ in range(3):
+                with pooled.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                # Igual que al terminar una petición: la conexión vuelve al pool
+                pooled.close()
+            stats = pooled.pool.get_stats()
+        finally:
+            pooled.close_pool()
+        self.assertEqual((stats['pool_max'], stats['requests_num']), (2, 3))
+        # Las tres peticiones reutilizan conexiones del pool en lugar de abrir una cada una
+        self.assertLess(stats['connections_num'], stats['requests_num'])
+
+        with mock.patch('monitoring.views.pool_stats', return_value={'default': stats}), \
+                override_settings(METRICS_TOKEN='secret'):
+            body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').content.decode()
+        self.assertIn('db_pool_max{database="default"} 2', body)
+        self.assertIn('db_pool_requests_num_total{database="default"} 3', body)
+
+
+class IndexReportTest(TestCase):
+    COMPOSITE_INDEXES = {
+        'flights': ['idx_flight_available', 'idx_flight_status_departure', 'idx_flight_airline_status'],
+        'flightrequests': ['idx_flightreq_user_created'],
+        'reservations': ['idx_reservation_user_created', 'idx_reservation_status_created'],
+        'reservation_passengers': ['idx_passenger_reservation_seat'],
+    }
+
+    def _index(self, name, columns, unique=False, predicate=None, scans=0):
+        return {
+            'table': 'flights', 'index': name, 'scans': scans, 'size': 8192, 'unique': unique,
+            'method': 'btree', 'predicate': predicate, 'columns': columns,
+        }
+
+    def test_composite_indexes_exist(self):
+        indexes = {(index['table'], index['index']): index for index in index_stats()}
+        for table, names in self.COMPOSITE_INDEXES.items():
+            for name in names:
+                self.assertIn((table, name), indexes)
+        self.assertEqual(indexes[('reservations', 'idx_reservation_user_created')]['columns'], ['user_id', 'created_at DESC'])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_flight_available'")
+            definition = cursor.fetchone()[0]
+        self.assertIn("status)::text = 'scheduled'", definition)
+        self.assertIn('available_seats > 0', definition)
+
+    def test_redundant_prefix(self):
+        indexes = [
+            self._index('idx_status', ['status']),
+            self._index('idx_status_departure', ['status', 'departure_datetime']),
+            self._index('idx_departure_desc', ['departure_datetime DESC']),
+            self._index('idx_departure', ['departure_datetime']),
+            self._index('idx_available', ['departure_datetime'], predicate='(available_seats > 0)'),
+            self._index('flights_code_key', ['flight_code'], unique=True),
+            self._index('idx_code', ['flight_code']),
+        ]
+        redundant = {index['index']: index['covered_by'] for index in redundant_indexes(indexes)}
+        self.assertEqual(redundant, {'idx_status': 'idx_status_departure', 'idx_code': 'flights_code_key'})
+
+    def test_unused_skips_unique(self):
+        indexes = [
+            self._index('idx_used', ['status'], scans=5),
+            self._index('idx_unused', ['origin']),
+            self._index('flights_pkey', ['id'], unique=True),
+        ]
+        self.assertEqual([index['index'] for index in unused_indexes(indexes)], ['idx_unused'])
+        self.assertEqual(len(unused_indexes(indexes, max_scans=5)), 2)
+
+    def test_missing_foreign_key_and_declared(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX idx_passenger_reservation_seat')
+            cursor.execute('DROP INDEX idx_passenger_reservation')
+        missing = index_report(tables=['reservation_passengers'])['missing']
+        reasons = {(item['reason'], item['index'] or item['detail']) for item in missing}
+        self.assertIn(('declared', 'idx_passenger_reservation_seat'), reasons)
+        self.assertIn(('foreign_key', 'reservation_id -> reservations'), reasons)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('index_report', '--table', 'flights', stdout=out)
+        self.assertIn('Índices redundantes', out.getvalue())
+        self.assertIn('idx_flight_status', out.getvalue())  # prefijo de idx_flight_status_departure
+
+        out = StringIO()
+        call_command('index_report', '--json', stdout=out)
+        self.assertEqual(set(json.loads(out.getvalue())), {'stats_since', 'unused', 'redundant', 'missing'})
@@ -0,0 +1,69 @@
+# Endpoint de métricas en formato de texto de Prometheus
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.cache import never_cache
+
+from notifications.backends import get_email_metrics
+
+from .connections import POOL_COUNTERS, POOL_GAUGES, get_connection_metrics, pool_stats
+from .metrics import render_prometheus
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _email_metrics():
+    email = get_email_metrics()
+    return {
+        'email_sent_total': ('counter', 'Emails delivered by the pooled SMTP backend', email['sent']),
+        'email_failed_total': ('counter', 'Emails the pooled SMTP backend failed to deliver', email['failed']),
+        'email_connections_opened_total': ('counter', 'SMTP connections opened', email['connections_opened']),
+        'email_send_duration_seconds_total': ('counter', 'Time spent sending emails', email['latency_seconds_sum']),
+    }
+
+
+def _db_metrics():
+    counters = get_connection_metrics()
+    metrics = {
+        'db_connections_opened_total': (
+            'counter', 'Database connections opened by this process',
+            {alias: values['opened'] for alias, values in counters.items()}
+        ),
+        'db_connections_reused_total': (
+            'counter', 'Requests that reused the connection of a previous request (CONN_MAX_AGE)',
+            {alias: values['reused'] for alias, values in counters.items()}
+        ),
+    }
+    pools = pool_stats()
+    if not pools:
+        return metrics
+    for key in POOL_GAUGES:
+        name = f'db_{key}' if key.startswith('pool_') else f'db_pool_{key}'
+        metrics[name] = ('gauge', f'psycopg pool {key}', {alias: stats.get(key, 0) for alias, stats in pools.items()})
+    for key in POOL_COUNTERS:
+        metrics[f'db_pool_{key}_total'] = (
+            'counter', f'psycopg pool {key}', {alias: stats.get(key, 0) for alias, stats in pools.items()}
+        )
+    metrics['db_pool_requests_wait_seconds_total'] = (
+        'counter', 'Time spent waiting for a pooled connection',
+        {alias: stats.get('requests_wait_ms', 0) / 1000 for alias, stats in pools.items()}
+    )
+    return metrics
+
+
+@never_cache
+def metrics(request):
+    """
+    GET /metrics: métricas de este proceso. Con METRICS_TOKEN definido se
+    exige 'Authorization: Bearer <token>'; sin él solo responde con DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        expected = f'Bearer {token}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+
+    return HttpResponse(render_prometheus(_email_metrics() | _db_metrics()), content_type=PROMETHEUS_CONTENT_TYPE)
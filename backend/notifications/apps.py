@@ -1,2 +1,8 @@
 # App configuration for notifications app
+from django.apps import AppConfig
 
+
+class NotificationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications'
+    verbose_name = 'Notifications'
@@ -0,0 +1,205 @@
+# Backend SMTP con conexiones persistentes por proceso (workers de Celery)
+import logging
+import os
+import smtplib
+import socket
+import threading
+import time
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+
+logger = logging.getLogger(__name__)
+
+# Errores tras los que la conexión se descarta y se reintenta una vez
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+class RateLimiter:
+    """Token bucket: como máximo `rate` envíos por segundo en este proceso"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.updated = time.monotonic()
+                self.tokens = 0.0
+            else:
+                self.tokens -= 1
+
+
+class _PooledConnection:
+    def __init__(self):
+        self.connection = None
+        self.pid = None
+        self.last_used = 0.0
+        self.lock = threading.RLock()
+
+
+_pool = {}
+_pool_lock = threading.Lock()
+_limiters = {}
+
+# Métricas del proceso: ver get_email_metrics()
+_metrics = {
+    'sent': 0,
+    'failed': 0,
+    'connections_opened': 0,
+    'reconnects': 0,
+    'latency_seconds_sum': 0.0,
+    'latency_seconds_max': 0.0,
+}
+_metrics_lock = threading.Lock()
+
+
+def get_email_metrics():
+    """Copy of this process' send counters and latency totals"""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def _record(**increments):
+    with _metrics_lock:
+        for name, value in increments.items():
+            if name == 'latency_seconds_max':
+                _metrics[name] = max(_metrics[name], value)
+            else:
+                _metrics[name] += value
+
+
+def close_pool(*args, **kwargs):
+    """Close every pooled connection (connected to worker_process_shutdown)"""
+    with _pool_lock:
+        entries = list(_pool.values())
+        _pool.clear()
+    for entry in entries:
+        with entry.lock:
+            if entry.connection is not None and entry.pid == os.getpid():
+                try:
+                    entry.connection.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+            entry.connection = None
+
+
+worker_process_shutdown.connect(close_pool, dispatch_uid='notifications_close_smtp_pool')
+
+
+class PooledSMTPEmailBackend(EmailBackend):
+    """
+    EmailBackend SMTP que reutiliza una conexión por proceso y servidor en
+    lugar de hacer un handshake TLS por cada send_mail(). Reconecta si el
+    servidor cerró la conexión, limita los envíos por segundo
+    (EMAIL_POOL_RATE_LIMIT, 0 = sin límite) y acumula métricas de latencia.
+    """
+
+    def __init__(self, *args, rate_limit=None, max_idle=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limit = settings.EMAIL_POOL_RATE_LIMIT if rate_limit is None else rate_limit
+        # Pasado este tiempo sin uso se comprueba la conexión con NOOP
+        self.max_idle = settings.EMAIL_POOL_MAX_IDLE if max_idle is None else max_idle
+        self.pool_key = (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+        with _pool_lock:
+            self._entry = _pool.setdefault(self.pool_key, _PooledConnection())
+            self._limiter = _limiters.get(self.pool_key)
+            if self._limiter is None or self._limiter.rate != self.rate_limit:
+                self._limiter = _limiters[self.pool_key] = RateLimiter(self.rate_limit)
+        self._lock = self._entry.lock
+
+    def _alive(self):
+        entry = self._entry
+        if entry.connection is None or entry.pid != os.getpid():
+            # Conexiones heredadas de otro proceso (fork) no se comparten
+            return False
+        if time.monotonic() - entry.last_used < self.max_idle:
+            return True
+        try:
+            return entry.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self):
+        entry = self._entry
+        if entry.connection is not None and entry.pid == os.getpid():
+            try:
+                entry.connection.close()
+            except OSError:
+                pass
+        entry.connection = None
+        self.connection = None
+
+    def open(self):
+        with self._lock:
+            if self._alive():
+                self.connection = self._entry.connection
+                return False
+            self._discard()
+            opened = super().open()
+            if self.connection is not None:
+                self._entry.connection = self.connection
+                self._entry.pid = os.getpid()
+                self._entry.last_used = time.monotonic()
+                _record(connections_opened=1)
+            return opened
+
+    def close(self):
+        # La conexión queda en el pool del proceso; close_pool() la cierra
+        self.connection = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        with self._lock:
+            self.open()
+            if self.connection is None:
+                return 0
+
+            sent = 0
+            for message in email_messages:
+                if not message.recipients():
+                    continue
+                self._limiter.acquire()
+                start = time.perf_counter()
+                try:
+                    delivered = self._send(message)
+                except RECONNECT_ERRORS as exc:
+                    logger.warning('SMTP connection lost (%s), reconnecting', exc)
+                    _record(reconnects=1)
+                    self._discard()
+                    self.open()
+                    if self.connection is None:
+                        # fail_silently: no se pudo reconectar
+                        _record(failed=1)
+                        return sent
+                    try:
+                        delivered = self._send(message)
+                    except Exception:
+                        _record(failed=1)
+                        raise
+                except Exception:
+                    _record(failed=1)
+                    raise
+
+                elapsed = time.perf_counter() - start
+                self._entry.last_used = time.monotonic()
+                if delivered:
+                    sent += 1
+                    _record(sent=1, latency_seconds_sum=elapsed, latency_seconds_max=elapsed)
+                else:
+                    _record(failed=1)
+            self.connection = None
+        return sent
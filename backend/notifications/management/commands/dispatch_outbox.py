@@ -0,0 +1,39 @@
+# notifications/management/commands/dispatch_outbox.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from notifications.outbox import OUTBOX_BATCH_SIZE, dispatch_batch, drain
+
+
+class Command(BaseCommand):
+    """
+    Despachador de la bandeja de salida (notification_outbox). Con --loop
+    corre como proceso dedicado; se pueden lanzar varios en paralelo.
+    """
+    help = 'Publica en Celery las tareas pendientes de la bandeja de salida.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='No terminar: seguir despachando, esperando --sleep segundos cuando no hay mensajes.'
+        )
+        parser.add_argument('--sleep', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        if not options['loop']:
+            total = drain(batch_size)
+            self.stdout.write(self.style.SUCCESS(f'{total} mensajes despachados.'))
+            return
+
+        self.stdout.write(self.style.NOTICE('Despachador de la bandeja de salida iniciado.'))
+        try:
+            while True:
+                if dispatch_batch(batch_size) < batch_size:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Despachador detenido.'))
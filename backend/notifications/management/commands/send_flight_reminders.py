@@ -2,54 +2,73 @@
 
 from django.core.management.base import BaseCommand
 from django.apps import apps
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
-from notifications.tasks import send_flight_reminder_email
+from notifications.models import ReminderKind
+from notifications.outbox import enqueue
+from notifications.reminders import claim_reservation_reminders
+from notifications.tasks import send_flight_reminder_batch
+
+# Reservas por tarea encolada: una consulta y una conexión SMTP por lote
+REMINDER_BATCH_SIZE = 500
+# Recordatorio de vuelo: viajes entre hoy y dentro de 2 días
+REMINDER_DAYS_AHEAD = 2
+
 
 class Command(BaseCommand):
     """
-    Comando para identificar reservas que requieren un correo de recordatorio 
-    (vuelo en 48 horas) y encolar la tarea Celery.
+    Comando para identificar reservas que requieren un correo de recordatorio
+    (viaje entre hoy y dentro de REMINDER_DAYS_AHEAD días) y encolar las
+    tareas Celery por lotes.
     """
-    help = 'Busca reservas cuyos vuelos salen en aproximadamente 48 horas y envía recordatorios.'
+    help = (
+        f'Busca reservas no canceladas con viaje entre hoy y dentro de {REMINDER_DAYS_AHEAD} días '
+        'y envía recordatorios.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help='Reservas por tarea de envío (por defecto %(default)s).'
+        )
 
     def handle(self, *args, **options):
-        # Usamos apps.get_model para evitar importaciones circulares, 
+        # Usamos apps.get_model para evitar importaciones circulares,
         # asumiendo que el modelo está en la app 'reservations'.
         try:
-            Reservation = apps.get_model('reservations', 'Reservation')
+            apps.get_model('reservations', 'Reservation')
         except LookupError:
             self.stdout.write(self.style.ERROR("El modelo 'Reservation' no se encontró. Asegúrate de que la app 'reservations' esté configurada correctamente."))
             return
 
-        now = timezone.now()
-        
-        # Definimos el rango de tiempo para los vuelos:
-        # Entre 48 horas (2 días) y 49 horas a partir de ahora.
-        # Esto asegura que si el comando se ejecuta una vez al día, 
-        # el recordatorio se dispare una única vez para cada reserva.
-        time_limit_start = now + timedelta(hours=48)
-        time_limit_end = now + timedelta(hours=49)
-
-        # Filtramos las reservas:
-        reservations_to_remind = Reservation.objects.filter(
-            flight__departure_datetime__gte=time_limit_start,
-            flight__departure_datetime__lt=time_limit_end,
-            # (Opcional) Puedes añadir un campo 'reminder_sent' al modelo Reservation
-            # para evitar enviar el correo dos veces si la lógica de tiempo falla.
-            # is_reminder_sent=False 
-        ).select_related('user')
-
-        count = reservations_to_remind.count()
-        self.stdout.write(self.style.NOTICE(f'Encontradas {count} reservas que necesitan recordatorio.'))
-
-        for reservation in reservations_to_remind:
-            # Encola la tarea de Celery de forma asíncrona
-            send_flight_reminder_email.delay(reservation.id)
-            self.stdout.write(self.style.SUCCESS(f'Tarea encolada para la Reserva #{reservation.id} ({reservation.user.email})'))
-            
-            # (Opcional) Si usas el campo 'is_reminder_sent', actualízalo aquí:
-            # reservation.is_reminder_sent = True
-            # reservation.save()
-
-        self.stdout.write(self.style.SUCCESS('Proceso de recordatorios completado.'))
+        batch_size = max(1, options['batch_size'])
+
+        # reservation.flight es un FlightRequest: solo tiene fecha de viaje,
+        # así que la ventana va de hoy a pasado mañana. Al ser deslizante,
+        # las reservas creadas ya dentro de la ventana también se recuerdan;
+        # el ledger garantiza que cada una se encole una sola vez.
+        today = timezone.localdate()
+        travel_to = today + timedelta(days=REMINDER_DAYS_AHEAD)
+
+        total = 0
+        batches = 0
+        while True:
+            # Un lote por transacción: la memoria no depende del volumen
+            with transaction.atomic():
+                batch = claim_reservation_reminders(
+                    ReminderKind.FLIGHT_48H, today, travel_to, limit=batch_size
+                )
+                if not batch:
+                    break
+                # Por la bandeja de salida, en la misma transacción que el
+                # ledger: una caída del broker no pierde el lote
+                enqueue(send_flight_reminder_batch, batch)
+            total += len(batch)
+            batches += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Proceso de recordatorios completado: {total} reservas en {batches} tareas encoladas.'
+        ))
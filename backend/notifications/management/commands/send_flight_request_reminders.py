@@ -0,0 +1,58 @@
+# notifications/management/commands/send_flight_request_reminders.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from notifications.models import ReminderKind
+from notifications.outbox import enqueue
+from notifications.reminders import claim_flight_request_reminders
+from notifications.tasks import send_flight_request_reminder_batch
+
+# Peticiones por tarea encolada: una consulta y una conexión SMTP por lote
+REMINDER_BATCH_SIZE = 500
+# Peticiones pendientes que viajan entre hoy y dentro de 2 días
+REMINDER_DAYS_AHEAD = 2
+
+
+class Command(BaseCommand):
+    """
+    Comando para recordar a los usuarios sus peticiones de vuelo pendientes
+    (PENDING) cuya fecha de viaje es en 2 días, encolando tareas por lotes.
+    """
+    help = 'Busca peticiones de vuelo pendientes que viajan en 2 días y envía recordatorios.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help='Peticiones por tarea de envío (por defecto %(default)s).'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        # Ventana deslizante: el ledger garantiza un solo recordatorio por
+        # petición aunque el comando se ejecute cada pocos minutos.
+        today = timezone.localdate()
+        travel_to = today + timedelta(days=REMINDER_DAYS_AHEAD)
+
+        total = 0
+        batches = 0
+        while True:
+            # Un lote por transacción: la memoria no depende del volumen
+            with transaction.atomic():
+                batch = claim_flight_request_reminders(
+                    ReminderKind.FLIGHT_REQUEST_PENDING, today, travel_to, limit=batch_size
+                )
+                if not batch:
+                    break
+                # Por la bandeja de salida, en la misma transacción que el ledger
+                enqueue(send_flight_request_reminder_batch, batch)
+            total += len(batch)
+            batches += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Proceso de recordatorios completado: {total} peticiones en {batches} tareas encoladas.'
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reminder_kind', models.CharField(choices=[('flight_48h', 'Vuelo en 48 horas')], max_length=30, verbose_name='Tipo de recordatorio')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='created_at', verbose_name='Creado en')),
+                ('reservation', models.ForeignKey(db_column='reservation_id', on_delete=django.db.models.deletion.CASCADE, related_name='sent_reminders', to='reservations.reservation', verbose_name='Reserva')),
+            ],
+            options={
+                'verbose_name': 'Recordatorio enviado',
+                'verbose_name_plural': 'Recordatorios enviados',
+                'db_table': 'notification_reminders',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('reservation', 'reminder_kind'), name='uniq_reminder_reservation_kind')],
+            },
+        ),
+    ]
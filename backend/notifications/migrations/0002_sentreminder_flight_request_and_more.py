@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flight_requests', '0003_flightrequest_status_traveldate_index'),
+        ('notifications', '0001_initial'),
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sentreminder',
+            name='flight_request',
+            field=models.ForeignKey(blank=True, db_column='flight_request_id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sent_reminders', to='flight_requests.flightrequest', verbose_name='Petición de vuelo'),
+        ),
+        migrations.AlterField(
+            model_name='sentreminder',
+            name='reminder_kind',
+            field=models.CharField(choices=[('flight_48h', 'Vuelo en 48 horas'), ('flight_request_pending', 'Petición de vuelo pendiente')], max_length=30, verbose_name='Tipo de recordatorio'),
+        ),
+        migrations.AlterField(
+            model_name='sentreminder',
+            name='reservation',
+            field=models.ForeignKey(blank=True, db_column='reservation_id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sent_reminders', to='reservations.reservation', verbose_name='Reserva'),
+        ),
+        migrations.AddConstraint(
+            model_name='sentreminder',
+            constraint=models.UniqueConstraint(fields=('flight_request', 'reminder_kind'), name='uniq_reminder_flight_request_kind'),
+        ),
+        migrations.AddConstraint(
+            model_name='sentreminder',
+            constraint=models.CheckConstraint(condition=models.Q(('reservation__isnull', False), ('flight_request__isnull', False), _connector='OR'), name='reminder_has_target'),
+        ),
+    ]
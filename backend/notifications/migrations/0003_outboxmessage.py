@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_sentreminder_flight_request_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=200, verbose_name='Tarea')),
+                ('args', models.JSONField(blank=True, default=list)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Último error')),
+                ('available_at', models.DateTimeField(db_column='available_at', default=django.utils.timezone.now, verbose_name='Disponible desde')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_column='created_at', verbose_name='Creado en')),
+            ],
+            options={
+                'verbose_name': 'Mensaje pendiente',
+                'verbose_name_plural': 'Mensajes pendientes',
+                'db_table': 'notification_outbox',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['available_at', 'id'], name='idx_outbox_available')],
+            },
+        ),
+    ]
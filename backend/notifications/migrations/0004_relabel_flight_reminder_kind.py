@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sentreminder',
+            name='reminder_kind',
+            field=models.CharField(choices=[('flight_48h', 'Vuelo en los próximos días'), ('flight_request_pending', 'Petición de vuelo pendiente')], max_length=30, verbose_name='Tipo de recordatorio'),
+        ),
+    ]
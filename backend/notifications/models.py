@@ -0,0 +1,108 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ReminderKind(models.TextChoices):
+    # El valor se conserva por las filas existentes; la ventana es REMINDER_DAYS_AHEAD del comando
+    FLIGHT_48H = 'flight_48h', 'Vuelo en los próximos días'
+    FLIGHT_REQUEST_PENDING = 'flight_request_pending', 'Petición de vuelo pendiente'
+
+
+class SentReminder(models.Model):
+    """
+    Registro de recordatorios ya encolados, de una reserva o de una
+    petición de vuelo. Las restricciones únicas (objeto, reminder_kind)
+    hacen que cada recordatorio se envíe una sola vez aunque el programador
+    se ejecute cada pocos minutos.
+    """
+    reservation = models.ForeignKey(
+        'reservations.Reservation',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sent_reminders',
+        verbose_name='Reserva',
+        db_column='reservation_id'
+    )
+    flight_request = models.ForeignKey(
+        'flight_requests.FlightRequest',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sent_reminders',
+        verbose_name='Petición de vuelo',
+        db_column='flight_request_id'
+    )
+    reminder_kind = models.CharField(
+        max_length=30,
+        choices=ReminderKind.choices,
+        verbose_name='Tipo de recordatorio'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Creado en',
+        db_column='created_at'
+    )
+
+    class Meta:
+        db_table = 'notification_reminders'
+        ordering = ['-created_at']
+        verbose_name = 'Recordatorio enviado'
+        verbose_name_plural = 'Recordatorios enviados'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reservation', 'reminder_kind'],
+                name='uniq_reminder_reservation_kind'
+            ),
+            models.UniqueConstraint(
+                fields=['flight_request', 'reminder_kind'],
+                name='uniq_reminder_flight_request_kind'
+            ),
+            models.CheckConstraint(
+                condition=models.Q(reservation__isnull=False) | models.Q(flight_request__isnull=False),
+                name='reminder_has_target'
+            ),
+        ]
+
+    def __str__(self):
+        if self.reservation_id:
+            return f"{self.reminder_kind} - reserva {self.reservation_id}"
+        return f"{self.reminder_kind} - petición {self.flight_request_id}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Bandeja de salida transaccional: las vistas insertan la tarea Celery a
+    encolar en la misma transacción que sus datos y el despachador la
+    publica en el broker (SELECT ... FOR UPDATE SKIP LOCKED).
+    """
+    task_name = models.CharField(
+        max_length=200,
+        verbose_name='Tarea'
+    )
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Intentos')
+    last_error = models.TextField(blank=True, default='', verbose_name='Último error')
+    available_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Disponible desde',
+        db_column='available_at'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Creado en',
+        db_column='created_at'
+    )
+
+    class Meta:
+        db_table = 'notification_outbox'
+        ordering = ['id']
+        verbose_name = 'Mensaje pendiente'
+        verbose_name_plural = 'Mensajes pendientes'
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='idx_outbox_available'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.pk}"
@@ -0,0 +1,72 @@
+# Bandeja de salida transaccional (notification_outbox)
+from datetime import timedelta
+
+from celery import current_app
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+OUTBOX_BATCH_SIZE = 500
+# Reintentos: 30 s, 60 s, 120 s, ... hasta una hora
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 3600
+
+
+def enqueue(task, *args, **kwargs):
+    """
+    Guarda la tarea en la bandeja de salida en lugar de llamar a .delay().
+    Usar dentro de la transacción que guarda los datos: si se revierte,
+    la notificación también; si se confirma, el despachador la publica.
+    """
+    return OutboxMessage.objects.create(task_name=task.name, args=list(args), kwargs=kwargs)
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS))
+
+
+def dispatch_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Publica en el broker un lote de mensajes disponibles y devuelve cuántos
+    se publicaron. SKIP LOCKED permite varios despachadores en paralelo sin
+    que dos tomen la misma fila; las publicadas se borran en la misma
+    transacción y las fallidas se reprograman con backoff exponencial.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if not messages:
+            return 0
+
+        sent_ids = []
+        failed = []
+        for message in messages:
+            try:
+                current_app.send_task(message.task_name, args=message.args, kwargs=message.kwargs)
+            except Exception as exc:
+                message.attempts += 1
+                message.last_error = repr(exc)
+                message.available_at = now + _retry_delay(message.attempts)
+                failed.append(message)
+            else:
+                sent_ids.append(message.id)
+
+        OutboxMessage.objects.filter(id__in=sent_ids).delete()
+        if failed:
+            OutboxMessage.objects.bulk_update(failed, ['attempts', 'last_error', 'available_at'])
+    return len(sent_ids)
+
+
+def drain(batch_size=OUTBOX_BATCH_SIZE):
+    """Despacha lotes hasta vaciar la bandeja (o que solo queden reintentos futuros)"""
+    total = 0
+    while True:
+        sent = dispatch_batch(batch_size)
+        total += sent
+        if sent < batch_size:
+            return total
@@ -0,0 +1,65 @@
+# Reclamo de recordatorios contra el registro notification_reminders
+from django.apps import apps
+from django.db import connection
+
+from .models import SentReminder
+
+
+def _claim(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def claim_reservation_reminders(reminder_kind, travel_from, travel_to, limit=500):
+    """
+    Registra en el ledger hasta `limit` reservas (no canceladas) que viajan
+    entre travel_from y travel_to y todavía no tienen este recordatorio, y
+    devuelve sus IDs.
+
+    INSERT ... ON CONFLICT DO NOTHING RETURNING solo devuelve las filas
+    insertadas en esta llamada: dos ejecuciones solapadas nunca reclaman la
+    misma reserva. Se llama en bucle, una transacción por lote, hasta que
+    devuelve una lista vacía.
+    """
+    Reservation = apps.get_model('reservations', 'Reservation')
+    FlightRequest = apps.get_model('flight_requests', 'FlightRequest')
+
+    return _claim(f"""
+        INSERT INTO {SentReminder._meta.db_table} (reservation_id, reminder_kind, created_at)
+        SELECT r.id, %s, now()
+        FROM {FlightRequest._meta.db_table} AS f
+        JOIN {Reservation._meta.db_table} AS r ON r.flight_id = f.id
+        WHERE f.traveldate BETWEEN %s AND %s
+          AND r.status <> 'cancelled'
+          AND NOT EXISTS (
+              SELECT 1 FROM {SentReminder._meta.db_table} AS s
+              WHERE s.reservation_id = r.id AND s.reminder_kind = %s
+          )
+        LIMIT %s
+        ON CONFLICT (reservation_id, reminder_kind) DO NOTHING
+        RETURNING reservation_id
+    """, [reminder_kind, travel_from, travel_to, reminder_kind, limit])
+
+
+def claim_flight_request_reminders(reminder_kind, travel_from, travel_to, limit=500):
+    """
+    Igual que claim_reservation_reminders, para peticiones de vuelo en
+    estado PENDING (índice idx_flightrequests_status_date).
+    """
+    FlightRequest = apps.get_model('flight_requests', 'FlightRequest')
+
+    return _claim(f"""
+        INSERT INTO {SentReminder._meta.db_table} (flight_request_id, reminder_kind, created_at)
+        SELECT f.id, %s, now()
+        FROM {FlightRequest._meta.db_table} AS f
+        WHERE f.status = 'PENDING'
+          AND f.traveldate BETWEEN %s AND %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {SentReminder._meta.db_table} AS s
+              WHERE s.flight_request_id = f.id AND s.reminder_kind = %s
+          )
+        LIMIT %s
+        ON CONFLICT (flight_request_id, reminder_kind) DO NOTHING
+        RETURNING flight_request_id
+    """, [reminder_kind, travel_from, travel_to, reminder_kind, limit])
@@ -1,12 +1,19 @@
+from smtplib import SMTPException
+
 from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
+from django.core.mail import get_connection
 from django.apps import apps
-from django.utils import timezone
-from datetime import timedelta
+from django.core.management import call_command
+from notifications.models import ReminderKind, SentReminder
+from notifications.templating import render_message, render_messages
 
 # Usamos apps.get_model para evitar importaciones circulares
 
+# Errores de envío que reintentan un lote de recordatorios: 60 s, 120 s, 240 s, ...
+REMINDER_RETRY_ERRORS = (SMTPException, OSError)
+REMINDER_MAX_RETRIES = 5
+REMINDER_RETRY_BASE_SECONDS = 60
+
 @shared_task
 def send_welcome_email(user_id):
     """
@@ -16,73 +23,162 @@ def send_welcome_email(user_id):
     User = apps.get_model('authentication', 'User')
     try:
         user = User.objects.get(id=user_id)
-        subject = '¡Bienvenido a Vuelos App!'
-        message = f'Hola {user.first_name},\n\nGracias por registrarte en nuestra plataforma. ¡Esperamos que disfrutes tu experiencia!'
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        render_message('welcome', user.email, {'user': user}).send(fail_silently=False)
         return f"Correo de bienvenida enviado a {user.email}"
     except User.DoesNotExist:
         return f"Usuario con id {user_id} no encontrado."
 
+def _flight_reminder_recipient(reservation):
+    """(email, contexto) de la plantilla flight_reminder para una reserva"""
+    flight = reservation.flight  # FlightRequest
+    return reservation.user.email, {
+        'user': reservation.user,
+        'reservation': reservation,
+        'flight': flight,
+        'origin': flight.origin.name if flight.origin_id else 'tu origen',
+    }
+
+
+def _reminder_queryset(Reservation):
+    return Reservation.objects.select_related(
+        'user', 'flight__origin', 'flight__destination'
+    )
+
+
+@shared_task
+def dispatch_outbox():
+    """Punto de entrada de Celery beat: vacía la bandeja de salida"""
+    from notifications.outbox import drain
+    return f"{drain()} mensajes despachados."
+
+
 @shared_task
 def send_flight_reminder_email(reservation_id):
     """
     Envía un recordatorio de vuelo al usuario de la reserva (vuelo confirmado).
-    Se activa si el vuelo sale en aproximadamente 48 horas.
+    Las reservas a recordar las elige el comando send_flight_reminders
+    (viaje entre hoy y dentro de su REMINDER_DAYS_AHEAD días).
     """
     Reservation = apps.get_model('reservations', 'Reservation')
     try:
-        reservation = Reservation.objects.select_related('user', 'flight').get(id=reservation_id)
-        user = reservation.user
-        flight = reservation.flight
-        
-        subject = f'¡Recordatorio de tu vuelo {flight.flight_code}!'
-        message = f'Hola {user.first_name},\n\nEste es un recordatorio de que tu vuelo {flight.flight_code} de {flight.origin} a {flight.destination} sale en aproximadamente 48 horas.\n\nFecha de salida: {flight.departure_datetime.strftime("%Y-%m-%d %H:%M")}\n\n¡Que tengas un excelente viaje!'
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        return f"Recordatorio de vuelo enviado a {user.email} para la reserva {reservation.reservation_code}"
+        reservation = _reminder_queryset(Reservation).get(id=reservation_id)
+        render_message('flight_reminder', *_flight_reminder_recipient(reservation)).send(fail_silently=False)
+        return f"Recordatorio de vuelo enviado a {reservation.user.email} para la reserva {reservation.reservation_code}"
     except Reservation.DoesNotExist:
         return f"Reserva con id {reservation_id} no encontrada."
 
 
+@shared_task
+def schedule_flight_reminders():
+    """
+    Punto de entrada de Celery beat: ejecuta send_flight_reminders, que
+    reclama los recordatorios pendientes en el ledger y encola los lotes.
+    """
+    call_command('send_flight_reminders')
+
+
+def _send_reminder_batch(task, template, recipients, release):
+    """
+    Envía [(id, (email, contexto))] por una sola conexión SMTP y devuelve
+    cuántos se enviaron. Si el envío falla se reintenta solo con los que
+    faltan (sin duplicar los ya enviados); agotados los reintentos,
+    release(ids) los borra del ledger para que el siguiente programador
+    los vuelva a reclamar.
+    """
+    # Una sola plantilla compilada para todo el lote
+    messages = render_messages(template, [recipient for _pk, recipient in recipients])
+    sent = 0
+    done = 0
+    try:
+        if messages:
+            with get_connection(fail_silently=False) as connection:
+                for message in messages:
+                    sent += connection.send_messages([message])
+                    done += 1
+    except REMINDER_RETRY_ERRORS as exc:
+        pending = [pk for pk, _recipient in recipients[done:]]
+        if task.request.retries < task.max_retries:
+            raise task.retry(
+                args=[pending], exc=exc, countdown=REMINDER_RETRY_BASE_SECONDS * 2 ** task.request.retries
+            )
+        release(pending)
+        raise
+    return sent
+
+
+@shared_task(bind=True, max_retries=REMINDER_MAX_RETRIES)
+def send_flight_reminder_batch(self, reservation_ids):
+    """
+    Envía los recordatorios de un lote de reservas: una sola consulta para
+    cargarlas y una sola conexión SMTP para todos los correos.
+    """
+    Reservation = apps.get_model('reservations', 'Reservation')
+    reservations = _reminder_queryset(Reservation).filter(id__in=reservation_ids)
+
+    def release(pending):
+        SentReminder.objects.filter(
+            reservation_id__in=pending, reminder_kind=ReminderKind.FLIGHT_48H
+        ).delete()
+
+    sent = _send_reminder_batch(self, 'flight_reminder', [
+        (reservation.id, _flight_reminder_recipient(reservation))
+        for reservation in reservations
+        if reservation.user.email
+    ], release)
+    return f"{sent} recordatorios de vuelo enviados."
+
+
+def _flight_request_reminder_recipient(flight_request):
+    """(email, contexto) de la plantilla flight_request_reminder para una petición"""
+    return flight_request.user.email, {
+        'user': flight_request.user,
+        'flight_request': flight_request,
+        'origin': flight_request.origin.name if flight_request.origin_id else 'tu origen',
+    }
+
+
 @shared_task
 def send_flight_request_reminder_email(request_id):
     """
     Envía un recordatorio al usuario sobre una Petición de Vuelo pendiente.
-    Se activa si la fecha de viaje (travel_date) es en 2 días.
+    Se activa si la fecha de viaje (travel_date) es en los próximos 2 días.
     """
     FlightRequest = apps.get_model('flight_requests', 'FlightRequest')
     try:
         flight_request = FlightRequest.objects.select_related('user', 'origin', 'destination').get(id=request_id)
-        user = flight_request.user
-        
-        subject = '¡Recordatorio sobre tu Petición de Vuelo Pendiente!'
-        message = (
-            f'Hola {user.first_name},\n\n'
-            f'Este es un recordatorio de tu petición de vuelo pendiente de {flight_request.origin.name} '
-            f'a {flight_request.destination.name} para la fecha **{flight_request.travel_date}**.\n\n'
-            'Por favor, revisa el estado de tu petición en la plataforma para asegurar tu viaje.'
-        )
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        return f"Recordatorio de petición de vuelo enviado a {user.email} para la petición {request_id}"
+        render_message(
+            'flight_request_reminder', *_flight_request_reminder_recipient(flight_request)
+        ).send(fail_silently=False)
+        return f"Recordatorio de petición de vuelo enviado a {flight_request.user.email} para la petición {request_id}"
     except FlightRequest.DoesNotExist:
         return f"Petición de Vuelo con id {request_id} no encontrada."
+
+
+@shared_task
+def schedule_flight_request_reminders():
+    """Punto de entrada de Celery beat para send_flight_request_reminders"""
+    call_command('send_flight_request_reminders')
+
+
+@shared_task(bind=True, max_retries=REMINDER_MAX_RETRIES)
+def send_flight_request_reminder_batch(self, request_ids):
+    """
+    Envía los recordatorios de un lote de peticiones de vuelo con una sola
+    consulta y una sola conexión SMTP. Las que ya no están pendientes se omiten.
+    """
+    FlightRequest = apps.get_model('flight_requests', 'FlightRequest')
+    flight_requests = FlightRequest.objects.select_related(
+        'user', 'origin', 'destination'
+    ).filter(id__in=request_ids, status='PENDING')
+
+    def release(pending):
+        SentReminder.objects.filter(
+            flight_request_id__in=pending, reminder_kind=ReminderKind.FLIGHT_REQUEST_PENDING
+        ).delete()
+
+    sent = _send_reminder_batch(self, 'flight_request_reminder', [
+        (flight_request.id, _flight_request_reminder_recipient(flight_request))
+        for flight_request in flight_requests
+        if flight_request.user.email
+    ], release)
+    return f"{sent} recordatorios de petición de vuelo enviados."
@@ -0,0 +1,93 @@
+# Plantillas de correo de notifications: compiladas una vez por proceso
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, TemplateDoesNotExist, engines
+from django.utils import translation
+
+EMAIL_TEMPLATE_DIR = 'notifications/email'
+
+
+class EmailTemplate:
+    """
+    Asunto, texto y HTML (opcional) ya compilados de una plantilla de
+    correo. render() solo recorre los nodos: no vuelve a leer ni a parsear
+    los archivos.
+    """
+
+    def __init__(self, subject, text, html=None, locale=None):
+        self.subject = subject
+        self.text = text
+        self.html = html
+        self.locale = locale
+
+    def render(self, context):
+        """Return (subject, text, html or None) for one recipient"""
+        with translation.override(self.locale):
+            subject = self.subject.render(Context(context, autoescape=False))
+            text = self.text.render(Context(context, autoescape=False))
+            html = self.html.render(Context(context)) if self.html else None
+        # El asunto no puede contener saltos de línea
+        return ' '.join(subject.split()), text, html
+
+
+def _candidates(name, locale, suffix):
+    """'es-ec' busca name.es-ec.suffix, name.es.suffix y name.suffix"""
+    names = []
+    if locale:
+        names.append(f'{EMAIL_TEMPLATE_DIR}/{name}.{locale}.{suffix}')
+        if '-' in locale:
+            names.append(f'{EMAIL_TEMPLATE_DIR}/{name}.{locale.split("-")[0]}.{suffix}')
+    names.append(f'{EMAIL_TEMPLATE_DIR}/{name}.{suffix}')
+    return names
+
+
+def _compile(name, locale, suffix, required=True):
+    # Engine de bajo nivel: Template.render(Context) sin context processors
+    engine = engines['django'].engine
+    try:
+        return engine.select_template(_candidates(name, locale, suffix))
+    except TemplateDoesNotExist:
+        if required:
+            raise
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_email_template(name, locale=None):
+    """
+    Compile (once per process and locale) the subject/text/html templates
+    of `name`, e.g. notifications/email/welcome.subject.txt, welcome.txt and
+    welcome.html. Locale variants (welcome.en.txt) take precedence.
+    """
+    locale = (locale or settings.LANGUAGE_CODE).lower()
+    return EmailTemplate(
+        subject=_compile(name, locale, 'subject.txt'),
+        text=_compile(name, locale, 'txt'),
+        html=_compile(name, locale, 'html', required=False),
+        locale=locale,
+    )
+
+
+def render_messages(name, recipients, locale=None, from_email=None):
+    """
+    Render one EmailMultiAlternatives per (to_email, context) pair with a
+    single compiled template. Send them with connection.send_messages().
+    """
+    template = get_email_template(name, locale)
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+
+    messages = []
+    for to_email, context in recipients:
+        subject, text, html = template.render(context)
+        message = EmailMultiAlternatives(subject, text, from_email, [to_email])
+        if html:
+            message.attach_alternative(html, 'text/html')
+        messages.append(message)
+    return messages
+
+
+def render_message(name, to_email, context, locale=None, from_email=None):
+    """Single-recipient shortcut of render_messages"""
+    return render_messages(name, [(to_email, context)], locale, from_email)[0]
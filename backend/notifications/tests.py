@@ -0,0 +1,378 @@
+from datetime import timedelta
+from decimal import Decimal
+import smtplib
+import socket
+import time
+from unittest import mock
+
+from aiosmtpd.controller import Controller
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from reservations.models import Reservation
+
+from . import backends
+from .models import OutboxMessage, ReminderKind, SentReminder
+from .outbox import dispatch_batch, enqueue
+from .templating import get_email_template, render_messages
+from .tasks import send_flight_reminder_batch, send_flight_request_reminder_batch, send_welcome_email
+
+User = get_user_model()
+
+
+def _enqueued_batches(task):
+    """Lotes que el comando dejó en la bandeja de salida (y se vacía)"""
+    messages = OutboxMessage.objects.filter(task_name=task.name).order_by('id')
+    batches = [message.args[0] for message in messages]
+    messages.delete()
+    return batches
+
+
+def _failing_sends(fail_on):
+    """El envío número n (desde 1) de fail_on falla como si el servidor SMTP cortara"""
+    send_messages = LocmemEmailBackend.send_messages
+    calls = []
+
+    def flaky(backend, messages):
+        calls.append(messages)
+        if len(calls) in fail_on:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return send_messages(backend, messages)
+
+    return mock.patch.object(LocmemEmailBackend, 'send_messages', flaky)
+
+
+class FlightReminderBatchTest(TestCase):
+    def setUp(self):
+        self.origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        self.destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        self.travel_date = timezone.localdate() + timedelta(days=2)
+        self.reservations = [
+            self._reservation(f'user{n}', f'RES-{n:04d}', self.travel_date)
+            for n in range(5)
+        ]
+        self.later = self._reservation('later', 'RES-LATER', self.travel_date + timedelta(days=1))
+
+    def _reservation(self, username, code, travel_date, status='confirmed'):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123'
+        )
+        flight_request = FlightRequest.objects.create(
+            user=user, origin=self.origin, destination=self.destination, travel_date=travel_date
+        )
+        return Reservation.objects.create(
+            reservation_code=code,
+            user=user,
+            flight=flight_request,
+            reservation_date=timezone.now(),
+            total_passengers=1,
+            total_amount=Decimal('100.00'),
+            status=status,
+        )
+
+    def test_batch_sends_one_email_per_reservation_with_few_queries(self):
+        """Test a batch loads every reservation in a single query"""
+        ids = [reservation.id for reservation in self.reservations]
+        with self.assertNumQueries(1):
+            result = send_flight_reminder_batch(ids)
+
+        self.assertEqual(result, '5 recordatorios de vuelo enviados.')
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            {message.to[0] for message in mail.outbox},
+            {reservation.user.email for reservation in self.reservations}
+        )
+        self.assertIn('de Quito a Guayaquil', mail.outbox[0].body)
+        self.assertIn(f'Fecha de viaje: {self.travel_date:%Y-%m-%d}', mail.outbox[0].body)
+        self.assertNotIn('48 horas', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+
+    def _run_command(self, **options):
+        call_command('send_flight_reminders', stdout=mock.MagicMock(), **options)
+        return _enqueued_batches(send_flight_reminder_batch)
+
+    def test_command_enqueues_chunked_batches(self):
+        """Test the command enqueues only reservations inside the window, in chunks"""
+        self._reservation('cancelled', 'RES-CANCEL', self.travel_date, status='cancelled')
+
+        batches = self._run_command(batch_size=2)
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            sorted(pk for batch in batches for pk in batch),
+            sorted(reservation.id for reservation in self.reservations)
+        )
+
+    def test_command_is_idempotent(self):
+        """Test a second run only claims reservations not yet in the ledger"""
+        self._run_command()
+        late = self._reservation('late', 'RES-LATE', timezone.localdate() + timedelta(days=1))
+
+        self.assertEqual(self._run_command(), [[late.id]])
+        self.assertEqual(self._run_command(), [])
+        self.assertEqual(
+            SentReminder.objects.filter(reminder_kind=ReminderKind.FLIGHT_48H).count(), 6
+        )
+
+    def test_failed_send_retries_only_unsent_reminders(self):
+        """Test an SMTP error mid-batch retries the rest without resending the first ones"""
+        ids = [reservation.id for reservation in self.reservations]
+        with _failing_sends(fail_on={3}):
+            result = send_flight_reminder_batch.apply(args=[ids])
+
+        self.assertTrue(result.successful())
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(
+            reservation.user.email for reservation in self.reservations
+        ))
+
+    def test_exhausted_retries_release_the_ledger(self):
+        """Test reminders that could not be sent are claimed again by the next run"""
+        (batch,) = self._run_command()
+        with _failing_sends(fail_on=range(1, 100)):
+            result = send_flight_reminder_batch.apply(args=[batch])
+
+        self.assertTrue(result.failed())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(SentReminder.objects.filter(reservation_id__in=batch).exists())
+        self.assertEqual(sorted(self._run_command()[0]), sorted(batch))
+
+
+class FlightRequestReminderTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='requester', email='requester@example.com', password='testpass123'
+        )
+        self.destination = Destination.objects.create(name='Cuenca', code='CUE', province='Azuay')
+        self.travel_date = timezone.localdate() + timedelta(days=2)
+        self.pending = [
+            FlightRequest.objects.create(
+                user=self.user, destination=self.destination, travel_date=self.travel_date
+            )
+            for _ in range(3)
+        ]
+        FlightRequest.objects.create(
+            user=self.user, destination=self.destination,
+            travel_date=self.travel_date, status='CONFIRMED'
+        )
+        FlightRequest.objects.create(
+            user=self.user, destination=self.destination,
+            travel_date=self.travel_date + timedelta(days=5)
+        )
+
+    def _run_command(self, **options):
+        call_command('send_flight_request_reminders', stdout=mock.MagicMock(), **options)
+        return _enqueued_batches(send_flight_request_reminder_batch)
+
+    def test_command_claims_pending_requests_once(self):
+        """Test only pending requests in the window are enqueued, and only once"""
+        batches = self._run_command(batch_size=2)
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(
+            sorted(pk for batch in batches for pk in batch),
+            sorted(flight_request.id for flight_request in self.pending)
+        )
+        self.assertEqual(self._run_command(), [])
+
+    def test_batch_skips_requests_no_longer_pending(self):
+        """Test a batch loads its requests in one query and skips confirmed ones"""
+        FlightRequest.objects.filter(id=self.pending[0].id).update(status='CONFIRMED')
+
+        with self.assertNumQueries(1):
+            result = send_flight_request_reminder_batch([fr.id for fr in self.pending])
+
+        self.assertEqual(result, '2 recordatorios de petición de vuelo enviados.')
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_send_is_retried_and_then_released(self):
+        """Test SMTP errors retry the unsent requests and, once exhausted, free them for the next run"""
+        (batch,) = self._run_command()
+        with _failing_sends(fail_on={2}):
+            result = send_flight_request_reminder_batch.apply(args=[batch])
+        self.assertTrue(result.successful())
+        self.assertEqual(len(mail.outbox), 3)
+
+        SentReminder.objects.all().delete()
+        mail.outbox = []
+        (batch,) = self._run_command()
+        with _failing_sends(fail_on=range(1, 100)):
+            self.assertTrue(send_flight_request_reminder_batch.apply(args=[batch]).failed())
+        self.assertFalse(SentReminder.objects.exists())
+        self.assertEqual(sorted(self._run_command()[0]), sorted(batch))
+
+
+class EmailTemplateTest(SimpleTestCase):
+    def test_templates_are_compiled_once_per_locale(self):
+        """Test the compiled template is reused and locale variants fall back to the base files"""
+        self.assertIs(get_email_template('welcome'), get_email_template('welcome'))
+        self.assertEqual(get_email_template('welcome', 'es-EC').locale, 'es-ec')
+        self.assertIs(
+            get_email_template('welcome', 'es-EC').text,
+            get_email_template('welcome').text
+        )
+
+    def test_render_messages_builds_multipart_messages(self):
+        """Test text parts are not escaped and html parts are"""
+        users = [
+            User(first_name="O'Brien", email='obrien@example.com'),
+            User(first_name='<b>Ana</b>', email='ana@example.com'),
+        ]
+        messages = render_messages('welcome', [(user.email, {'user': user}) for user in users])
+
+        self.assertEqual([message.to for message in messages], [['obrien@example.com'], ['ana@example.com']])
+        self.assertEqual(messages[0].subject, '¡Bienvenido a Vuelos App!')
+        self.assertIn("Hola O'Brien,", messages[0].body)
+        html, mimetype = messages[1].alternatives[0]
+        self.assertEqual(mimetype, 'text/html')
+        self.assertIn('&lt;b&gt;Ana&lt;/b&gt;', html)
+
+
+class OutboxTest(TestCase):
+    def test_user_creation_writes_outbox_row_instead_of_calling_broker(self):
+        """Test POST /api/users/ stores the welcome email in the outbox"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='adminpass123'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        with mock.patch.object(send_welcome_email, 'delay') as delay:
+            response = client.post('/api/users/', {
+                'username': 'nuevo', 'email': 'nuevo@example.com',
+                'first_name': 'Nuevo', 'last_name': 'Usuario',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        delay.assert_not_called()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task_name, 'notifications.tasks.send_welcome_email')
+        self.assertEqual(message.args, [response.data['id']])
+
+    def test_dispatch_publishes_and_deletes_rows(self):
+        """Test dispatched messages are published once and removed"""
+        for user_id in (1, 2, 3):
+            enqueue(send_welcome_email, user_id)
+
+        with mock.patch('notifications.outbox.current_app.send_task') as send_task:
+            self.assertEqual(dispatch_batch(batch_size=2), 2)
+            self.assertEqual(dispatch_batch(batch_size=2), 1)
+            self.assertEqual(dispatch_batch(batch_size=2), 0)
+
+        self.assertEqual(
+            [call.kwargs['args'] for call in send_task.call_args_list], [[1], [2], [3]]
+        )
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_failed_publish_is_retried_later(self):
+        """Test a broker error keeps the row with a backoff"""
+        message = enqueue(send_welcome_email, 1)
+
+        with mock.patch(
+            'notifications.outbox.current_app.send_task', side_effect=ConnectionError('broker down')
+        ):
+            self.assertEqual(dispatch_batch(), 0)
+
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('broker down', message.last_error)
+        self.assertGreater(message.available_at, timezone.now())
+        # Todavía no está disponible: el siguiente ciclo no la toma
+        with mock.patch('notifications.outbox.current_app.send_task') as send_task:
+            self.assertEqual(dispatch_batch(), 0)
+        send_task.assert_not_called()
+
+
+class _RecordingHandler:
+    """Handler de aiosmtpd que guarda los mensajes y cuenta las sesiones"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 OK'
+
+
+class PooledSMTPEmailBackendTest(SimpleTestCase):
+    def setUp(self):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+
+        self.port = port
+        self.handler = _RecordingHandler()
+        self._start_server()
+        self.addCleanup(lambda: self.controller.stop())
+        self.addCleanup(backends.close_pool)
+
+        settings_override = override_settings(
+            EMAIL_BACKEND='notifications.backends.PooledSMTPEmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=port,
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            EMAIL_POOL_RATE_LIMIT=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _start_server(self):
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=self.port)
+        self.controller.start()
+
+    def _messages(self, count):
+        return [
+            EmailMessage('Asunto', 'Cuerpo', 'from@example.com', [f'user{n}@example.com'])
+            for n in range(count)
+        ]
+
+    def test_connection_is_reused_across_sends(self):
+        """Test several send_messages() calls share one SMTP session"""
+        before = backends.get_email_metrics()
+        for _ in range(3):
+            with get_connection() as connection:
+                self.assertEqual(connection.send_messages(self._messages(2)), 2)
+
+        self.assertEqual(len(self.handler.messages), 6)
+        self.assertEqual(self.handler.sessions, 1)
+        after = backends.get_email_metrics()
+        self.assertEqual(after['sent'] - before['sent'], 6)
+        self.assertGreater(after['latency_seconds_sum'], before['latency_seconds_sum'])
+
+    def test_reconnects_when_server_drops_connection(self):
+        """Test a dropped connection is replaced and the message still delivered"""
+        get_connection().send_messages(self._messages(1))
+        # Reinicio del servidor: la conexión del pool queda rota
+        self.controller.stop()
+        self._start_server()
+
+        before = backends.get_email_metrics()['reconnects']
+        self.assertEqual(get_connection().send_messages(self._messages(1)), 1)
+
+        self.assertEqual(backends.get_email_metrics()['reconnects'] - before, 1)
+        self.assertEqual(len(self.handler.messages), 2)
+        self.assertEqual(self.handler.sessions, 2)
+
+    def test_rate_limit(self):
+        """Test sends are spaced to the configured rate"""
+        connection = get_connection(rate_limit=20)
+        start = time.monotonic()
+        connection.send_messages(self._messages(30))
+
+        # 20 de ráfaga y 10 más a 20/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+        self.assertEqual(len(self.handler.messages), 30)
@@ -0,0 +1,117 @@
+# reservation_passengers/management/commands/benchmark_reservation_code_lookup.py
+
+import random
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from destinations.models import Destination
+from reservation_passengers.models import ReservationPassenger
+from reservations.code_cache import resolve_reservation_code, forget_reservation_code
+from reservations.models import Reservation
+
+BENCH_PREFIX = 'BENCH-'
+
+
+class Command(BaseCommand):
+    """
+    Micro-benchmark de by_reservation_code: compara el filtro con join
+    (reservation__reservation_code) contra la resolución código -> id en
+    Redis + filtro por reservation_id. Los datos se generan dentro de una
+    transacción que se revierte al terminar.
+    """
+    help = 'Compara las dos rutas de búsqueda de pasajeros por código de reserva.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passengers', type=int, default=1_000_000)
+        parser.add_argument('--per-reservation', type=int, default=3)
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        per_reservation = options['per_reservation']
+        reservations = max(1, options['passengers'] // per_reservation)
+        iterations = min(options['iterations'], reservations)
+
+        with transaction.atomic():
+            self._seed(reservations, per_reservation)
+            codes = [f'{BENCH_PREFIX}{n}' for n in random.sample(range(1, reservations + 1), iterations)]
+
+            # Equivale a lo que hace perform_create al crear cada reserva
+            for code in codes:
+                resolve_reservation_code(code)
+
+            join_times = self._measure(codes, lambda code: ReservationPassenger.objects.filter(
+                reservation__reservation_code=code
+            ))
+            cached_times = self._measure(codes, lambda code: ReservationPassenger.objects.filter(
+                reservation_id=resolve_reservation_code(code)[0]
+            ))
+
+            for code in codes:
+                forget_reservation_code(code)
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.NOTICE(
+            f'{reservations * per_reservation} pasajeros, {reservations} reservas, {iterations} búsquedas'
+        ))
+        self._report('join reservation__reservation_code', join_times)
+        self._report('redis código -> reservation_id', cached_times)
+
+    def _seed(self, reservations, per_reservation):
+        """Inserta reservas y pasajeros sintéticos con generate_series"""
+        user = get_user_model().objects.create_user(
+            username='bench_lookup', email='bench_lookup@example.com', password=None
+        )
+        destination = Destination.objects.create(name='Bench Destination', code='BENCH', province='Bench')
+        flight = Reservation._meta.get_field('flight').related_model.objects.create(
+            user=user, destination=destination, travel_date=date.today()
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Reservation._meta.db_table}
+                    (reservation_code, user_id, flight_id, reservation_date,
+                     total_passengers, total_amount, status, created_at, updated_at)
+                SELECT %s || g, %s, %s, now(), %s, 100, 'pending', now(), now()
+                FROM generate_series(1, %s) AS g
+                """,
+                [BENCH_PREFIX, user.pk, flight.pk, per_reservation, reservations],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {ReservationPassenger._meta.db_table}
+                    (reservation_id, passenger_type, first_name, last_name,
+                     country_of_residence, identity_document, identity_document_normalized,
+                     search_document, date_of_birth, gender, passenger_category, created_at)
+                SELECT r.id, 'companion', 'Bench', 'Passenger', 'Ecuador',
+                       'B' || r.id || '-' || p, 'B' || r.id || p, '', DATE '1990-01-01',
+                       'M', 'adult', now()
+                FROM {Reservation._meta.db_table} AS r
+                CROSS JOIN generate_series(1, %s) AS p
+                WHERE r.user_id = %s
+                """,
+                [per_reservation, user.pk],
+            )
+            cursor.execute(f'ANALYZE {Reservation._meta.db_table}')
+            cursor.execute(f'ANALYZE {ReservationPassenger._meta.db_table}')
+
+    def _measure(self, codes, build_queryset):
+        times = []
+        for code in codes:
+            start = time.perf_counter()
+            list(build_queryset(code).values_list('id', flat=True))
+            times.append((time.perf_counter() - start) * 1_000_000)
+        return times
+
+    def _report(self, label, times):
+        times = sorted(times)
+        p95 = times[int(len(times) * 0.95) - 1] if len(times) > 1 else times[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'{label:<36} p50={statistics.median(times):8.1f}µs '
+            f'p95={p95:8.1f}µs media={statistics.fmean(times):8.1f}µs'
+        ))
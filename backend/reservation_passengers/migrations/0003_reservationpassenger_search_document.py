@@ -0,0 +1,31 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation_passengers', '0002_initial'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservationpassenger',
+            name='search_document',
+            field=models.TextField(blank=True, db_column='search_document', default='', editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE reservation_passengers SET search_document = lower(concat_ws(' ',
+                    NULLIF(first_name, ''), NULLIF(last_name, ''),
+                    NULLIF(identity_document, ''), NULLIF(seat_number, '')
+                ))
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='reservationpassenger',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='idx_passenger_search_document', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservation_passengers', '0003_reservationpassenger_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservationpassenger',
+            name='identity_document_normalized',
+            field=models.CharField(blank=True, db_column='identity_document_normalized', default='', editable=False, max_length=50),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE reservation_passengers
+                SET identity_document_normalized = upper(regexp_replace(identity_document, '[^[:alnum:]]+', '', 'g'))
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='reservationpassenger',
+            index=models.Index(fields=['identity_document_normalized'], name='idx_passenger_document_norm', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no bloquea las escrituras, pero no admite transacción
+    atomic = False
+
+    dependencies = [
+        ('reservation_passengers', '0004_reservationpassenger_identity_document_normalized'),
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='reservationpassenger',
+            index=models.Index(fields=['reservation', 'seat_number'], name='idx_passenger_reservation_seat'),
+        ),
+    ]
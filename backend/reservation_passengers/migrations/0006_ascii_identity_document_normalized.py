@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Misma normalización ASCII que normalize_document (antes [:alnum:] conservaba acentos)
+    dependencies = [
+        ('reservation_passengers', '0005_reservationpassenger_reservation_seat_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                UPDATE reservation_passengers
+                SET identity_document_normalized = upper(regexp_replace(identity_document, '[^A-Za-z0-9]+', '', 'g'))
+                WHERE identity_document_normalized
+                    IS DISTINCT FROM upper(regexp_replace(identity_document, '[^A-Za-z0-9]+', '', 'g'))
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,4 +1,8 @@
+import re
+
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from search.models import SearchDocumentMixin
 
 
 class PassengerType(models.TextChoices):
@@ -18,7 +22,16 @@ class Gender(models.TextChoices):
     OTHER = 'O', 'Otro'
 
 
-class ReservationPassenger(models.Model):
+def normalize_document(value):
+    """
+    Documento en mayúsculas y solo con letras y dígitos ASCII (sin espacios,
+    guiones, puntos ni acentos). La migración 0006 aplica la misma expresión
+    en SQL: cualquier cambio aquí exige volver a rellenar la columna.
+    """
+    return re.sub(r'[^A-Za-z0-9]+', '', value or '').upper()
+
+
+class ReservationPassenger(SearchDocumentMixin, models.Model):
     reservation = models.ForeignKey(
         'reservations.Reservation',
         on_delete=models.CASCADE,
@@ -51,6 +64,13 @@ class ReservationPassenger(models.Model):
         verbose_name='Documento de Identidad',
         db_column='identity_document'
     )
+    identity_document_normalized = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        editable=False,
+        db_column='identity_document_normalized'
+    )
     date_of_birth = models.DateField(
         verbose_name='Fecha de Nacimiento',
         db_column='date_of_birth'
@@ -79,11 +99,27 @@ class ReservationPassenger(models.Model):
         db_column='created_at'
     )
 
+    search_document_fields = ('first_name', 'last_name', 'identity_document', 'seat_number')
+
     class Meta:
         db_table = 'reservation_passengers'
         ordering = ['passenger_type', 'created_at']
+        indexes = [
+            GinIndex(fields=['search_document'], name='idx_passenger_search_document', opclasses=['gin_trgm_ops']),
+            # varchar_pattern_ops sirve tanto para '=' como para LIKE 'ABC%'
+            models.Index(fields=['identity_document_normalized'], name='idx_passenger_document_norm', opclasses=['varchar_pattern_ops']),
+            # Pasajeros de una reserva y comprobación de asiento ocupado (assign_seat)
+            models.Index(fields=['reservation', 'seat_number'], name='idx_passenger_reservation_seat'),
+        ]
         verbose_name = 'Pasajero de Reserva'
         verbose_name_plural = 'Pasajeros de Reserva'
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.get_passenger_type_display()}"
+
+    def save(self, *args, **kwargs):
+        self.identity_document_normalized = normalize_document(self.identity_document)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'identity_document_normalized'}
+        super().save(*args, **kwargs)
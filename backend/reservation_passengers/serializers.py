@@ -23,7 +23,7 @@ class ReservationPassengerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ReservationPassenger
-        fields = '__all__'
+        exclude = ['search_document', 'identity_document_normalized']
         read_only_fields = ['id', 'created_at']
 
     def get_full_name(self, obj):
@@ -201,3 +201,240 @@ class ReservationPassengerAPITest(TestCase):
         
         self.assertTrue(hasattr(urls, 'router'))
         self.assertTrue(hasattr(urls, 'urlpatterns'))
+
+
+class NormalizeDocumentTest(TestCase):
+    """Tests for identity document normalization"""
+    
+    def test_normalize_strips_separators_and_uppercases(self):
+        """Test separators are removed and letters uppercased"""
+        from reservation_passengers.models import normalize_document
+        
+        self.assertEqual(normalize_document('ab-123.456 7'), 'AB1234567')
+        self.assertEqual(normalize_document('17/0123_456-7'), '1701234567')
+        self.assertEqual(normalize_document(None), '')
+    
+    def test_save_fills_normalized_document(self):
+        """Test save() keeps the normalized column in sync, also with update_fields"""
+        from unittest import mock
+        from django.db.models import Model
+        
+        passenger = ReservationPassenger(identity_document='ec-0912.345')
+        with mock.patch.object(Model, 'save') as model_save:
+            passenger.save(update_fields=['identity_document'])
+        
+        self.assertEqual(passenger.identity_document_normalized, 'EC0912345')
+        self.assertEqual(
+            set(model_save.call_args.kwargs['update_fields']),
+            {'identity_document', 'identity_document_normalized', 'search_document'}
+        )
+
+
+class BulkAssignSeatsTest(TestCase):
+    """Tests for POST /api/reservation-passengers/bulk_assign_seats/"""
+
+    def setUp(self):
+        from datetime import date
+        from decimal import Decimal
+        from django.contrib.auth import get_user_model
+        from django.utils import timezone
+        from rest_framework.test import APIClient
+        from destinations.models import Destination
+        from flight_requests.models import FlightRequest
+        from reservations.models import Reservation
+
+        User = get_user_model()
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        user = User.objects.create(username='owner', email='owner@example.com')
+        origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        flight_request = FlightRequest.objects.create(
+            user=user, origin=origin, destination=destination, travel_date=timezone.localdate()
+        )
+        reservation = Reservation.objects.create(
+            reservation_code='RES-SEATS1', user=user, flight=flight_request,
+            reservation_date=timezone.now(), total_passengers=2, total_amount=Decimal('200.00')
+        )
+        self.passengers = [
+            ReservationPassenger.objects.create(
+                reservation=reservation, first_name=name, last_name='Pérez', country_of_residence='Ecuador',
+                identity_document=document, date_of_birth=date(1990, 1, 1), gender='F'
+            )
+            for name, document in [('Ana', '0912345678'), ('Eva', '0987654321')]
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_assigns_in_one_update_and_reports_missing(self):
+        """Test seats and search documents are saved and unknown ids reported"""
+        first, second = self.passengers
+        with self.assertNumQueries(2):  # SELECT de los pasajeros + UPDATE por lotes
+            response = self.client.post('/api/reservation-passengers/bulk_assign_seats/', {
+                'assignments': [
+                    {'passenger_id': first.id, 'seat_number': '12A'},
+                    {'passenger_id': str(second.id), 'seat_number': '12B'},
+                    {'passenger_id': 999999, 'seat_number': '12C'},
+                ]
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_updated'], 2)
+        self.assertEqual(response.data['errors'], ['Pasajero 999999 no encontrado'])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.seat_number, second.seat_number), ('12A', '12B'))
+        self.assertIn('12a', first.search_document)
+
+
+class PassengerAPITestMixin:
+    """Reserva de 'owner' con una pasajera y peticiones con token JWT real"""
+
+    def setUp(self):
+        from datetime import date
+        from decimal import Decimal
+        from django.contrib.auth import get_user_model
+        from django.core.cache import cache
+        from django.utils import timezone
+        from destinations.models import Destination
+        from flight_requests.models import FlightRequest
+        from reservations.models import Reservation
+
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345', is_staff=True
+        )
+        origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        flight_request = FlightRequest.objects.create(
+            user=self.owner, origin=origin, destination=destination, travel_date=timezone.localdate()
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservation = Reservation.objects.create(
+                reservation_code='RES-CODE01', user=self.owner, flight=flight_request,
+                reservation_date=timezone.now(), total_passengers=1, total_amount=Decimal('100.00')
+            )
+        ReservationPassenger.objects.create(
+            reservation=self.reservation, first_name='Ana', last_name='Pérez', country_of_residence='Ecuador',
+            identity_document='0912345678', date_of_birth=date(1990, 1, 1), gender='F'
+        )
+
+    def _get(self, user, params):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        # Token real: la caché de página varía por la cabecera Authorization
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client.get(self.URL, params)
+
+
+class ByReservationCodeTest(PassengerAPITestMixin, TestCase):
+    """Tests for GET /api/reservation-passengers/by_reservation_code/"""
+
+    URL = '/api/reservation-passengers/by_reservation_code/'
+
+    def _names(self, user, code='RES-CODE01'):
+        response = self._get(user, {'code': code})
+        self.assertEqual(response.status_code, 200)
+        return [passenger['first_name'] for passenger in response.data['results']]
+
+    def test_owner_and_staff_see_passengers_other_users_do_not(self):
+        """Test the code only resolves for its owner and for staff"""
+        self.assertEqual(self._names(self.owner), ['Ana'])
+        self.assertEqual(self._names(self.other), [])
+        self.assertEqual(self._names(self.staff), ['Ana'])
+        self.assertEqual(self._names(self.owner, code='RES-NOPE'), [])
+
+    def test_redis_miss_falls_back_to_the_database(self):
+        """Test a code missing from the hash is read from the DB and cached again"""
+        from reservations.code_cache import forget_reservation_code, resolve_reservation_code
+
+        forget_reservation_code('RES-CODE01')
+        self.assertEqual(self._names(self.owner), ['Ana'])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_reservation_code('RES-CODE01'), (self.reservation.id, self.owner.id))
+
+    def test_hash_follows_orm_deletes_and_owner_changes(self):
+        """Test changes made outside the viewset (admin, ORM) keep the hash in sync"""
+        from reservations.code_cache import resolve_reservation_code
+        from reservations.models import Reservation
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservation.user = self.other
+            self.reservation.save(update_fields=['user'])
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_reservation_code('RES-CODE01'), (self.reservation.id, self.other.id))
+
+        Reservation.objects.filter(pk=self.reservation.pk).delete()
+        self.assertIsNone(resolve_reservation_code('RES-CODE01'))
+        self.assertEqual(self._names(self.staff), [])
+
+
+class SearchByDocumentTest(PassengerAPITestMixin, TestCase):
+    """Tests for GET /api/reservation-passengers/search_by_document/"""
+
+    URL = '/api/reservation-passengers/search_by_document/'
+
+    def setUp(self):
+        super().setUp()
+        from datetime import date
+
+        ReservationPassenger.objects.create(
+            reservation=self.reservation, first_name='José', last_name='Núñez', country_of_residence='Ecuador',
+            identity_document='AÑ-0912.345', date_of_birth=date(1985, 5, 5), gender='M'
+        )
+
+    def _names(self, document, mode=None, user=None):
+        params = {'document': document} if mode is None else {'document': document, 'mode': mode}
+        response = self._get(user or self.owner, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(passenger['first_name'] for passenger in response.data['results'])
+
+    def test_exact_mode_ignores_separators_and_case(self):
+        """Test the default mode matches the whole normalized document"""
+        self.assertEqual(self._names('09-1234-5678'), ['Ana'])
+        self.assertEqual(self._names('0912345678', mode='exact'), ['Ana'])
+        self.assertEqual(self._names('091234567'), [])
+
+    def test_prefix_mode(self):
+        """Test prefix mode matches the start of the normalized document"""
+        self.assertEqual(self._names('091', mode='prefix'), ['Ana'])
+        self.assertEqual(self._names('0912', mode='prefix'), ['Ana'])
+        self.assertEqual(self._names('912', mode='prefix'), [])
+
+    def test_contains_mode_uses_the_same_normalization(self):
+        """Test contains mode matches a substring of the normalized document"""
+        self.assertEqual(self._names('2.34', mode='contains'), ['Ana', 'José'])
+        self.assertEqual(self._names('345678', mode='contains'), ['Ana'])
+
+    def test_accented_document_is_normalized_the_same_in_python_and_sql(self):
+        """Test accents are dropped both by normalize_document and by migration 0006's SQL"""
+        passenger = ReservationPassenger.objects.get(first_name='José')
+        self.assertEqual(passenger.identity_document_normalized, 'A0912345')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT upper(regexp_replace(%s, '[^A-Za-z0-9]+', '', 'g'))", [passenger.identity_document]
+            )
+            self.assertEqual(cursor.fetchone()[0], passenger.identity_document_normalized)
+
+        self.assertEqual(self._names('añ0912345'), ['José'])
+        self.assertEqual(self._names('a-0912345', mode='exact'), ['José'])
+        self.assertEqual(self._names('Añ 09', mode='prefix'), ['José'])
+
+    def test_other_users_do_not_see_passengers(self):
+        """Test users only find passengers of their own reservations"""
+        self.assertEqual(self._names('0912345678', user=self.other), [])
+        self.assertEqual(self._names('0912345678', user=self.staff), ['Ana'])
+
+    def test_missing_document_and_invalid_mode(self):
+        """Test bad requests return 400 with the error message"""
+        response = self._get(self.owner, {'document': '-.-'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'document es requerido'})
+
+        response = self._get(self.owner, {'document': '0912345678', 'mode': 'fuzzy'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'mode debe ser uno de: exact, prefix, contains'})
@@ -3,9 +3,15 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from search.filters import IndexedSearchFilter
+from search.models import build_search_document
 from django.db.models import Count, Q
-from .models import ReservationPassenger, PassengerType, PassengerCategory
+from .models import ReservationPassenger, PassengerType, PassengerCategory, normalize_document
+from reservations.models import Reservation
+from reservations.code_cache import resolve_reservation_code
+from reservations.export import ExportFormatError, stream_export
+from reservations.export_jobs import ExportJobMixin
 from .serializers import (
     ReservationPassengerSerializer,
     ReservationPassengerListSerializer,
@@ -21,17 +27,38 @@ from django.views.decorators.vary import vary_on_headers # ¡CORRECCIÓN JWT!
 # --- FIN DE ADICIONES ---
 
 
-class ReservationPassengerViewSet(viewsets.ModelViewSet):
+# Columnas de GET /api/reservation-passengers/export/: (cabecera, lookup del ORM)
+PASSENGER_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('reservation_id', 'reservation_id'),
+    ('reservation_code', 'reservation__reservation_code'),
+    ('passenger_type', 'passenger_type'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('country_of_residence', 'country_of_residence'),
+    ('identity_document', 'identity_document'),
+    ('date_of_birth', 'date_of_birth'),
+    ('gender', 'gender'),
+    ('passenger_category', 'passenger_category'),
+    ('seat_number', 'seat_number'),
+    ('created_at', 'created_at'),
+]
+
+
+class ReservationPassengerViewSet(ExportJobMixin, viewsets.ModelViewSet):
     queryset = ReservationPassenger.objects.select_related(
         'reservation',
         'reservation__user',
         'reservation__flight'
     ).all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, IndexedSearchFilter]
     filterset_fields = ['reservation', 'passenger_type', 'passenger_category', 'gender']
     search_fields = ['first_name', 'last_name', 'identity_document', 'seat_number']
     ordering_fields = ['created_at', 'passenger_type', 'date_of_birth']
     ordering = ['passenger_type', '-created_at']
+    # Exportaciones asíncronas (export-jobs/)
+    export_job_kind = 'reservation_passengers'
+    export_columns = PASSENGER_EXPORT_COLUMNS
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -121,17 +148,17 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         instance = serializer.save()
-        user_id = instance.reservation.user.id # Obtenemos el user_id de la reserva
+        user_id = instance.reservation.user_id # Obtenemos el user_id de la reserva (sin cargar el usuario)
         self._clear_reservation_passengers_cache(user_id=user_id) # ¡CORRECCIÓN JWT!
 
     def perform_update(self, serializer):
         instance = serializer.save()
-        user_id = instance.reservation.user.id
+        user_id = instance.reservation.user_id
         self._clear_reservation_passengers_cache(pk=instance.pk, user_id=user_id) # ¡CORRECCIÓN JWT!
 
     def perform_destroy(self, instance):
         pk = instance.pk
-        user_id = instance.reservation.user.id
+        user_id = instance.reservation.user_id
         instance.delete()
         self._clear_reservation_passengers_cache(pk=pk, user_id=user_id) # ¡CORRECCIÓN JWT!
 
@@ -251,16 +278,40 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
     @method_decorator(vary_on_headers("Authorization"))
     @action(detail=False, methods=['get'])
     def search_by_document(self, request):
-        """Buscar pasajero por documento de identidad"""
+        """
+        Buscar pasajero por documento de identidad.
+        Todos los modos comparan el documento normalizado (normalize_document):
+        ?mode=exact (por defecto) y ?mode=prefix usan su índice; ?mode=contains
+        es la búsqueda por subcadena (lenta, sin índice).
+        """
         document = request.query_params.get('document')
+        mode = request.query_params.get('mode', 'exact')
+        normalized = normalize_document(document)
         
-        if not document:
+        if not normalized:
             return Response(
                 {'error': 'document es requerido'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        passengers = self.get_queryset().filter(identity_document__icontains=document)
+        if mode == 'exact':
+            passengers = self.get_queryset().filter(
+                identity_document_normalized=normalized
+            )
+        elif mode == 'prefix':
+            passengers = self.get_queryset().filter(
+                identity_document_normalized__startswith=normalized
+            )
+        elif mode == 'contains':
+            passengers = self.get_queryset().filter(
+                identity_document_normalized__contains=normalized
+            )
+        else:
+            return Response(
+                {'error': 'mode debe ser uno de: exact, prefix, contains'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         page = self.paginate_queryset(passengers)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -282,7 +333,14 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        passengers = self.get_queryset().filter(reservation__reservation_code=code)
+        # El código se resuelve a (reservation_id, user_id) desde Redis, así la
+        # consulta filtra por reservation_id (índice) sin join con reservations.
+        resolved = resolve_reservation_code(code)
+        user = request.user
+        if resolved is None or not (user.is_staff or user.is_superuser or resolved[1] == user.id):
+            passengers = self.queryset.none()
+        else:
+            passengers = self.queryset.filter(reservation_id=resolved[0])
         page = self.paginate_queryset(passengers)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -306,6 +364,24 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(passengers, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exportar pasajeros en CSV o NDJSON (?file_format=), con los mismos filtros que el listado"""
+        # Sin caché ni paginación: se transmite fila a fila desde un cursor de servidor
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return stream_export(
+                queryset,
+                PASSENGER_EXPORT_COLUMNS,
+                request.query_params.get('file_format', 'csv'),
+                'reservation_passengers'
+            )
+        except ExportFormatError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
     # --- ACCIONES PERSONALIZADAS (ESCRITURA) CON INVALIDACIÓN DE CACHÉ ---
     
     @action(detail=True, methods=['patch'], permission_classes=[IsAdminUser])
@@ -353,26 +429,37 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
         updated_passengers = []
         errors = []
         user_ids_to_clear = set() # Para limpiar caché
-        
+
+        # Una sola consulta para todos los pasajeros (sin .get() por asignación);
+        # se usa .objects para permitir al admin asignar a cualquier pasajero
+        passengers = {
+            str(passenger.pk): passenger
+            for passenger in ReservationPassenger.objects.select_related('reservation').filter(
+                id__in=[assignment.get('passenger_id') for assignment in assignments]
+            )
+        }
+
         for assignment in assignments:
             passenger_id = assignment.get('passenger_id')
             seat_number = assignment.get('seat_number')
-            
-            try:
-                # Usamos .all() para permitir al admin asignar a cualquier pasajero
-                passenger = ReservationPassenger.objects.get(id=passenger_id)
-                # Verificamos permiso si acaso el admin no es staff
-                if not request.user.is_staff and passenger.reservation.user != request.user:
-                     errors.append(f'Permiso denegado para pasajero {passenger_id}')
-                     continue
-                     
-                passenger.seat_number = seat_number
-                passenger.save()
-                updated_passengers.append(passenger)
-                user_ids_to_clear.add(passenger.reservation.user.id) # Añadir usuario para limpiar caché
-            except ReservationPassenger.DoesNotExist:
+
+            passenger = passengers.get(str(passenger_id))
+            if passenger is None:
                 errors.append(f'Pasajero {passenger_id} no encontrado')
-        
+                continue
+            # Verificamos permiso si acaso el admin no es staff
+            if not request.user.is_staff and passenger.reservation.user_id != request.user.id:
+                errors.append(f'Permiso denegado para pasajero {passenger_id}')
+                continue
+
+            passenger.seat_number = seat_number
+            passenger.search_document = build_search_document(passenger)
+            updated_passengers.append(passenger)
+            user_ids_to_clear.add(passenger.reservation.user_id) # Añadir usuario para limpiar caché
+
+        # Un UPDATE para todo el lote (bulk_update no llama a save())
+        ReservationPassenger.objects.bulk_update(updated_passengers, ['seat_number', 'search_document'])
+
         # Limpiar caché para todos los usuarios afectados
         for user_id in user_ids_to_clear:
             self._clear_reservation_passengers_cache(user_id=user_id)
@@ -407,7 +494,7 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
                 reservation_id = serializer.validated_data.get('reservation').id
                 try:
                     reservation = Reservation.objects.get(id=reservation_id)
-                    if reservation.user != request.user and not request.user.is_staff:
+                    if reservation.user_id != request.user.id and not request.user.is_staff:
                         errors.append({
                             'data': passenger_data,
                             'errors': 'No tiene permiso sobre esta reserva'
@@ -416,7 +503,7 @@ class ReservationPassengerViewSet(viewsets.ModelViewSet):
                         
                     instance = serializer.save()
                     created_passengers.append(serializer.data)
-                    user_ids_to_clear.add(instance.reservation.user.id) # Añadir usuario para limpiar caché
+                    user_ids_to_clear.add(reservation.user_id) # Añadir usuario para limpiar caché
                 except Reservation.DoesNotExist:
                      errors.append({
                             'data': passenger_data,
@@ -5,3 +5,24 @@ class ReservationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reservations'
     verbose_name = 'Reservations'
+
+    def ready(self):
+        # El hash código -> id:user_id sigue a la tabla desde cualquier origen
+        # (API, admin, cascadas del ORM), no solo desde ReservationViewSet
+        from functools import partial
+        from django.db import transaction
+        from django.db.models.signals import post_delete, post_save
+        from .code_cache import forget_reservation_code, remember_reservation_code
+        from .models import Reservation
+
+        def reservation_saved(sender, instance, raw=False, **kwargs):
+            # Alta o cambio de usuario; reservation_code es de solo lectura
+            if not raw:
+                transaction.on_commit(partial(remember_reservation_code, instance))
+
+        def reservation_deleted(sender, instance, **kwargs):
+            # Un fallo solo cuesta un acceso a la BD en resolve_reservation_code
+            forget_reservation_code(instance.reservation_code)
+
+        post_save.connect(reservation_saved, sender=Reservation, weak=False, dispatch_uid='reservations_code_cache_save')
+        post_delete.connect(reservation_deleted, sender=Reservation, weak=False, dispatch_uid='reservations_code_cache_delete')
@@ -0,0 +1,48 @@
+# Caché código de reserva -> (id, user_id) en un hash de Redis
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from .models import Reservation
+
+RESERVATION_CODES_KEY = 'reservation_codes'
+
+
+def _codes_key():
+    # Respeta el KEY_PREFIX/versión de CACHES['default']
+    return cache.make_key(RESERVATION_CODES_KEY)
+
+
+def remember_reservation_code(reservation):
+    """Store reservation_code -> (id, user_id); called when a reservation is created"""
+    get_redis_connection('default').hset(
+        _codes_key(),
+        reservation.reservation_code,
+        f'{reservation.pk}:{reservation.user_id}'
+    )
+
+
+def forget_reservation_code(reservation_code):
+    """Drop a code from the hash (reservation deleted)"""
+    get_redis_connection('default').hdel(_codes_key(), reservation_code)
+
+
+def resolve_reservation_code(reservation_code):
+    """
+    Return (reservation_id, user_id) for a code, or None if it does not exist.
+    Misses (e.g. reservations created before the cache existed) fall back to
+    the unique index on reservations.reservation_code and are stored.
+    """
+    redis = get_redis_connection('default')
+    value = redis.hget(_codes_key(), reservation_code)
+    if value is not None:
+        reservation_id, user_id = value.decode().split(':')
+        return int(reservation_id), int(user_id)
+
+    row = Reservation.objects.filter(
+        reservation_code=reservation_code
+    ).values_list('id', 'user_id').first()
+    if row is None:
+        return None
+
+    redis.hset(_codes_key(), reservation_code, f'{row[0]}:{row[1]}')
+    return row
@@ -0,0 +1,103 @@
+# Exportación en streaming (CSV / NDJSON) de reservas y pasajeros
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# Filas por viaje al cursor de servidor y por trozo enviado al cliente
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportFormatError(ValueError):
+    """Unsupported export format"""
+
+
+def plain_value(value):
+    """Valor exportable (str/int/None) de una columna de values_list"""
+    # Mismo formato que los serializers de DRF: fechas en la zona local
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def csv_header(headers):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(headers)
+    return buffer.getvalue()
+
+
+def csv_lines(rows):
+    """Una línea CSV por fila"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([plain_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def ndjson_lines(headers, rows):
+    """Un objeto JSON por fila y línea"""
+    for row in rows:
+        yield json.dumps(
+            {header: plain_value(value) for header, value in zip(headers, row)},
+            ensure_ascii=False
+        ) + '\n'
+
+
+def _buffered(head, chunks, size=EXPORT_CHUNK_SIZE):
+    """
+    Envía `head` antes de ejecutar la consulta (primer byte inmediato) y
+    luego agrupa las líneas para no hacer un write() por fila.
+    """
+    yield head
+    pending = []
+    for chunk in chunks:
+        pending.append(chunk)
+        if len(pending) >= size:
+            yield ''.join(pending)
+            pending = []
+    if pending:
+        yield ''.join(pending)
+
+
+def stream_export(queryset, columns, file_format, filename):
+    """
+    StreamingHttpResponse con las filas de queryset. `columns` es una lista
+    de (cabecera, lookup del ORM). Se leen con values_list sobre un cursor
+    de servidor (.iterator), así que la memoria no depende del número de
+    filas. Bajo ASGI Django consume los iteradores síncronos completos:
+    las exportaciones grandes deben servirse por WSGI.
+    """
+    content_type = EXPORT_FORMATS.get(file_format)
+    if content_type is None:
+        raise ExportFormatError(f'Formato debe ser uno de: {", ".join(EXPORT_FORMATS)}')
+
+    headers = [header for header, _lookup in columns]
+    rows = queryset.values_list(*[lookup for _header, lookup in columns]).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+    if file_format == 'csv':
+        chunks = _buffered(csv_header(headers), csv_lines(rows))
+    else:
+        chunks = _buffered('', ndjson_lines(headers, rows))
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'  # nginx: no acumular la descarga
+    return response
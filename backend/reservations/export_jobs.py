@@ -0,0 +1,397 @@
+# Exportaciones asíncronas: Celery escribe trozos gzip por rango de ids
+import gzip
+import json
+import os
+import pickle
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, csv_header, csv_lines, ndjson_lines
+
+
+class ExportJobStatus:
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+# Campos del hash de Redis que se devuelven tal cual en el estado del job
+JOB_PUBLIC_FIELDS = (
+    'id', 'kind', 'status', 'file_format', 'chunks_total', 'chunks_done',
+    'rows', 'size', 'error', 'created_at', 'completed_at',
+)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+DOWNLOAD_BLOCK_SIZE = 64 * 1024
+
+
+def _job_key(job_id):
+    # Respeta el KEY_PREFIX/versión de CACHES['default']
+    return cache.make_key(f'export_job:{job_id}')
+
+
+def _chunks_key(job_id):
+    """Hash índice de trozo -> filas escritas (HLEN = trozos terminados)"""
+    return cache.make_key(f'export_job:{job_id}:chunks')
+
+
+def job_dir(job_id):
+    return Path(settings.EXPORT_JOBS_DIR) / job_id
+
+
+def chunk_path(job_id, index):
+    return job_dir(job_id) / f'chunk-{index:06d}.gz'
+
+
+def artifact_path(job):
+    return job_dir(job['id']) / f"{job['kind']}.{job['file_format']}.gz"
+
+
+def _save(job_id, **fields):
+    redis = get_redis_connection('default')
+    redis.hset(_job_key(job_id), mapping={
+        name: value if isinstance(value, bytes) else json.dumps(value)
+        for name, value in fields.items()
+    })
+    redis.expire(_job_key(job_id), settings.EXPORT_JOB_TTL)
+
+
+def _load(job_id, with_query=False):
+    raw = get_redis_connection('default').hgetall(_job_key(job_id))
+    if not raw:
+        return None
+    job = {}
+    for name, value in raw.items():
+        name = name.decode()
+        if name == 'query':
+            if with_query:
+                job[name] = pickle.loads(value)
+            continue
+        job[name] = json.loads(value)
+    return job
+
+
+def create_export_job(queryset, columns, file_format, kind, user_id):
+    """
+    Guarda el job en Redis y lo encola. La consulta (QuerySet.query, con el
+    filtrado por usuario y los filter backends ya aplicados) viaja
+    serializada con pickle, igual que los valores de django-redis.
+    """
+    from .tasks import plan_export_job
+
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f'Formato debe ser uno de: {", ".join(EXPORT_FORMATS)}')
+
+    job_id = uuid.uuid4().hex
+    _save(
+        job_id,
+        id=job_id,
+        kind=kind,
+        status=ExportJobStatus.PENDING,
+        file_format=file_format,
+        user_id=user_id,
+        columns=columns,
+        query=pickle.dumps(queryset.query),
+        chunks_total=0,
+        chunks_done=0,
+        rows=0,
+        size=0,
+        error=None,
+        created_at=timezone.now().isoformat(),
+        completed_at=None,
+    )
+    plan_export_job.delay(job_id)
+    return job_id
+
+
+def get_export_job(job_id):
+    """Public state of a job, or None if it does not exist or expired"""
+    job = _load(job_id)
+    if job is None:
+        return None
+    job['chunks_done'] = get_redis_connection('default').hlen(_chunks_key(job_id))
+    return job
+
+
+def _queryset(job):
+    query = job['query']
+    queryset = query.model._default_manager.all()
+    queryset.query = query
+    return queryset
+
+
+def plan_job(job_id):
+    """
+    Divide el rango de ids en trozos de EXPORT_JOB_CHUNK_IDS y devuelve los
+    que faltan por escribir: volver a planificar reanuda un job interrumpido.
+    """
+    job = _load(job_id, with_query=True)
+    if job is None or job['status'] in (ExportJobStatus.COMPLETED, ExportJobStatus.FAILED):
+        return []
+
+    # Al reanudar se reutiliza el rango original aunque haya filas nuevas
+    id_range = job.get('id_range')
+    if id_range is None:
+        bounds = _queryset(job).aggregate(first=Min('pk'), last=Max('pk'))
+        id_range = [bounds['first'], bounds['last']]
+
+    step = settings.EXPORT_JOB_CHUNK_IDS
+    first, last = id_range
+    ranges = [] if first is None else [
+        (index, start, min(start + step, last + 1))
+        for index, start in enumerate(range(first, last + 1, step))
+    ]
+    job_dir(job_id).mkdir(parents=True, exist_ok=True)
+    _save(job_id, status=ExportJobStatus.RUNNING, id_range=id_range, chunks_total=len(ranges))
+
+    done = {int(index) for index in get_redis_connection('default').hkeys(_chunks_key(job_id))}
+    return [chunk for chunk in ranges if chunk[0] not in done]
+
+
+def write_chunk(job_id, index, start_id, end_id):
+    """
+    Escribe las filas con start_id <= pk < end_id en un gzip propio. Se
+    escribe a un .part y se renombra, así un reintento nunca deja un trozo
+    a medias. Devuelve True cuando era el último trozo pendiente.
+    """
+    job = _load(job_id, with_query=True)
+    if job is None or job['status'] != ExportJobStatus.RUNNING:
+        return False
+
+    redis = get_redis_connection('default')
+    path = chunk_path(job_id, index)
+    if not redis.hexists(_chunks_key(job_id), index):
+        headers = [header for header, _lookup in job['columns']]
+        rows = _queryset(job).filter(pk__gte=start_id, pk__lt=end_id).order_by('pk').values_list(
+            *[lookup for _header, lookup in job['columns']]
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        lines = csv_lines(rows) if job['file_format'] == 'csv' else ndjson_lines(headers, rows)
+
+        count = 0
+        part = path.with_suffix('.part')
+        with gzip.open(part, 'wt', encoding='utf-8', newline='', compresslevel=6) as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        os.replace(part, path)
+        redis.hset(_chunks_key(job_id), index, count)
+        redis.expire(_chunks_key(job_id), settings.EXPORT_JOB_TTL)
+
+    return redis.hlen(_chunks_key(job_id)) >= job['chunks_total']
+
+
+def finalize_job(job_id):
+    """
+    Une los trozos en el archivo final. Varios miembros gzip concatenados
+    son un gzip válido, así que no hace falta descomprimir nada. Si algo
+    falla (un trozo que falta, disco lleno) el job queda FAILED y sin la
+    marca 'finalizing': resume_export_job puede reanudarlo.
+    """
+    job = _load(job_id)
+    if job is None or job['status'] != ExportJobStatus.RUNNING:
+        return
+    redis = get_redis_connection('default')
+    # Solo un worker finaliza aunque varios terminen a la vez
+    if not redis.hsetnx(_job_key(job_id), 'finalizing', 'true'):
+        return
+    try:
+        _write_artifact(job_id, job, redis)
+    except Exception as exc:
+        redis.hdel(_job_key(job_id), 'finalizing')
+        fail_job(job_id, exc)
+        raise
+
+
+def _write_artifact(job_id, job, redis):
+    missing = [index for index in range(job['chunks_total']) if not chunk_path(job_id, index).exists()]
+    if missing:
+        # Al reanudar, plan_job vuelve a encolar los trozos perdidos
+        redis.hdel(_chunks_key(job_id), *missing)
+        raise FileNotFoundError(f'Faltan {len(missing)} trozos de la exportación')
+    chunk_rows = {int(index): int(rows) for index, rows in redis.hgetall(_chunks_key(job_id)).items()}
+
+    artifact = artifact_path(job)
+    part = artifact.with_name(artifact.name + '.part')
+    try:
+        with open(part, 'wb') as output:
+            if job['file_format'] == 'csv':
+                output.write(gzip.compress(
+                    csv_header([header for header, _lookup in job['columns']]).encode()
+                ))
+            for index in range(job['chunks_total']):
+                with open(chunk_path(job_id, index), 'rb') as chunk:
+                    shutil.copyfileobj(chunk, output)
+        os.replace(part, artifact)
+        size = artifact.stat().st_size
+    finally:
+        part.unlink(missing_ok=True)
+    for index in range(job['chunks_total']):
+        chunk_path(job_id, index).unlink(missing_ok=True)
+
+    _save(
+        job_id,
+        status=ExportJobStatus.COMPLETED,
+        rows=sum(chunk_rows.values()),
+        size=size,
+        completed_at=timezone.now().isoformat(),
+    )
+
+
+def fail_job(job_id, error):
+    _save(job_id, status=ExportJobStatus.FAILED, error=str(error))
+
+
+def reopen_job(job_id):
+    """Un job FAILED vuelve a RUNNING para reanudarlo; los trozos escritos se conservan"""
+    job = _load(job_id)
+    if job is None or job['status'] != ExportJobStatus.FAILED:
+        return False
+    _save(job_id, status=ExportJobStatus.RUNNING, error=None)
+    return True
+
+
+def purge_jobs(max_age=None):
+    """Borra los directorios de jobs más antiguos que EXPORT_JOB_TTL"""
+    root = Path(settings.EXPORT_JOBS_DIR)
+    if not root.is_dir():
+        return 0
+    limit = time.time() - (settings.EXPORT_JOB_TTL if max_age is None else max_age)
+    purged = 0
+    for path in root.iterdir():
+        if path.is_dir() and path.stat().st_mtime < limit:
+            shutil.rmtree(path, ignore_errors=True)
+            purged += 1
+    return purged
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            block = source.read(min(DOWNLOAD_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def ranged_file_response(request, path, filename):
+    """
+    Descarga con soporte de Range (un solo rango de bytes) para poder
+    reanudar descargas grandes: 206 con Content-Range, 416 si no es válido.
+    """
+    size = path.stat().st_size
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if match is None or match.groups() == ('', ''):
+        response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/gzip')
+        response['Accept-Ranges'] = 'bytes'
+        add_never_cache_headers(response)
+        return response
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or end < start:
+        response = Response(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    response = StreamingHttpResponse(
+        _read_range(path, start, end - start + 1),
+        status=status.HTTP_206_PARTIAL_CONTENT,
+        content_type='application/gzip'
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    add_never_cache_headers(response)
+    return response
+
+
+class ExportJobMixin:
+    """
+    Acciones export-jobs para un ViewSet: POST crea el job con el queryset
+    filtrado del listado, GET consulta su progreso y download/ descarga el
+    archivo. Cada usuario solo ve sus propios jobs.
+    """
+    export_job_kind = None
+    export_columns = ()
+
+    def _export_job_for_user(self, request, job_id):
+        job = get_export_job(job_id)
+        if job is None or job['kind'] != self.export_job_kind or job['user_id'] != request.user.id:
+            return None
+        return job
+
+    def _export_job_data(self, request, job):
+        data = {field: job.get(field) for field in JOB_PUBLIC_FIELDS}
+        data['download_url'] = None
+        if job['status'] == ExportJobStatus.COMPLETED:
+            data['download_url'] = self.reverse_action('download-export-job', kwargs={'job_id': job['id']})
+        return data
+
+    @action(detail=False, methods=['post'], url_path='export-jobs')
+    def create_export_job(self, request):
+        """Encolar una exportación completa (?filtros del listado, file_format=csv|ndjson)"""
+        file_format = request.data.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Formato debe ser uno de: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        job_id = create_export_job(
+            queryset, list(self.export_columns), file_format, self.export_job_kind, request.user.id
+        )
+        return Response(
+            self._export_job_data(request, get_export_job(job_id)),
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['get'], url_path=r'export-jobs/(?P<job_id>[0-9a-f]{32})')
+    def export_job(self, request, job_id=None):
+        """Progreso de una exportación"""
+        job = self._export_job_for_user(request, job_id)
+        if job is None:
+            return Response({'error': 'Exportación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        response = Response(self._export_job_data(request, job))
+        # El progreso cambia y es privado: fuera de la caché de UpdateCacheMiddleware
+        add_never_cache_headers(response)
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'export-jobs/(?P<job_id>[0-9a-f]{32})/download')
+    def download_export_job(self, request, job_id=None):
+        """Descargar el archivo de una exportación terminada (admite Range)"""
+        job = self._export_job_for_user(request, job_id)
+        if job is None:
+            return Response({'error': 'Exportación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        if job['status'] != ExportJobStatus.COMPLETED:
+            return Response(
+                {'error': 'La exportación aún no ha terminado'},
+                status=status.HTTP_409_CONFLICT
+            )
+        path = artifact_path(job)
+        if not path.exists():
+            return Response({'error': 'Exportación no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        return ranged_file_response(request, path, path.name)
@@ -0,0 +1,78 @@
+# reservations/management/commands/manage_partitions.py
+
+from django.core.management.base import BaseCommand
+
+from reservations import partitioning
+
+
+class Command(BaseCommand):
+    """
+    Mantenimiento del particionado mensual de reservations y
+    reservation_passengers (lo mismo que la tarea diaria de Celery beat).
+    --convert convierte una única vez las tablas aún sin particionar; las
+    claves foráneas que apuntan a ellas se eliminan y se listan (las
+    RESTRICT se sustituyen por triggers).
+    """
+    help = 'Crea las particiones de los próximos meses, aplica la retención o convierte las tablas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Convierte las tablas aún sin particionar (sin copiar filas).'
+        )
+        parser.add_argument(
+            '--months-ahead', type=int, default=None,
+            help='Meses futuros con partición (por defecto PARTITION_MONTHS_AHEAD).'
+        )
+        parser.add_argument(
+            '--retention-months', type=int, default=None,
+            help='Meses completos que se conservan adjuntos; 0 = todos (por defecto PARTITION_RETENTION_MONTHS).'
+        )
+        parser.add_argument(
+            '--drop', action='store_true', default=None,
+            help='Borra las particiones separadas en lugar de moverlas a PARTITION_ARCHIVE_SCHEMA.'
+        )
+        parser.add_argument('--list', action='store_true', help='Solo muestra las particiones actuales.')
+
+    def handle(self, *args, **options):
+        if options['convert']:
+            for table in partitioning.PARTITIONED_TABLES:
+                self._convert(table)
+
+        if not options['list']:
+            summary = partitioning.maintain_partitions(
+                months_ahead=options['months_ahead'],
+                retention_months=options['retention_months'],
+                drop=options['drop'],
+            )
+            for table, result in summary.items():
+                for name in result['created']:
+                    self.stdout.write(f'{table}: creada {name}')
+                for name in result['detached']:
+                    self.stdout.write(f'{table}: separada {name}')
+
+        for table in partitioning.PARTITIONED_TABLES:
+            self._list(table)
+
+    def _convert(self, table):
+        result = partitioning.convert_table(table)
+        if result is None:
+            self.stdout.write(f'{table}: ya está particionada')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{table}: convertida; {result['legacy']} cubre hasta {result['bound']}"
+        ))
+        for foreign_key in result['dropped_foreign_keys']:
+            self.stdout.write(self.style.WARNING(f'  clave foránea eliminada: {foreign_key}'))
+        for name in result['restrict_triggers']:
+            self.stdout.write(f'  {name}: ON DELETE RESTRICT sustituido por un trigger')
+
+    def _list(self, table):
+        if not partitioning.is_partitioned(table):
+            self.stdout.write(f'{table}: sin particionar (ver --convert)')
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(table))
+        for partition in partitioning.list_partitions(table):
+            start = partition['start'] or 'MINVALUE'
+            end = partition['end'] or 'MAXVALUE'
+            self.stdout.write(f"  {partition['name']:<40} {start} .. {end}  ~{partition['rows']} filas")
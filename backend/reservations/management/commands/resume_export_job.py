@@ -0,0 +1,32 @@
+# reservations/management/commands/resume_export_job.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.export_jobs import ExportJobStatus, get_export_job, reopen_job
+from reservations.tasks import plan_export_job
+
+
+class Command(BaseCommand):
+    """
+    Vuelve a encolar los trozos pendientes de una exportación interrumpida
+    (por ejemplo, tras reiniciar los workers) o fallida (un trozo perdido,
+    disco lleno al unir el archivo). Los trozos ya escritos no se repiten.
+    """
+    help = 'Reanuda una exportación asíncrona de reservas o pasajeros.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', help='Id de la exportación.')
+
+    def handle(self, *args, **options):
+        job = get_export_job(options['job_id'])
+        if job is None:
+            raise CommandError('Exportación no encontrada (puede haber caducado).')
+        if job['status'] == ExportJobStatus.COMPLETED:
+            raise CommandError('La exportación ya terminó.')
+        if job['status'] == ExportJobStatus.FAILED:
+            reopen_job(job['id'])
+
+        plan_export_job.delay(job['id'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Exportación {job['id']} reanudada: {job['chunks_done']}/{job['chunks_total']} trozos escritos."
+        ))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no bloquea las escrituras, pero no admite transacción
+    atomic = False
+
+    dependencies = [
+        ('flight_requests', '0003_flightrequest_status_traveldate_index'),
+        ('reservations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='reservation',
+            index=models.Index(fields=['user', '-created_at'], name='idx_reservation_user_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='reservation',
+            index=models.Index(fields=['status', '-created_at'], name='idx_reservation_status_created'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_reservation_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='version',
+            field=models.PositiveIntegerField(db_column='version', db_default=1, default=1, editable=False),
+        ),
+    ]
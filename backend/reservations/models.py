@@ -1,5 +1,6 @@
 ﻿from django.db import models
 from django.conf import settings
+from concurrency.models import VersionedModelMixin
 
 
 class ReservationStatus(models.TextChoices):
@@ -8,7 +9,10 @@ class ReservationStatus(models.TextChoices):
     CANCELLED = 'cancelled', 'Cancelada'
 
 
-class Reservation(models.Model):
+class Reservation(VersionedModelMixin, models.Model):
+    # Con la tabla particionada (reservations.partitioning) el índice UNIQUE es
+    # (reservation_code, created_at); la unicidad global la garantiza la tabla
+    # reservations_reservation_code_unique, mantenida por un trigger.
     reservation_code = models.CharField(
         max_length=50,
         unique=True,
@@ -63,6 +67,12 @@ class Reservation(models.Model):
     class Meta:
         db_table = 'reservations'
         ordering = ['-created_at']
+        indexes = [
+            # Listado del cliente (user=request.user) y my_reservations con el orden por defecto
+            models.Index(fields=['user', '-created_at'], name='idx_reservation_user_created'),
+            # pending/confirmed, ?status= y los conteos de statistics
+            models.Index(fields=['status', '-created_at'], name='idx_reservation_status_created'),
+        ]
         verbose_name = 'Reserva'
         verbose_name_plural = 'Reservas'
 
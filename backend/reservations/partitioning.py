@@ -0,0 +1,424 @@
+# Particionado declarativo por mes de created_at: reservations y reservation_passengers
+"""
+convert_table() convierte una tabla existente sin copiar filas: la tabla
+actual pasa a ser la partición <tabla>_legacy (FROM MINVALUE hasta el mes
+siguiente) y las filas nuevas caen en particiones mensuales <tabla>_pAAAAMM.
+Las consultas por created_at reciente (recent, orden -created_at) solo
+recorren las particiones de su rango y las antiguas se separan sin borrar
+filas una a una.
+
+Consecuencias del particionado en PostgreSQL:
+- PK y restricciones UNIQUE deben incluir created_at: la PK pasa a ser
+  (id, created_at) y reservation_code es único junto con created_at. La
+  unicidad global de las columnas de GLOBAL_UNIQUE_COLUMNS la mantiene una
+  tabla auxiliar <tabla>_<columna>_unique (PK sobre la columna) que
+  actualiza un trigger en cada INSERT, UPDATE y DELETE.
+- Ninguna clave foránea puede apuntar a una tabla particionada por id: se
+  eliminan las que apuntan a estas tablas (pasajeros, pagos, recordatorios).
+  El borrado en cascada queda en manos del ORM de Django; las ON DELETE
+  RESTRICT / NO ACTION (payments, payment_details, sin modelo) pasan a un
+  trigger BEFORE DELETE que sigue impidiendo borrar una reserva con pagos.
+- CREATE INDEX CONCURRENTLY no funciona sobre la tabla padre: los índices
+  nuevos se crean con CREATE INDEX normal (o partición a partición).
+"""
+import re
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+PARTITIONED_TABLES = ('reservations', 'reservation_passengers')
+PARTITION_KEY = 'created_at'
+# Columnas UNIQUE que deben seguir siendo únicas en toda la tabla (no por created_at)
+GLOBAL_UNIQUE_COLUMNS = {'reservations': ('reservation_code',)}
+MAX_IDENTIFIER_LENGTH = 63
+
+BOUND_RE = re.compile(
+    r"FROM \((?:MINVALUE|'(\d{4}-\d{2}-\d{2})[^)]*)\) TO \((?:MAXVALUE|'(\d{4}-\d{2}-\d{2})[^)]*)\)"
+)
+
+PARTITIONS_SQL = """
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(%s)
+"""
+
+UNIQUE_CONSTRAINTS_SQL = """
+    SELECT con.conname, con.contype,
+           ARRAY(
+               SELECT a.attname
+               FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, n)
+               JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+               ORDER BY k.n
+           )
+    FROM pg_constraint con
+    WHERE con.conrelid = to_regclass(%s) AND con.contype IN ('p', 'u')
+    ORDER BY con.contype, con.conname
+"""
+
+# Índices que no respaldan una PK/UNIQUE de la propia tabla
+PLAIN_INDEXES_SQL = """
+    SELECT c.relname, pg_get_indexdef(i.indexrelid)
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE i.indrelid = to_regclass(%s) AND NOT i.indisunique AND i.indisvalid
+    ORDER BY c.relname
+"""
+
+# conparentid = 0: las copias en cada partición se borran con la del padre
+FOREIGN_KEYS_SQL = """
+    SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE {column} = to_regclass(%s) AND contype = 'f' AND conparentid = 0
+    ORDER BY 1, 2
+"""
+
+# Claves foráneas de una columna con ON DELETE RESTRICT ('r') o NO ACTION ('a').
+# Las DEFERRABLE son las que crea Django: el ORM ya borra antes las filas hijas
+RESTRICT_FOREIGN_KEYS_SQL = """
+    SELECT con.conrelid::regclass::text, con.conname, a.attname, af.attname
+    FROM pg_constraint con
+    JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = con.conkey[1]
+    JOIN pg_attribute af ON af.attrelid = con.confrelid AND af.attnum = con.confkey[1]
+    WHERE con.confrelid = to_regclass(%s) AND con.contype = 'f' AND con.conparentid = 0
+      AND con.confdeltype IN ('r', 'a') AND NOT con.condeferrable AND cardinality(con.conkey) = 1
+    ORDER BY 1, 2
+"""
+
+RESTRICT_DELETE_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM {referencing} WHERE {column} = OLD.{referenced}) THEN
+            RAISE EXCEPTION 'update or delete on table "{table}" violates foreign key constraint "{name}" on table "{referencing_name}"'
+                USING ERRCODE = 'foreign_key_violation';
+        END IF;
+        RETURN OLD;
+    END
+    $$
+"""
+
+UNIQUE_LOOKUP_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM {lookup} WHERE {column} = OLD.{column};
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO {lookup} ({column}) VALUES (NEW.{column});
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def _columns(columns):
+    return ', '.join(_quote(column) for column in columns)
+
+
+def _legacy_name(name):
+    return f'{name[:MAX_IDENTIFIER_LENGTH - 7]}_legacy'
+
+
+def _partition_key_name(table, columns):
+    # Índice único (columnas..., created_at) que exige la tabla particionada
+    return f"{table}_{'_'.join(columns)}_{PARTITION_KEY}_key"[:MAX_IDENTIFIER_LENGTH]
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month():
+    # created_at se guarda en UTC (timestamp sin zona horaria)
+    return month_start(timezone.now())
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)', [table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def list_partitions(table):
+    """Particiones ordenadas por rango: name, start, end (None = sin límite) y filas estimadas"""
+    with connection.cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, [table])
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound, estimate in rows:
+        start, end = (date.fromisoformat(value) if value else None for value in BOUND_RE.search(bound).groups())
+        partitions.append({'name': name, 'start': start, 'end': end, 'rows': max(estimate, 0)})
+    return sorted(partitions, key=lambda partition: partition['start'] or date.min)
+
+
+def _covers(partition, month):
+    return (partition['start'] is None or partition['start'] <= month) and (
+        partition['end'] is None or month < partition['end']
+    )
+
+
+def ensure_partitions(table, months_ahead=None, today=None):
+    """
+    Crea las particiones mensuales que falten desde el mes actual hasta
+    months_ahead meses después (PARTITION_MONTHS_AHEAD). Sin partición
+    DEFAULT: un INSERT fuera de rango falla, así que la tarea de beat
+    mantiene siempre varios meses por delante.
+    """
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = month_start(today) if today else current_month()
+    partitions = list_partitions(table)
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            start = add_months(first, offset)
+            if any(_covers(partition, start) for partition in partitions):
+                continue
+            name = partition_name(table, start)
+            cursor.execute(
+                f"CREATE TABLE {_quote(name)} PARTITION OF {_quote(table)} "
+                f"FOR VALUES FROM ('{start}') TO ('{add_months(start, 1)}')"
+            )
+            created.append(name)
+    return created
+
+
+def detach_old_partitions(table, retention_months=None, drop=None, concurrently=True, today=None):
+    """
+    Separa las particiones cuyo rango acaba antes de los últimos
+    retention_months meses completos (PARTITION_RETENTION_MONTHS; 0 =
+    conservar todo). Se mueven al esquema PARTITION_ARCHIVE_SCHEMA, o se
+    borran con drop. DETACH ... CONCURRENTLY no bloquea lecturas ni
+    escrituras pero no admite transacción (concurrently=False en los tests).
+    """
+    retention_months = settings.PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+    drop = settings.PARTITION_DROP_DETACHED if drop is None else drop
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(today) if today else current_month(), -retention_months)
+    schema = _quote(settings.PARTITION_ARCHIVE_SCHEMA)
+    detached = []
+    with connection.cursor() as cursor:
+        for partition in list_partitions(table):
+            if partition['end'] is None or partition['end'] > cutoff:
+                continue
+            name = _quote(partition['name'])
+            cursor.execute(
+                f"ALTER TABLE {_quote(table)} DETACH PARTITION {name}{' CONCURRENTLY' if concurrently else ''}"
+            )
+            if drop:
+                cursor.execute(f'DROP TABLE {name}')
+            else:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {schema}')
+                cursor.execute(f'ALTER TABLE {name} SET SCHEMA {schema}')
+            detached.append(partition['name'])
+    return detached
+
+
+def maintain_partitions(months_ahead=None, retention_months=None, drop=None, concurrently=True, today=None):
+    """Particiones de los próximos meses y retención de las tablas ya particionadas"""
+    summary = {}
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            continue
+        summary[table] = {
+            'created': ensure_partitions(table, months_ahead, today),
+            'detached': detach_old_partitions(table, retention_months, drop, concurrently, today),
+        }
+    return summary
+
+
+def _legacy_bound(cursor, table):
+    """Primer mes que ya no cubre <tabla>_legacy: el siguiente al último created_at"""
+    cursor.execute(f'SELECT max({_quote(PARTITION_KEY)}) FROM {_quote(table)}')
+    latest = cursor.fetchone()[0]
+    now = timezone.now().replace(tzinfo=None)
+    bound = add_months(month_start(max(latest or now, now)), 1)
+    # A punto de cambiar de mes: las filas que lleguen durante la conversión caben igualmente
+    if datetime.combine(bound, time()) - now < timedelta(days=1):
+        bound = add_months(bound, 1)
+    return bound
+
+
+def unique_lookup_name(table, column):
+    return f'{table}_{column}_unique'[:MAX_IDENTIFIER_LENGTH]
+
+
+def _create_unique_lookups(cursor, table):
+    """
+    Tablas auxiliares de GLOBAL_UNIQUE_COLUMNS con las filas actuales; sin
+    bloquear escrituras (convert_table las pone al día dentro del LOCK).
+    """
+    for column in GLOBAL_UNIQUE_COLUMNS.get(table, ()):
+        cursor.execute(
+            'SELECT format_type(atttypid, atttypmod) FROM pg_attribute '
+            'WHERE attrelid = to_regclass(%s) AND attname = %s',
+            [table, column]
+        )
+        column_type = cursor.fetchone()[0]
+        lookup = _quote(unique_lookup_name(table, column))
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {lookup} ({_quote(column)} {column_type} PRIMARY KEY)')
+        cursor.execute(
+            f'INSERT INTO {lookup} ({_quote(column)}) SELECT {_quote(column)} FROM {_quote(table)} '
+            f'WHERE {_quote(column)} IS NOT NULL ON CONFLICT DO NOTHING'
+        )
+
+
+def _sync_unique_lookups(cursor, table, source):
+    """Con la tabla bloqueada: añade las filas nuevas, quita las borradas y crea el trigger"""
+    for column in GLOBAL_UNIQUE_COLUMNS.get(table, ()):
+        name = unique_lookup_name(table, column)
+        lookup, quoted = _quote(name), _quote(column)
+        cursor.execute(
+            f'INSERT INTO {lookup} ({quoted}) SELECT {quoted} FROM {_quote(source)} '
+            f'WHERE {quoted} IS NOT NULL ON CONFLICT DO NOTHING'
+        )
+        cursor.execute(
+            f'DELETE FROM {lookup} l WHERE NOT EXISTS '
+            f'(SELECT 1 FROM {_quote(source)} t WHERE t.{quoted} = l.{quoted})'
+        )
+        cursor.execute(UNIQUE_LOOKUP_FUNCTION_SQL.format(function=lookup, lookup=lookup, column=quoted))
+        cursor.execute(
+            f'CREATE TRIGGER {lookup} AFTER INSERT OR DELETE OR UPDATE OF {quoted} ON {_quote(table)} '
+            f'FOR EACH ROW EXECUTE FUNCTION {lookup}()'
+        )
+
+
+def _restrict_delete_triggers(cursor, table, restrict_foreign_keys):
+    """Un trigger BEFORE DELETE por cada clave foránea RESTRICT eliminada"""
+    for referencing, name, column, referenced in restrict_foreign_keys:
+        function = _quote(f'{name}_restrict'[:MAX_IDENTIFIER_LENGTH])
+        cursor.execute(RESTRICT_DELETE_FUNCTION_SQL.format(
+            function=function, referencing=referencing, column=_quote(column), referenced=_quote(referenced),
+            table=table, name=name, referencing_name=referencing,
+        ))
+        cursor.execute(
+            f'CREATE TRIGGER {function} BEFORE DELETE ON {_quote(table)} '
+            f'FOR EACH ROW EXECUTE FUNCTION {function}()'
+        )
+
+
+def _drop_referencing_foreign_keys(cursor, table):
+    cursor.execute(FOREIGN_KEYS_SQL.format(column='confrelid'), [table])
+    dropped = []
+    for referencing, name, definition in cursor.fetchall():
+        cursor.execute(f'ALTER TABLE {referencing} DROP CONSTRAINT {_quote(name)}')
+        dropped.append(f'{referencing}.{name}: {definition}')
+    return dropped
+
+
+def convert_table(table, concurrently=True):
+    """
+    Convierte una tabla en particionada por mes de created_at sin copiar
+    filas. Primero, sin bloquear escrituras, crea los índices únicos con
+    created_at y valida un CHECK con el límite de la partición legacy (así
+    ATTACH PARTITION no recorre la tabla); después, en una transacción
+    breve, renombra la tabla, crea la tabla padre con sus restricciones,
+    índices y claves foráneas salientes, adjunta la tabla antigua y crea las
+    particiones de los próximos meses. Devuelve None si ya estaba particionada.
+    """
+    if is_partitioned(table):
+        return None
+
+    key = PARTITION_KEY
+    legacy = _legacy_name(table)
+    check = f'{table}_partition_bound'
+    concurrent = 'CONCURRENTLY ' if concurrently else ''
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'UPDATE {_quote(table)} SET {_quote(key)} = LOCALTIMESTAMP WHERE {_quote(key)} IS NULL')
+        cursor.execute(UNIQUE_CONSTRAINTS_SQL, [table])
+        unique_constraints = [
+            (name, kind, columns) for name, kind, columns in cursor.fetchall() if key not in columns
+        ]
+        for _name, _kind, columns in unique_constraints:
+            cursor.execute(
+                f'CREATE UNIQUE INDEX {concurrent}IF NOT EXISTS {_quote(_partition_key_name(table, columns))} '
+                f'ON {_quote(table)} ({_columns(columns + [key])})'
+            )
+
+        _create_unique_lookups(cursor, table)
+
+        bound = _legacy_bound(cursor, table)
+        cursor.execute(f'ALTER TABLE {_quote(table)} DROP CONSTRAINT IF EXISTS {_quote(check)}')
+        cursor.execute(
+            f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(check)} "
+            f"CHECK ({_quote(key)} IS NOT NULL AND {_quote(key)} < '{bound}') NOT VALID"
+        )
+        # VALIDATE y SET NOT NULL (que aprovecha el CHECK) no bloquean las escrituras
+        cursor.execute(f'ALTER TABLE {_quote(table)} VALIDATE CONSTRAINT {_quote(check)}')
+        cursor.execute(f'ALTER TABLE {_quote(table)} ALTER COLUMN {_quote(key)} SET NOT NULL')
+
+        with transaction.atomic():
+            cursor.execute(f'LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(RESTRICT_FOREIGN_KEYS_SQL, [table])
+            restrict_foreign_keys = cursor.fetchall()
+            dropped = _drop_referencing_foreign_keys(cursor, table)
+            cursor.execute(PLAIN_INDEXES_SQL, [table])
+            indexes = [(name, definition.split(' USING ', 1)[1]) for name, definition in cursor.fetchall()]
+            cursor.execute(FOREIGN_KEYS_SQL.format(column='conrelid'), [table])
+            foreign_keys = [(name, definition) for _table, name, definition in cursor.fetchall()]
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+            sequence = cursor.fetchone()[0]
+
+            # La tabla antigua libera sus nombres para la tabla padre
+            cursor.execute(f'ALTER TABLE {_quote(table)} RENAME TO {_quote(legacy)}')
+            for name, _kind, columns in unique_constraints:
+                key_index = _partition_key_name(table, columns)
+                cursor.execute(f'ALTER TABLE {_quote(legacy)} RENAME CONSTRAINT {_quote(name)} TO {_quote(_legacy_name(name))}')
+                cursor.execute(
+                    f'ALTER TABLE {_quote(legacy)} ADD CONSTRAINT {_quote(_legacy_name(key_index))} '
+                    f'UNIQUE USING INDEX {_quote(key_index)}'
+                )
+            for name, _definition in indexes:
+                cursor.execute(f'ALTER INDEX {_quote(name)} RENAME TO {_quote(_legacy_name(name))}')
+
+            cursor.execute(
+                f'CREATE TABLE {_quote(table)} (LIKE {_quote(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+                f'INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({_quote(key)})'
+            )
+            cursor.execute(f'ALTER TABLE {_quote(table)} DROP CONSTRAINT {_quote(check)}')
+            for name, kind, columns in unique_constraints:
+                if kind == 'p':
+                    constraint = f'{_quote(name)} PRIMARY KEY'
+                else:
+                    constraint = f'{_quote(_partition_key_name(table, columns))} UNIQUE'
+                cursor.execute(f'ALTER TABLE {_quote(table)} ADD CONSTRAINT {constraint} ({_columns(columns + [key])})')
+            # Con la tabla padre vacía no se valida nada; ATTACH reutiliza las de legacy
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE {_quote(table)} ADD CONSTRAINT {_quote(name)} {definition}')
+            if sequence:
+                cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {_quote(table)}.id')
+
+            cursor.execute(
+                f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(legacy)} FOR VALUES FROM (MINVALUE) TO ('{bound}')"
+            )
+            # Cada índice del padre adopta el equivalente de legacy en lugar de reconstruirlo
+            for name, definition in indexes:
+                cursor.execute(f'CREATE INDEX {_quote(name)} ON {_quote(table)} USING {definition}')
+            # Los triggers de fila de la tabla padre se clonan en todas sus particiones
+            _restrict_delete_triggers(cursor, table, restrict_foreign_keys)
+            _sync_unique_lookups(cursor, table, legacy)
+            created = ensure_partitions(table)
+
+    return {
+        'table': table, 'legacy': legacy, 'bound': bound, 'created': created, 'dropped_foreign_keys': dropped,
+        'restrict_triggers': [name for _referencing, name, _column, _referenced in restrict_foreign_keys],
+    }
@@ -1,4 +1,5 @@
 ﻿from rest_framework import serializers
+from concurrency.serializers import UpdateFieldsSerializerMixin
 from .models import Reservation, ReservationStatus
 
 
@@ -65,17 +66,22 @@ class ReservationDetailSerializer(serializers.ModelSerializer):
         }
 
 
-class ReservationCreateUpdateSerializer(serializers.ModelSerializer):
+class ReservationCreateUpdateSerializer(UpdateFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = [
+            'id',
+            'reservation_code',
             'user',               # opcional si la vista lo setea automáticamente; si lo setea perform_create, hazlo read_only
             'flight',
             'reservation_date',
             'total_passengers',
             'total_amount',
             'status',
+            'version',            # solo lectura; también va en el ETag
         ]
+        # El código lo genera perform_create; se devuelve junto con el id
+        read_only_fields = ['id', 'reservation_code']
 
     def validate(self, data):
         # total_passengers
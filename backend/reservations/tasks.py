@@ -0,0 +1,62 @@
+from celery import shared_task
+from django.db import DatabaseError
+
+from config.routers import use_replica
+from reservations import partitioning
+from reservations.export_jobs import fail_job, finalize_job, plan_job, purge_jobs, write_chunk
+
+
+@shared_task
+def plan_export_job(job_id):
+    """
+    Divide una exportación en trozos por rango de ids y encola uno por trozo
+    pendiente; los workers los escriben en paralelo. También reanuda jobs.
+    """
+    try:
+        pending = plan_job(job_id)
+    except Exception as exc:
+        fail_job(job_id, exc)
+        raise
+
+    if not pending:
+        # Sin filas, o todos los trozos ya estaban escritos
+        finalize_job(job_id)
+    for index, start_id, end_id in pending:
+        write_export_chunk.delay(job_id, index, start_id, end_id)
+    return f"{len(pending)} trozos encolados para la exportación {job_id}."
+
+
+@shared_task(bind=True, max_retries=3)
+def write_export_chunk(self, job_id, index, start_id, end_id):
+    """Escribe un trozo; el último en terminar une el archivo final"""
+    try:
+        # Lectura masiva por rango de ids: a una réplica si la hay
+        with use_replica():
+            last = write_chunk(job_id, index, start_id, end_id)
+    except DatabaseError as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+        fail_job(job_id, exc)
+        raise
+    except Exception as exc:
+        fail_job(job_id, exc)
+        raise
+
+    if last:
+        # finalize_job marca el job como FAILED si no puede unir los trozos
+        finalize_job(job_id)
+
+
+@shared_task
+def purge_export_jobs():
+    """Punto de entrada de Celery beat: borra los archivos de jobs caducados"""
+    return f"{purge_jobs()} exportaciones borradas."
+
+
+@shared_task
+def maintain_partitions():
+    """Punto de entrada de Celery beat: particiones de los próximos meses y retención"""
+    summary = partitioning.maintain_partitions()
+    created = sum(len(result['created']) for result in summary.values())
+    detached = sum(len(result['detached']) for result in summary.values())
+    return f"{created} particiones creadas, {detached} separadas."
@@ -1,6 +1,30 @@
-﻿import pytest
-from django.db import connection
+﻿import csv
+import gzip
+import io
+import json
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
 from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from destinations.models import Destination
+from flight_requests.models import FlightRequest
+from reservation_passengers.models import ReservationPassenger
+from reservations import partitioning
+from reservations.models import Reservation
+
+User = get_user_model()
 
 
 @pytest.mark.django_db
@@ -93,3 +117,370 @@ class TestReservationMigrations:
         
         assert len(plan) == 0, \
             f"Hay {len(plan)} migraciones pendientes por aplicar"
+
+
+class ReservationExportTest(TestCase):
+    """Streaming CSV/NDJSON export of reservations and passengers"""
+
+    def setUp(self):
+        origin = Destination.objects.create(name='Quito', code='UIO', province='Pichincha')
+        destination = Destination.objects.create(name='Guayaquil', code='GYE', province='Guayas')
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin123'
+        )
+        self.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='testpass123'
+        )
+        self.other = User.objects.create_user(
+            username='other', email='other@example.com', password='testpass123'
+        )
+        flight = FlightRequest.objects.create(
+            user=self.owner, origin=origin, destination=destination,
+            travel_date=timezone.localdate() + timedelta(days=5)
+        )
+        self.reservations = [
+            Reservation.objects.create(
+                reservation_code=code, user=user, flight=flight,
+                reservation_date=timezone.now(), total_passengers=1,
+                total_amount=Decimal('120.50'), status=reservation_status
+            )
+            for code, user, reservation_status in [
+                ('RES-0001', self.owner, 'confirmed'),
+                ('RES-0002', self.owner, 'pending'),
+                ('RES-0003', self.other, 'confirmed'),
+            ]
+        ]
+        ReservationPassenger.objects.create(
+            reservation=self.reservations[0], first_name='Ana', last_name='Pérez',
+            country_of_residence='Ecuador', identity_document='0912345678',
+            date_of_birth=date(1990, 5, 1), gender='F'
+        )
+        ReservationPassenger.objects.create(
+            reservation=self.reservations[2], first_name='Luis', last_name='Mora',
+            country_of_residence='Ecuador', identity_document='1712345678',
+            date_of_birth=date(1985, 1, 2), gender='M'
+        )
+        self.client = APIClient()
+
+    def _content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_respects_user_scoping_and_filters(self):
+        """Test a regular user only exports their own reservations, filtered like the list"""
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/reservations/export/', {'ordering': 'created_at'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('reservations.csv', response['Content-Disposition'])
+
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][:3], ['id', 'reservation_code', 'user_id'])
+        self.assertEqual([row[1] for row in rows[1:]], ['RES-0001', 'RES-0002'])
+        self.assertEqual(rows[1][8], '120.50')
+
+        response = self.client.get('/api/reservations/export/', {'status': 'pending'})
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual([row[1] for row in rows[1:]], ['RES-0002'])
+
+    def test_ndjson_export_and_invalid_format(self):
+        """Test NDJSON lines carry the column names and unknown formats are rejected"""
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/reservations/export/', {'file_format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual({record['reservation_code'] for record in records}, {'RES-0001', 'RES-0002', 'RES-0003'})
+        self.assertEqual(records[0]['total_amount'], '120.50')
+
+        response = self.client.get('/api/reservations/export/', {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_passenger_export_is_scoped_to_own_reservations(self):
+        """Test passengers export follows ReservationPassengerViewSet.get_queryset"""
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/reservation-passengers/export/', {'file_format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        records = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['reservation_code'], 'RES-0001')
+        self.assertEqual(records[0]['last_name'], 'Pérez')
+        self.assertEqual(records[0]['date_of_birth'], '1990-05-01')
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/reservation-passengers/export/')
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(len(rows), 3)
+
+
+class ExportJobTest(TestCase):
+    """Celery export jobs: chunks by id range, progress in Redis, ranged download"""
+
+    setUp = ReservationExportTest.setUp
+
+    def _run_inline(self):
+        """Run the Celery tasks in-process instead of on a worker"""
+        from reservations import tasks
+
+        def plan(job_id):
+            return tasks.plan_export_job(job_id)
+
+        def chunk(*args):
+            return tasks.write_export_chunk(*args)
+
+        return mock.patch.multiple(
+            tasks,
+            plan_export_job=mock.Mock(wraps=tasks.plan_export_job, delay=plan),
+            write_export_chunk=mock.Mock(wraps=tasks.write_export_chunk, delay=chunk),
+        )
+
+    def _settings(self):
+        return override_settings(EXPORT_JOBS_DIR=self.exports_dir, EXPORT_JOB_CHUNK_IDS=1)
+
+    def setUpExportDir(self):
+        self.exports_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.exports_dir, ignore_errors=True)
+
+    def test_job_is_chunked_and_downloadable_with_range(self):
+        """Test a job writes one chunk per id range and serves the joined gzip file"""
+        self.setUpExportDir()
+        self.client.force_authenticate(self.owner)
+        with self._settings(), self._run_inline():
+            response = self.client.post(
+                '/api/reservations/export-jobs/?status=confirmed', {'file_format': 'csv'}, format='json'
+            )
+            self.assertEqual(response.status_code, 202)
+            job_url = f"/api/reservations/export-jobs/{response.data['id']}/"
+
+            response = self.client.get(job_url)
+            self.assertEqual(response.data['status'], 'completed')
+            self.assertEqual(response.data['rows'], 1)
+            self.assertEqual(response.data['chunks_done'], response.data['chunks_total'])
+            self.assertTrue(response.data['download_url'].endswith(job_url + 'download/'))
+
+            response = self.client.get(job_url + 'download/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Accept-Ranges'], 'bytes')
+            content = b''.join(response.streaming_content)
+            rows = list(csv.reader(io.StringIO(gzip.decompress(content).decode())))
+            self.assertEqual(rows[0][:2], ['id', 'reservation_code'])
+            self.assertEqual([row[1] for row in rows[1:]], ['RES-0001'])
+
+            response = self.client.get(job_url + 'download/', HTTP_RANGE='bytes=10-19')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(content)}')
+            self.assertEqual(b''.join(response.streaming_content), content[10:20])
+
+            response = self.client.get(job_url + 'download/', HTTP_RANGE=f'bytes={len(content)}-')
+            self.assertEqual(response.status_code, 416)
+
+            # Los jobs son privados
+            self.client.force_authenticate(self.other)
+            self.assertEqual(self.client.get(job_url).status_code, 404)
+            self.assertEqual(self.client.get(job_url + 'download/').status_code, 404)
+
+    def test_planning_again_resumes_pending_chunks(self):
+        """Test re-planning a job only returns chunks that were not written"""
+        from reservations import export_jobs
+        from reservations.views import RESERVATION_EXPORT_COLUMNS
+
+        self.setUpExportDir()
+        with self._settings(), mock.patch('reservations.tasks.plan_export_job.delay'):
+            job_id = export_jobs.create_export_job(
+                Reservation.objects.all(), RESERVATION_EXPORT_COLUMNS, 'ndjson', 'reservations', self.admin.id
+            )
+            chunks = export_jobs.plan_job(job_id)
+            self.assertEqual(len(chunks), 3)
+            self.assertFalse(export_jobs.write_chunk(job_id, *chunks[0]))
+
+            self.assertEqual(export_jobs.plan_job(job_id), chunks[1:])
+            self.assertFalse(export_jobs.write_chunk(job_id, *chunks[1]))
+            self.assertTrue(export_jobs.write_chunk(job_id, *chunks[2]))
+            export_jobs.finalize_job(job_id)
+
+            job = export_jobs.get_export_job(job_id)
+            self.assertEqual(job['status'], 'completed')
+            with gzip.open(export_jobs.artifact_path(job), 'rt') as artifact:
+                codes = [json.loads(line)['reservation_code'] for line in artifact]
+            self.assertEqual(codes, ['RES-0001', 'RES-0002', 'RES-0003'])
+
+    def test_failed_finalization_can_be_resumed(self):
+        """Test a missing chunk fails the job without leaving it stuck, and resuming rewrites it"""
+        from reservations import export_jobs
+        from reservations.views import RESERVATION_EXPORT_COLUMNS
+
+        self.setUpExportDir()
+        with self._settings(), mock.patch('reservations.tasks.plan_export_job.delay') as plan:
+            job_id = export_jobs.create_export_job(
+                Reservation.objects.all(), RESERVATION_EXPORT_COLUMNS, 'ndjson', 'reservations', self.admin.id
+            )
+            chunks = export_jobs.plan_job(job_id)
+            for chunk in chunks:
+                export_jobs.write_chunk(job_id, *chunk)
+            export_jobs.chunk_path(job_id, 1).unlink()
+
+            with self.assertRaises(FileNotFoundError):
+                export_jobs.finalize_job(job_id)
+            job = export_jobs.get_export_job(job_id)
+            self.assertEqual(job['status'], 'failed')
+            self.assertNotIn('finalizing', job)
+            self.assertEqual(job['chunks_done'], 2)
+
+            call_command('resume_export_job', job_id, stdout=io.StringIO())
+            plan.assert_called_with(job_id)
+            self.assertEqual(export_jobs.plan_job(job_id), [chunks[1]])
+            self.assertTrue(export_jobs.write_chunk(job_id, *chunks[1]))
+            export_jobs.finalize_job(job_id)
+
+            job = export_jobs.get_export_job(job_id)
+            self.assertEqual(job['status'], 'completed')
+            self.assertIsNone(job['error'])
+            with gzip.open(export_jobs.artifact_path(job), 'rt') as artifact:
+                codes = [json.loads(line)['reservation_code'] for line in artifact]
+            self.assertEqual(codes, ['RES-0001', 'RES-0002', 'RES-0003'])
+
+    def test_passenger_jobs_are_scoped_per_viewset(self):
+        """Test passenger export jobs use the passenger queryset and endpoint"""
+        self.setUpExportDir()
+        self.client.force_authenticate(self.owner)
+        with self._settings(), self._run_inline():
+            response = self.client.post(
+                '/api/reservation-passengers/export-jobs/', {'file_format': 'ndjson'}, format='json'
+            )
+            job_id = response.data['id']
+            response = self.client.get(f'/api/reservation-passengers/export-jobs/{job_id}/')
+            self.assertEqual(response.data['rows'], 1)
+            self.assertEqual(self.client.get(f'/api/reservations/export-jobs/{job_id}/').status_code, 404)
+
+            response = self.client.post('/api/reservation-passengers/export-jobs/', {'file_format': 'xlsx'}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+class ReservationCodeTest(TestCase):
+    setUp = ReservationExportTest.setUp
+
+    def test_create_retries_when_the_code_is_taken_concurrently(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        # La comprobación previa no ve RES-0001 (otra petición lo insertó entre medias)
+        with mock.patch(
+            'reservations.views.ReservationViewSet._generate_reservation_code',
+            side_effect=['RES-0001', 'RES-0009']
+        ):
+            response = client.post('/api/reservations/', {
+                'user': self.admin.pk, 'flight': self.reservations[0].flight_id,
+                'reservation_date': timezone.now().isoformat(), 'total_passengers': 1, 'total_amount': '99.00',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['reservation_code'], 'RES-0009')
+        self.assertEqual(Reservation.objects.filter(reservation_code='RES-0001').count(), 1)
+
+
+class PartitioningTest(TestCase):
+    """Monthly range partitioning of reservations and passengers (DDL rolled back with the test)"""
+
+    setUp = ReservationExportTest.setUp
+
+    def _convert(self):
+        return {
+            table: partitioning.convert_table(table, concurrently=False)
+            for table in partitioning.PARTITIONED_TABLES
+        }
+
+    def test_maintenance_skips_unpartitioned_tables(self):
+        self.assertFalse(partitioning.is_partitioned('reservations'))
+        self.assertEqual(partitioning.maintain_partitions(concurrently=False), {})
+
+    def test_conversion_keeps_rows_and_creates_monthly_partitions(self):
+        results = self._convert()
+        bound = results['reservations']['bound']
+        self.assertTrue(partitioning.is_partitioned('reservations'))
+        self.assertTrue(partitioning.is_partitioned('reservation_passengers'))
+        self.assertIn(
+            'reservation_passengers.fk_passengers_reservation',
+            ' '.join(results['reservations']['dropped_foreign_keys'])
+        )
+        self.assertIsNone(partitioning.convert_table('reservations', concurrently=False))
+
+        partitions = partitioning.list_partitions('reservations')
+        self.assertEqual(partitions[0]['name'], 'reservations_legacy')
+        self.assertEqual((partitions[0]['start'], partitions[0]['end']), (None, bound))
+        self.assertEqual(
+            partitions[-1]['name'],
+            partitioning.partition_name('reservations', partitioning.add_months(
+                partitioning.current_month(), settings.PARTITION_MONTHS_AHEAD
+            ))
+        )
+        self.assertEqual(partitioning.ensure_partitions('reservations'), [])
+
+        # Filas existentes intactas; el ORM sigue creando y borrando en cascada
+        self.assertEqual(Reservation.objects.count(), 3)
+        reservation = Reservation.objects.create(
+            reservation_code='RES-0004', user=self.owner, flight=self.reservations[0].flight,
+            reservation_date=timezone.now(), total_passengers=1, total_amount=Decimal('80.00')
+        )
+        self.assertGreater(reservation.pk, self.reservations[-1].pk)
+        self.reservations[0].delete()
+        self.assertFalse(ReservationPassenger.objects.filter(reservation_id=self.reservations[0].pk).exists())
+
+    def test_conversion_keeps_payment_guard_and_global_code_uniqueness(self):
+        paid = self.reservations[2]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO payments (reservation_id, user_id, payment_method, amount) VALUES (%s, %s, 'cash', 120)",
+                [paid.pk, self.other.pk]
+            )
+        results = self._convert()
+        self.assertEqual(
+            sorted(results['reservations']['restrict_triggers']),
+            ['fk_payment_details_reservation', 'fk_payments_reservation']
+        )
+
+        # ON DELETE RESTRICT de payments, ahora en un trigger: ni el ORM ni un borrado en bloque la saltan
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            paid.delete()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Reservation.objects.filter(user=self.other).delete()
+        self.assertTrue(Reservation.objects.filter(pk=paid.pk).exists())
+
+        # reservation_code sigue siendo único aunque el created_at sea distinto
+        def create(code):
+            return Reservation.objects.create(
+                reservation_code=code, user=self.owner, flight=paid.flight,
+                reservation_date=timezone.now(), total_passengers=1, total_amount=Decimal('80.00')
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create('RES-0001')
+        self.reservations[0].delete()
+        create('RES-0001')
+        lookup = partitioning.unique_lookup_name('reservations', 'reservation_code')
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT reservation_code FROM {lookup} ORDER BY 1')
+            self.assertEqual([row[0] for row in cursor.fetchall()], ['RES-0001', 'RES-0002', 'RES-0003'])
+
+    def test_recent_queries_prune_partitions(self):
+        bound = self._convert()['reservations']['bound']
+        later = timezone.make_aware(datetime.combine(partitioning.add_months(bound, 1), datetime.min.time()))
+        Reservation.objects.filter(pk=self.reservations[1].pk).update(created_at=later)
+
+        plan = Reservation.objects.filter(created_at__gte=later).explain()
+        self.assertIn(partitioning.partition_name('reservations', later), plan)
+        self.assertNotIn('reservations_legacy', plan)
+        self.assertNotIn(partitioning.partition_name('reservations', bound), plan)
+        self.assertEqual(list(Reservation.objects.filter(created_at__gte=later)), [self.reservations[1]])
+
+    def test_retention_detaches_old_partitions(self):
+        bound = self._convert()['reservations']['bound']
+        summary = partitioning.maintain_partitions(
+            retention_months=1, drop=False, concurrently=False, today=partitioning.add_months(bound, 2)
+        )
+        self.assertEqual(
+            summary['reservations']['detached'],
+            ['reservations_legacy', partitioning.partition_name('reservations', bound)]
+        )
+        names = [partition['name'] for partition in partitioning.list_partitions('reservations')]
+        self.assertNotIn('reservations_legacy', names)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM archive.reservations_legacy")
+            self.assertEqual(cursor.fetchone()[0], 3)
+        self.assertEqual(Reservation.objects.count(), 0)
@@ -8,7 +8,12 @@ from django.utils import timezone
 from datetime import timedelta
 import random
 import string
+from archive.mixins import IncludeArchivedMixin
+from archive.models import ArchivedReservation
+from concurrency.mixins import OptimisticLockMixin
 from .models import Reservation, ReservationStatus
+from .export import ExportFormatError, stream_export
+from .export_jobs import ExportJobMixin
 from .serializers import (
     ReservationListSerializer,
     ReservationDetailSerializer,
@@ -18,19 +23,44 @@ from .serializers import (
 # --- ¡AÑADIDO PARA REDIS! ---
 from django.core.cache import cache
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_headers # ¡CORRECCIÓN JWT!
 # --- FIN DE ADICIONES ---
 
-
-class ReservationViewSet(viewsets.ModelViewSet):
+# Intentos de perform_create si otra petición se queda con el mismo código
+RESERVATION_CODE_ATTEMPTS = 5
+
+# Columnas de GET /api/reservations/export/: (cabecera, lookup del ORM)
+RESERVATION_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('reservation_code', 'reservation_code'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('flight_id', 'flight_id'),
+    ('reservation_date', 'reservation_date'),
+    ('total_passengers', 'total_passengers'),
+    ('total_amount', 'total_amount'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+class ReservationViewSet(OptimisticLockMixin, IncludeArchivedMixin, ExportJobMixin, viewsets.ModelViewSet):
     queryset = Reservation.objects.select_related('user', 'flight').all()
+    # ?include_archived=true para administradores (archive.mixins)
+    archived_queryset = ArchivedReservation.objects.select_related('user', 'flight')
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['status', 'user', 'flight']
     search_fields = ['reservation_code', 'user__username', 'user__email']
     ordering_fields = ['reservation_date', 'total_amount', 'created_at']
     ordering = ['-created_at']
+    # Exportaciones asíncronas (export-jobs/)
+    export_job_kind = 'reservations'
+    export_columns = RESERVATION_EXPORT_COLUMNS
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -101,6 +131,8 @@ class ReservationViewSet(viewsets.ModelViewSet):
         pk = kwargs.get('pk')
         # ¡CORRECCIÓN JWT! Clave de caché única por usuario
         cache_key = f"reservation_detail_{pk}_user_{request.user.id}"
+        if self.include_archived():
+            cache_key += '_archived'
         
         cached_data = cache.get(cache_key)
         if cached_data:
@@ -116,11 +148,20 @@ class ReservationViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         user = self.request.user
-        reservation_code = self._generate_reservation_code()
-        serializer.save(
-            user=user,
-            reservation_code=reservation_code
-        )
+        for attempt in range(RESERVATION_CODE_ATTEMPTS):
+            reservation_code = self._generate_reservation_code()
+            try:
+                # La comprobación de _generate_reservation_code no es atómica:
+                # la restricción de la BD decide y se reintenta con otro código
+                with transaction.atomic():
+                    serializer.save(
+                        user=user,
+                        reservation_code=reservation_code
+                    )
+                break
+            except IntegrityError as exc:
+                if reservation_code not in str(exc) or attempt == RESERVATION_CODE_ATTEMPTS - 1:
+                    raise
         self._clear_reservation_cache(user_id=user.id) # ¡CORRECCIÓN JWT!
 
     def perform_update(self, serializer):
@@ -137,7 +178,10 @@ class ReservationViewSet(viewsets.ModelViewSet):
         """Generar código de reserva único"""
         while True:
             code = 'RES-' + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            if not Reservation.objects.filter(reservation_code=code).exists():
+            if not (
+                Reservation.objects.filter(reservation_code=code).exists()
+                or ArchivedReservation.objects.filter(reservation_code=code).exists()
+            ):
                 return code
 
     # --- ACCIONES PERSONALIZADAS (GET) CON CACHÉ 'cache_page' ---
@@ -253,6 +297,24 @@ class ReservationViewSet(viewsets.ModelViewSet):
         
         return Response(stats)
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exportar reservas en CSV o NDJSON (?file_format=), con los mismos filtros que el listado"""
+        # Sin caché ni paginación: se transmite fila a fila desde un cursor de servidor
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            return stream_export(
+                queryset,
+                RESERVATION_EXPORT_COLUMNS,
+                request.query_params.get('file_format', 'csv'),
+                'reservations'
+            )
+        except ExportFormatError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
     # --- ACCIONES PERSONALIZADAS (ESCRITURA) CON INVALIDACIÓN DE CACHÉ ---
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
@@ -273,7 +335,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             )
         
         reservation.status = ReservationStatus.CONFIRMED
-        reservation.save()
+        reservation.save(update_fields=['status'])
         
         self._clear_reservation_cache(pk=reservation.pk, user_id=reservation.user.id) # ¡CORRECCIÓN JWT!
         
@@ -298,7 +360,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             )
         
         reservation.status = ReservationStatus.CANCELLED
-        reservation.save()
+        reservation.save(update_fields=['status'])
         
         self._clear_reservation_cache(pk=reservation.pk, user_id=reservation.user.id) # ¡CORRECCIÓN JWT!
         
@@ -319,7 +381,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             )
         
         reservation.status = new_status
-        reservation.save()
+        reservation.save(update_fields=['status'])
         
         self._clear_reservation_cache(pk=reservation.pk, user_id=reservation.user.id) # ¡CORRECCIÓN JWT!
         
@@ -349,7 +411,7 @@ class ReservationViewSet(viewsets.ModelViewSet):
             )
         
         reservation.total_amount = amount
-        reservation.save()
+        reservation.save(update_fields=['total_amount'])
         
         self._clear_reservation_cache(pk=reservation.pk, user_id=reservation.user.id) # ¡CORRECCIÓN JWT!
         
@@ -0,0 +1,24 @@
+# search/management/commands/rebuild_search_documents.py
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from search.models import SearchDocumentMixin, refresh_search_documents
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye la columna search_document de todos los modelos indexados
+    (útil tras cargas masivas o cambios en search_document_fields).
+    """
+    help = 'Reconstruye search_document para los modelos con SearchDocumentMixin.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, SearchDocumentMixin):
+                continue
+            updated = refresh_search_documents(model.objects.all(), batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{model._meta.label}: {updated} documentos actualizados.'))
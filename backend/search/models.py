@@ -0,0 +1,72 @@
+# Models for search app
+from django.db import models
+
+
+def build_search_document(instance):
+    """
+    Concatena (en minúsculas) los campos de `search_document_fields`.
+    Acepta rutas con '__' para seguir relaciones, igual que search_fields.
+    """
+    values = []
+    for path in instance.search_document_fields:
+        value = instance
+        for attr in path.split('__'):
+            value = getattr(value, attr, None)
+            if value is None:
+                break
+        if value not in (None, ''):
+            values.append(str(value))
+    return ' '.join(values).lower()
+
+
+class SearchDocumentMixin(models.Model):
+    """
+    Abstract model that keeps a denormalized, lowercased `search_document`
+    column in sync on every save. The column is queried through a GIN
+    trigram index (pg_trgm) by search.filters.IndexedSearchFilter.
+    """
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        db_column='search_document'
+    )
+
+    # Campos (o rutas 'relacion__campo') que forman el documento
+    search_document_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.search_document = build_search_document(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
+        super().save(*args, **kwargs)
+
+
+def refresh_search_documents(queryset, batch_size=1000):
+    """Rebuild search_document for every row of queryset in bounded batches"""
+    model = queryset.model
+    related = [
+        path.rsplit('__', 1)[0]
+        for path in model.search_document_fields
+        if '__' in path
+    ]
+    if related:
+        queryset = queryset.select_related(*related)
+
+    updated = 0
+    batch = []
+    for instance in queryset.order_by('pk').iterator(chunk_size=batch_size):
+        instance.search_document = build_search_document(instance)
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, ['search_document'])
+            updated += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, ['search_document'])
+        updated += len(batch)
+    return updated
@@ -0,0 +1,56 @@
+# Tests for search app
+from django.test import SimpleTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from airlines.models import Airline
+from flights.models import Flight
+from reservation_passengers.models import ReservationPassenger
+from .filters import IndexedSearchFilter
+from .models import build_search_document
+
+
+class SearchDocumentTest(SimpleTestCase):
+    """Test the denormalized search document"""
+    
+    def test_document_follows_relations_and_skips_empty_values(self):
+        """Test related fields are included and empty values skipped"""
+        flight = Flight(
+            flight_code='LA2501',
+            airline=Airline(name='LATAM Airlines'),
+            origin='Quito',
+            destination='Guayaquil',
+            notes=None
+        )
+        self.assertEqual(build_search_document(flight), 'la2501 latam airlines quito guayaquil')
+    
+    def test_passenger_document(self):
+        """Test passenger document uses the passenger search fields"""
+        passenger = ReservationPassenger(
+            first_name='Ana',
+            last_name='Pérez',
+            identity_document='AB-123',
+            seat_number=''
+        )
+        self.assertEqual(build_search_document(passenger), 'ana pérez ab-123')
+
+
+class IndexedSearchFilterTest(SimpleTestCase):
+    """Test IndexedSearchFilter query generation"""
+    
+    def filter(self, params):
+        request = Request(APIRequestFactory().get('/api/flights/', params))
+        queryset = Flight.objects.order_by('departure_datetime')
+        return IndexedSearchFilter().filter_queryset(request, queryset, None)
+    
+    def test_terms_match_search_document(self):
+        """Test every term filters the search_document column"""
+        sql = str(self.filter({'search': 'Quito LA25'}).query)
+        self.assertIn('"flights"."search_document"::text LIKE %quito%', sql)
+        self.assertIn('"flights"."search_document"::text LIKE %la25%', sql)
+        self.assertNotIn('UPPER', sql)
+    
+    def test_ranked_mode_orders_by_rank_first(self):
+        """Test ranked mode orders by similarity, then the previous ordering"""
+        queryset = self.filter({'search': 'quito', 'search_mode': 'ranked'})
+        self.assertEqual(queryset.query.order_by, ('-search_rank', 'departure_datetime'))